@@ -1,19 +1,111 @@
-from ivcal.calculation.user_communication import UserInteraction, local_data_source_question
-from ivcal.data_collection.massive_api_call import get_all_pokemon_names, get_all_pokemon_stats, get_all_nature_names, \
-    get_all_nature_stats
+import logging
 
+from ivcal.calculation.user_communication import UserInteraction, local_data_source_question
 from ivcal.calculation.calculator import IVCalculator
+from ivcal.database.connection_manager import configure_database, DEFAULT_DATABASE_PATH
+
+# Import the package of the data collection without its modules before the function data_collection is defined.
+# Otherwise, its first import would replace the function with the package.
+import ivcal.data_collection
+
+# Define the names of the data collection, which are only imported with their first usage, because the data collection
+# needs the API client and pokepy. A local calculation does not need them.
+LAZY_COLLECTION_NAMES = ["get_all_pokemon_names", "get_all_pokemon_stats", "get_all_nature_names",
+                         "get_all_nature_stats", "get_all_pokemon_data", "get_all_nature_data", "DEFAULT_MAX_WORKERS",
+                         "DEFAULT_BATCH_SIZE"]
+
+# Mark a number of workers, for which the default number of workers of the data collection is used. The default is only
+# imported with the data collection and None already means, that the data is fetched one after another.
+DEFAULT_WORKERS = object()
+
+
+def __getattr__(attribute_name):
+    """
+    Import the names of the data collection for their first usage, so they are still available in this package.
+    """
 
+    if attribute_name in LAZY_COLLECTION_NAMES:
+        from ivcal.data_collection import massive_api_call
 
-def data_collection():
+        return getattr(massive_api_call, attribute_name)
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, attribute_name))
+
+
+def configure_logging(log_path="events.log"):
     """
-    Get all the data for the database file.
+    Log the errors of the application to the log file. The file is only opened for the first logged error.
     """
 
-    get_all_pokemon_names()
-    get_all_pokemon_stats()
-    get_all_nature_names()
-    get_all_nature_stats()
+    logging.basicConfig(handlers=[logging.FileHandler(log_path, delay=True)])
+
+
+def create_number_type(number_type, minimum_value, is_minimum_allowed=True):
+    """
+    Create a type function for an argument of the command line, which converts the argument to a number of the type
+    and checks, that it is larger than the minimum value or, if the minimum is allowed, at least the minimum value.
+    """
+
+    import argparse
+
+    def convert_number(argument_text):
+        try:
+            number = number_type(argument_text)
+
+        except ValueError:
+            raise argparse.ArgumentTypeError("{} is not a valid number.".format(argument_text))
+
+        if number < minimum_value or (number == minimum_value and is_minimum_allowed is False):
+            raise argparse.ArgumentTypeError("{} needs to be {} {}.".format(
+                argument_text, "at least" if is_minimum_allowed is True else "larger than", minimum_value))
+
+        return number
+
+    return convert_number
+
+
+def data_collection(max_workers=DEFAULT_WORKERS, batch_size=None, database_path=None, backend="pokeapi",
+                    backend_options=None, use_response_cache=True, scheduler_options=None):
+    """
+    Get all the data for the database file. The number of workers limits the parallel API calls, None or 1 fetches the
+    data one after another. Every pokemon and every nature is fetched only once for its name and its data. The batch
+    size is the number of rows, which are written in one transaction. If the number of workers or the batch size is not
+    given, the defaults of the data collection are used. The backend "local" fetches the data from the local stand-in
+    of the PokéAPI with the backend options instead, for example for load tests. Every request passes a request
+    scheduler, which retries temporary errors and adapts the number of parallel requests up to the number of workers.
+    The scheduler options are given to the scheduler, for example a rate limit or the number of retries.
+    """
+
+    # The data collection is only imported, if it is used.
+    from ivcal.data_collection.api_database import DatabaseAPIHandler
+    from ivcal.data_collection.call_api import APIClient
+    from ivcal.data_collection.request_scheduler import RequestScheduler
+    from ivcal.data_collection.massive_api_call import get_all_pokemon_data, get_all_nature_data, \
+        DEFAULT_MAX_WORKERS, DEFAULT_BATCH_SIZE
+
+    if max_workers is DEFAULT_WORKERS:
+        max_workers = DEFAULT_MAX_WORKERS
+
+    if batch_size is None:
+        batch_size = DEFAULT_BATCH_SIZE
+
+    if database_path is not None:
+        configure_database(database_path)
+
+    if scheduler_options is None:
+        scheduler_options = {}
+
+    # The data is fetched one after another without workers, so there is only one request at a time.
+    request_scheduler = RequestScheduler(max_concurrency=max(max_workers or 1, 1), **scheduler_options)
+
+    api_client = APIClient(use_response_cache, client=None, backend=backend, backend_options=backend_options,
+                           request_scheduler=request_scheduler)
+    database_handler = DatabaseAPIHandler(api_client=api_client)
+
+    get_all_pokemon_data(max_workers, batch_size, database_handler)
+    get_all_nature_data(max_workers, batch_size, database_handler)
+
+    return api_client
 
 
 def user_information_collection(user_interaction_object):
@@ -35,6 +127,8 @@ def main():
     Make all necessary steps as main function and application
     """
 
+    configure_logging()
+
     # Get the data source.
     data_source_answer = local_data_source_question()
 
@@ -63,3 +157,372 @@ def main():
 
     # Show the results to the user.
     user_interaction.show_iv_result(iv_result)
+
+
+def batch_calculation(input_path, output_path, database_path=DEFAULT_DATABASE_PATH, reject_path=None,
+                      chunk_size=None, process_count=1, ordered=True, snapshot_path=None):
+    """
+    Calculate the IV values of many pokemon from a CSV or JSONL file without user interaction. The database connection,
+    the species index and the nature table are only loaded once for the whole file or once per worker process. With a
+    snapshot file, the lookups use the memory-mapped snapshot instead of the database file. The file is processed in
+    chunks, invalid rows are written to the reject file.
+    """
+
+    import sqlite3
+    import sys
+
+    # The batch calculation needs NumPy, so it is only imported for this mode.
+    from ivcal.calculation.batch_processing import run_batch_calculation, DEFAULT_CHUNK_SIZE
+    from ivcal.calculation.calculator_database import DatabaseCalculatorHandler
+    from ivcal.database.snapshot import load_snapshot
+
+    # Load the lookups in this process in every case, so a missing or an empty database file is reported once with a
+    # clear message instead of an error in every worker process.
+    try:
+        if snapshot_path is not None:
+            lookup_source = load_snapshot(snapshot_path)
+
+        else:
+            configure_database(database_path)
+
+            # The batch calculation only reads the database file.
+            lookup_source = DatabaseCalculatorHandler(read_only=True)
+
+        species_index = lookup_source.get_species_index()
+        nature_table = lookup_source.get_nature_table()
+
+    except (sqlite3.Error, OSError, ValueError) as lookup_error:
+        # Some messages of the errors end with a period, which is added by the message below as well.
+        lookup_error = str(lookup_error).rstrip(".")
+
+        if snapshot_path is not None:
+            print("The snapshot file {} can not be read: {}. Please create it with `python -m ivcal export-snapshot` "
+                  "first.".format(snapshot_path, lookup_error))
+
+        else:
+            print("The database file {} can not be read: {}. Please run `python -m ivcal collect` first.".format(
+                database_path, lookup_error))
+
+        sys.exit(1)
+
+    if len(species_index) == 0:
+        print("There are no pokemon in {}. Please run `python -m ivcal collect` first.".format(
+            snapshot_path if snapshot_path is not None else database_path))
+        sys.exit(1)
+
+    # With more processes, every worker process opens the database file or the snapshot on its own.
+    if process_count > 1:
+        species_index = None
+        nature_table = None
+
+    batch_summary = run_batch_calculation(input_path, output_path, species_index, nature_table, reject_path,
+                                          chunk_size or DEFAULT_CHUNK_SIZE, process_count, database_path, ordered,
+                                          snapshot_path)
+
+    print("{} pokemon calculated, {} rows rejected. The results are saved in {}.".format(batch_summary["calculated"],
+                                                                                         batch_summary["rejected"],
+                                                                                         output_path))
+
+    return batch_summary
+
+
+def snapshot_export(snapshot_path, database_path=DEFAULT_DATABASE_PATH):
+    """
+    Export the pokemon and the natures of the database file to a compact snapshot file, which can be used for lookups
+    without SQLite.
+    """
+
+    from ivcal.calculation.calculator_database import DatabaseCalculatorHandler
+    from ivcal.database.snapshot import export_snapshot
+
+    configure_database(database_path)
+
+    snapshot_summary = export_snapshot(DatabaseCalculatorHandler(read_only=True), snapshot_path)
+
+    print("{} pokemon and {} natures exported to {}.".format(snapshot_summary["pokemon"], snapshot_summary["natures"],
+                                                             snapshot_path))
+
+    return snapshot_summary
+
+
+def collection_run(database_path=DEFAULT_DATABASE_PATH, max_workers=DEFAULT_WORKERS, batch_size=None,
+                   backend="pokeapi", backend_options=None, use_response_cache=True, scheduler_options=None):
+    """
+    Collect the data for a database file and print the time of the collection and the statistics of the request
+    scheduler. For the local backend, the statistics of its requests are printed as well. The local backend serves test
+    data, so it is not allowed with the default database file of the calculator.
+    """
+
+    import os
+    import sys
+    import time
+
+    if backend == "local" and os.path.abspath(database_path) == os.path.abspath(DEFAULT_DATABASE_PATH):
+        print("The local backend serves test data, which must not be saved in the database file {} of the calculator. "
+              "Please use another database file with --database.".format(database_path))
+        sys.exit(2)
+
+    # The options are only used by the local backend.
+    if backend != "local":
+        backend_options = None
+
+    start_time = time.perf_counter()
+    api_client = data_collection(max_workers, batch_size, database_path, backend, backend_options, use_response_cache,
+                                 scheduler_options)
+    collection_time = time.perf_counter() - start_time
+
+    print("The data collection for {} took {:.3f} seconds.".format(database_path, collection_time))
+
+    scheduler_statistics = api_client.request_scheduler.get_statistics()
+    print("{} requests, {} retries, {} pushbacks, {} failed requests, {} parallel requests at the end.".format(
+        scheduler_statistics["requests"], scheduler_statistics["retries"], scheduler_statistics["pushbacks"],
+        scheduler_statistics["failures"], scheduler_statistics["concurrency_limit"]))
+
+    if backend == "local":
+        backend_statistics = api_client.client.get_statistics()
+        print("{} requests, {} server errors, {} rate limited requests.".format(backend_statistics["requests"],
+                                                                               backend_statistics["errors"],
+                                                                               backend_statistics["rate_limited"]))
+
+    return collection_time
+
+
+def service_run(host="127.0.0.1", port=8080, database_path=DEFAULT_DATABASE_PATH, worker_count=1,
+                keep_alive_timeout=30):
+    """
+    Run the HTTP service for the IV calculation, until it is interrupted.
+    """
+
+    from ivcal.service.http_service import run_service
+
+    print("Serving the IV calculation on http://{}:{} with {} worker(s).".format(host, port, worker_count),
+          flush=True)
+
+    run_service(database_path, host, port, worker_count, keep_alive_timeout)
+
+
+def benchmark_run(dataset_size=10000, repeat_count=5, database_path=DEFAULT_DATABASE_PATH, max_workers=None,
+                  latency=0.0, output_path=None, baseline_path=None, regression_threshold=0.1):
+    """
+    Run the benchmark suite and save the results as JSON. With the results of an earlier run, both runs are compared and
+    the program exits with an error, if a benchmark is slower than the threshold allows.
+    """
+
+    import sys
+
+    from ivcal.benchmark import run_benchmarks, compare_results, load_results, save_results
+
+    benchmark_results = run_benchmarks(dataset_size, repeat_count, database_path, max_workers, latency)
+
+    if baseline_path is not None:
+        benchmark_results["comparison"] = compare_results(load_results(baseline_path), benchmark_results,
+                                                          regression_threshold)
+
+    save_results(benchmark_results, output_path)
+
+    if baseline_path is not None and benchmark_results["comparison"]["regressions"]:
+        print("Regressions compared with {}: {}".format(baseline_path,
+                                                        ", ".join(benchmark_results["comparison"]["regressions"])))
+        sys.exit(1)
+
+    return benchmark_results
+
+
+def startup_budget_check(repeat_count=5):
+    """
+    Measure the startup time of the local calculation and the batch calculation and print the results as JSON. The
+    program exits with an error, if a mode is over its budget or loads the API client.
+    """
+
+    import json
+    import sys
+
+    from ivcal.startup_budget import check_startup_budgets
+
+    budget_results = check_startup_budgets(repeat_count)
+
+    print(json.dumps(budget_results, indent=4))
+
+    if not all(budget_result["within_budget"] for budget_result in budget_results):
+        sys.exit(1)
+
+    return budget_results
+
+
+def run_command(arguments):
+    """
+    Run the command of the parsed arguments of the command line. Without a command, the interactive dialog of main is
+    started.
+    """
+
+    if arguments.command == "batch":
+        batch_calculation(arguments.input_path, arguments.output_path, arguments.database, arguments.reject_path,
+                          arguments.chunk_size, arguments.processes, not arguments.unordered,
+                          arguments.snapshot_path)
+
+    elif arguments.command == "export-snapshot":
+        snapshot_export(arguments.snapshot_path, arguments.database)
+
+    elif arguments.command == "collect":
+        collection_run(arguments.database, arguments.workers, arguments.batch_size, arguments.backend,
+                       {"fixtures_path": arguments.fixtures_path,
+                        "latency": arguments.latency,
+                        "jitter": arguments.jitter,
+                        "error_rate": arguments.error_rate,
+                        "rate_limit": arguments.rate_limit,
+                        "seed": arguments.seed}, not arguments.no_cache,
+                       {"rate": arguments.rate,
+                        "burst": arguments.burst,
+                        "max_retries": arguments.max_retries})
+
+    elif arguments.command == "serve":
+        service_run(arguments.host, arguments.port, arguments.database, arguments.workers,
+                    arguments.keep_alive_timeout)
+
+    elif arguments.command == "benchmark":
+        benchmark_run(arguments.size, arguments.repeat, arguments.database, arguments.workers, arguments.latency,
+                      arguments.output_path, arguments.baseline_path, arguments.threshold)
+
+    elif arguments.command == "startup-budget":
+        startup_budget_check(arguments.repeat)
+
+    else:
+        main()
+
+
+def command_line_main(argument_list=None):
+    """
+    Parse the arguments of the command line. Without a command, the interactive dialog of main is started.
+    """
+
+    import argparse
+
+    configure_logging()
+
+    argument_parser = argparse.ArgumentParser(prog="ivcal", description="IV calculator for pokemon.")
+    argument_parser.add_argument("--metrics-output", dest="metrics_path", help="File for the metrics of the run. A "
+                                                                               "file with the extension .prom or .txt "
+                                                                               "is written in the text format of "
+                                                                               "Prometheus, every other file as JSON.")
+    argument_parser.add_argument("--profile", dest="profile_path", help="File for a CPU profile of the run. A summary "
+                                                                        "of the hottest functions is printed.")
+    argument_parser.add_argument("--profile-mode", choices=["cprofile", "sampling"], default="cprofile",
+                                 help="cprofile records every call of all threads, sampling reads the stacks of all "
+                                      "threads in an interval with a smaller overhead for long runs.")
+    argument_parser.add_argument("--sample-interval", type=float, default=0.005, help="Interval between two samples "
+                                                                                      "in seconds.")
+    argument_parser.add_argument("--profile-limit", type=int, default=20, help="Number of functions in the summary of "
+                                                                               "the profile.")
+    command_parsers = argument_parser.add_subparsers(dest="command")
+
+    batch_parser = command_parsers.add_parser("batch", help="Calculate the IV values of many pokemon from a CSV or "
+                                                            "JSONL file.")
+    batch_parser.add_argument("input_path", help="CSV or JSONL file with name, level, nature, the status values and "
+                                                 "the effort values of every pokemon.")
+    batch_parser.add_argument("output_path", help="CSV or JSONL file for the results.")
+    batch_parser.add_argument("--database", default=DEFAULT_DATABASE_PATH, help="Path of the database file.")
+    batch_parser.add_argument("--rejects", dest="reject_path", help="JSONL file for invalid rows. Without this file, "
+                                                                    "invalid rows are logged.")
+    batch_parser.add_argument("--chunk-size", type=create_number_type(int, 1), help="Number of rows, which are "
+                                                                                    "processed together.")
+    batch_parser.add_argument("--processes", type=create_number_type(int, 1), default=1, help="Number of worker "
+                                                                                              "processes for the "
+                                                                                              "calculation.")
+    batch_parser.add_argument("--unordered", action="store_true", help="Write the results of the worker processes "
+                                                                       "as soon as they are finished instead of in "
+                                                                       "the order of the input file.")
+
+    batch_parser.add_argument("--snapshot", dest="snapshot_path", help="Snapshot file, which is used for the lookups "
+                                                                       "instead of the database file.")
+
+    snapshot_parser = command_parsers.add_parser("export-snapshot", help="Export the database file to a compact "
+                                                                         "snapshot file.")
+    snapshot_parser.add_argument("snapshot_path", help="Path of the snapshot file.")
+    snapshot_parser.add_argument("--database", default=DEFAULT_DATABASE_PATH, help="Path of the database file.")
+
+    budget_parser = command_parsers.add_parser("startup-budget", help="Measure the startup time of the local "
+                                                                      "calculation and the batch calculation.")
+    budget_parser.add_argument("--repeat", type=int, default=5, help="Number of measurements for every mode.")
+
+    collect_parser = command_parsers.add_parser("collect", help="Collect the data of all pokemon and natures for the "
+                                                                "database file.")
+    collect_parser.add_argument("--database", default=DEFAULT_DATABASE_PATH, help="Path of the database file.")
+    collect_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                                help="Number of worker threads for the API calls, 1 fetches the data one after "
+                                     "another.")
+    collect_parser.add_argument("--batch-size", type=create_number_type(int, 1),
+                                help="Number of rows, which are written in one transaction.")
+    collect_parser.add_argument("--backend", choices=["pokeapi", "local"], default="pokeapi",
+                                help="Backend for the API calls. The local backend is an offline stand-in of the "
+                                     "PokéAPI.")
+    collect_parser.add_argument("--fixtures", dest="fixtures_path", help="JSON file with the fixtures of the local "
+                                                                         "backend. Without this file, generated "
+                                                                         "pokemon and natures are used.")
+    collect_parser.add_argument("--latency", type=float, default=0.0, help="Latency of the local backend in seconds.")
+    collect_parser.add_argument("--jitter", type=float, default=0.0, help="Random jitter of the latency of the local "
+                                                                          "backend in seconds.")
+    collect_parser.add_argument("--error-rate", type=float, default=0.0, help="Rate of server errors of the local "
+                                                                              "backend between 0 and 1.")
+    collect_parser.add_argument("--rate-limit", type=int, help="Number of requests per second, which the local "
+                                                               "backend allows.")
+    collect_parser.add_argument("--seed", type=int, help="Seed for the random latency and errors of the local "
+                                                         "backend.")
+    collect_parser.add_argument("--no-cache", action="store_true", help="Do not use the response cache. The local "
+                                                                        "backend never uses it.")
+    collect_parser.add_argument("--rate", type=create_number_type(float, 0, False),
+                                help="Maximum number of requests per second, which are sent.")
+    collect_parser.add_argument("--burst", type=create_number_type(float, 1),
+                                help="Number of requests, which can be sent at once within the rate.")
+    collect_parser.add_argument("--max-retries", type=create_number_type(int, 0), default=5,
+                                help="Number of retries of a request after a temporary error.")
+
+    serve_parser = command_parsers.add_parser("serve", help="Run an HTTP service for the IV calculation.")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Address of the service.")
+    serve_parser.add_argument("--port", type=int, default=8080, help="Port of the service.")
+    serve_parser.add_argument("--database", default=DEFAULT_DATABASE_PATH, help="Path of the database file, which is "
+                                                                                "copied to memory.")
+    serve_parser.add_argument("--workers", type=create_number_type(int, 1), default=1, help="Number of worker "
+                                                                                            "processes, which share "
+                                                                                            "the port.")
+    serve_parser.add_argument("--keep-alive-timeout", type=float, default=30, help="Seconds, after which an idle "
+                                                                                   "connection is closed.")
+
+    benchmark_parser = command_parsers.add_parser("benchmark", help="Measure the calculator, the lookups and the "
+                                                                    "data collection offline.")
+    benchmark_parser.add_argument("--size", type=int, default=10000, help="Number of synthetic pokemon.")
+    benchmark_parser.add_argument("--repeat", type=int, default=5, help="Number of measurements for every benchmark.")
+    benchmark_parser.add_argument("--database", default=DEFAULT_DATABASE_PATH, help="Path of the database file for "
+                                                                                    "the lookups.")
+    benchmark_parser.add_argument("--workers", type=int, help="Number of worker threads for the data collection.")
+    benchmark_parser.add_argument("--latency", type=float, default=0.0, help="Simulated time of an API call in "
+                                                                             "seconds.")
+    benchmark_parser.add_argument("--output", dest="output_path", help="JSON file for the results. Without this file, "
+                                                                       "the results are printed.")
+    benchmark_parser.add_argument("--compare", dest="baseline_path", help="JSON file with the results of an earlier "
+                                                                          "run, which are compared with this run.")
+    benchmark_parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown, which is a "
+                                                                               "regression.")
+
+    arguments = argument_parser.parse_args(argument_list)
+
+    if arguments.metrics_path is not None:
+        from ivcal.metrics import enable_metrics
+
+        enable_metrics()
+
+    try:
+        if arguments.profile_path is not None:
+            from ivcal.profiling import profile_function
+
+            profile_function(lambda: run_command(arguments), arguments.profile_path, arguments.profile_mode,
+                             arguments.sample_interval, arguments.profile_limit)
+
+        else:
+            run_command(arguments)
+
+    finally:
+        # The metrics are saved even after an error, so the run can be analyzed.
+        if arguments.metrics_path is not None:
+            from ivcal.metrics import get_metrics_registry
+
+            get_metrics_registry().save(arguments.metrics_path)
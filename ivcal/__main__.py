@@ -1,4 +1,4 @@
 import ivcal
 
 if __name__ == "__main__":
-    ivcal.main()
+    ivcal.command_line_main()
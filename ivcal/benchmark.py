@@ -0,0 +1,311 @@
+"""
+In this file, a benchmark suite for the calculator, the lookups and the data collection is defined. It runs offline:
+The calculations use synthetic pokemon, the lookups use an existing database file and the data collection uses the
+local stand-in of the PokéAPI. The results are saved as JSON, so two runs can be compared for regressions.
+"""
+
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from ivcal.calculation.calculator import IVCalculator
+from ivcal.calculation.iv_range_solver import calculate_stat_value, get_nature_percentage
+from ivcal.database.connection_manager import ConnectionManager, DEFAULT_DATABASE_PATH
+
+# Define the order of the status values for the synthetic pokemon.
+STATUS_VALUES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+# Define the default number of synthetic pokemon and the default number of repetitions for every benchmark.
+DEFAULT_DATASET_SIZE = 10000
+DEFAULT_REPEAT_COUNT = 5
+
+# Define the default relative slowdown of the median time, which is a regression in a comparison.
+DEFAULT_REGRESSION_THRESHOLD = 0.1
+
+
+def create_synthetic_pokemon(dataset_size, seed=0):
+    """
+    Create a list of tuples with the input data dictionary and the base data dictionary of random pokemon, like they
+    are used by the IV calculator. The status values are calculated with the stat formula, so they are realistic.
+    """
+
+    random_generator = random.Random(seed)
+    pokemon_data_list = []
+
+    for _ in range(dataset_size):
+        level = random_generator.randint(1, 100)
+        pokemon_input_data = {"level": level}
+        pokemon_base_data = {}
+
+        # Choose one decreased and one increased value like a nature, they can be the same value.
+        decreased_value = random_generator.choice(STATUS_VALUES[1:])
+        increased_value = random_generator.choice(STATUS_VALUES[1:])
+
+        for value in STATUS_VALUES:
+            base_value = random_generator.randint(5, 255)
+            ev_value = random_generator.randint(0, 252)
+            iv_value = random_generator.randint(0, 31)
+
+            nature_multiplier = 1
+            if decreased_value != increased_value:
+                if value == decreased_value:
+                    nature_multiplier = 0.9
+
+                elif value == increased_value:
+                    nature_multiplier = 1.1
+
+            pokemon_base_data[value] = base_value
+            pokemon_input_data["{}_ev".format(value)] = ev_value
+            pokemon_input_data[value] = calculate_stat_value(base_value, level, ev_value, iv_value,
+                                                             get_nature_percentage(nature_multiplier), value == "hp")
+
+            if value != "hp":
+                pokemon_input_data["{}_nature".format(value)] = nature_multiplier
+
+        pokemon_data_list.append((pokemon_input_data, pokemon_base_data))
+
+    return pokemon_data_list
+
+
+def measure_function(benchmark_function, item_count, repeat_count=DEFAULT_REPEAT_COUNT):
+    """
+    Measure the time of a function for the number of repetitions. The result is a dictionary with the minimum, the
+    median and the mean time in seconds and the number of items per second for the median time.
+    """
+
+    measured_times = []
+
+    for _ in range(repeat_count):
+        start_time = time.perf_counter()
+        benchmark_function()
+        measured_times.append(time.perf_counter() - start_time)
+
+    median_time = statistics.median(measured_times)
+
+    return {"items": item_count,
+            "repeat": repeat_count,
+            "min_time": min(measured_times),
+            "median_time": median_time,
+            "mean_time": statistics.mean(measured_times),
+            "items_per_second": item_count / median_time if median_time > 0 else None}
+
+
+def benchmark_scalar_calculation(pokemon_data_list, repeat_count=DEFAULT_REPEAT_COUNT):
+    """
+    Measure the calculation of every synthetic pokemon with the class IVCalculator.
+    """
+
+    def calculate_all_pokemon():
+        for pokemon_input_data, pokemon_base_data in pokemon_data_list:
+            IVCalculator(pokemon_input_data, pokemon_base_data).calculate_all_iv_values()
+
+    return measure_function(calculate_all_pokemon, len(pokemon_data_list), repeat_count)
+
+
+def benchmark_batch_calculation(pokemon_data_list, repeat_count=DEFAULT_REPEAT_COUNT):
+    """
+    Measure the calculation of all synthetic pokemon with the class BatchIVCalculator. The conversion of the
+    dictionaries to arrays is a part of the measurement.
+    """
+
+    # The batch calculation needs NumPy, so it is only imported for this benchmark.
+    from ivcal.calculation.batch_calculator import BatchIVCalculator
+
+    def calculate_all_pokemon():
+        BatchIVCalculator.from_dictionaries(pokemon_data_list).calculate_all_iv_values()
+
+    return measure_function(calculate_all_pokemon, len(pokemon_data_list), repeat_count)
+
+
+def benchmark_lookups(database_path, lookup_count, repeat_count=DEFAULT_REPEAT_COUNT):
+    """
+    Measure the lookups of pokemon ids by name and of base stats by id in a database file with the database handler and
+    with the species index. The result is None, if the database file does not contain pokemon.
+    """
+
+    from ivcal.calculation.calculator_database import DatabaseCalculatorHandler
+    from ivcal.calculation.species_index import SpeciesIndex
+
+    if not os.path.exists(database_path):
+        return None
+
+    connection_manager = ConnectionManager(database_path)
+
+    try:
+        database_handler = DatabaseCalculatorHandler(read_only=True, connection_manager=connection_manager)
+        pokemon_rows = database_handler.get_all_pokemon_rows()
+
+        if not pokemon_rows:
+            return None
+
+        # Look up the pokemon in a random, but repeatable order.
+        random_generator = random.Random(0)
+        lookup_rows = [random_generator.choice(pokemon_rows) for _ in range(lookup_count)]
+        lookup_names = [pokemon_row[1] for pokemon_row in lookup_rows]
+        lookup_ids = [pokemon_row[0] for pokemon_row in lookup_rows]
+
+        species_index = SpeciesIndex(pokemon_rows)
+
+        lookup_results = {}
+
+        for lookup_name, lookup_source in [("database", database_handler), ("species_index", species_index)]:
+            lookup_results["{}_name_to_id".format(lookup_name)] = measure_function(
+                lambda: [lookup_source.get_pokemon_id_by_name(pokemon_name) for pokemon_name in lookup_names],
+                lookup_count, repeat_count)
+
+            lookup_results["{}_base_stats".format(lookup_name)] = measure_function(
+                lambda: [lookup_source.get_pokemon_base_stats_by_id(pokemon_id) for pokemon_id in lookup_ids],
+                lookup_count, repeat_count)
+
+    finally:
+        connection_manager.close_all()
+
+    return lookup_results
+
+
+def benchmark_collection(max_workers=None, batch_size=None, latency=0.0, repeat_count=1, fixtures=None):
+    """
+    Measure a complete data collection of all pokemon and natures with the local backend into a new temporary database
+    file for every repetition. The response cache is not used, so every pokemon and every nature is fetched. Without
+    fixtures, generated pokemon and natures are served.
+    """
+
+    # The data collection is only imported for this benchmark.
+    from ivcal.data_collection.api_database import DatabaseAPIHandler, DEFAULT_BATCH_SIZE
+    from ivcal.data_collection.call_api import APIClient
+    from ivcal.data_collection.local_api_backend import LocalPokeAPIBackend, create_synthetic_fixtures
+    from ivcal.data_collection.massive_api_call import get_all_pokemon_data, get_all_nature_data
+
+    if batch_size is None:
+        batch_size = DEFAULT_BATCH_SIZE
+
+    if fixtures is None:
+        fixtures = create_synthetic_fixtures()
+
+    call_counts = []
+
+    def collect_all_data():
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            connection_manager = ConnectionManager(os.path.join(temporary_directory, "benchmark.db"))
+            local_backend = LocalPokeAPIBackend(fixtures, latency)
+
+            try:
+                database_handler = DatabaseAPIHandler(connection_manager,
+                                                      APIClient(use_response_cache=False, client=local_backend))
+
+                get_all_pokemon_data(max_workers, batch_size, database_handler)
+                get_all_nature_data(max_workers, batch_size, database_handler)
+
+            finally:
+                connection_manager.close_all()
+
+            call_counts.append(local_backend.request_count)
+
+    collection_result = measure_function(collect_all_data, len(fixtures["pokemon"]) + len(fixtures["nature"]),
+                                         repeat_count)
+    collection_result.update({"max_workers": max_workers,
+                              "batch_size": batch_size,
+                              "latency": latency,
+                              "api_calls": max(call_counts)})
+
+    return collection_result
+
+
+def run_benchmarks(dataset_size=DEFAULT_DATASET_SIZE, repeat_count=DEFAULT_REPEAT_COUNT,
+                   database_path=DEFAULT_DATABASE_PATH, max_workers=None, latency=0.0, seed=0):
+    """
+    Run all benchmarks and return a dictionary with information about the run and the results of every benchmark.
+    Benchmarks, which can not run, for example without NumPy or without a database file, are listed as skipped.
+    """
+
+    pokemon_data_list = create_synthetic_pokemon(dataset_size, seed)
+
+    benchmark_results = {}
+    skipped_benchmarks = {}
+
+    benchmark_results["scalar_calculation"] = benchmark_scalar_calculation(pokemon_data_list, repeat_count)
+
+    try:
+        benchmark_results["batch_calculation"] = benchmark_batch_calculation(pokemon_data_list, repeat_count)
+
+    except ImportError as import_error:
+        skipped_benchmarks["batch_calculation"] = str(import_error)
+
+    lookup_results = benchmark_lookups(database_path, dataset_size, repeat_count)
+
+    if lookup_results is None:
+        skipped_benchmarks["lookups"] = "The database file {} does not contain pokemon.".format(database_path)
+
+    else:
+        for lookup_name, lookup_result in lookup_results.items():
+            benchmark_results["lookup_{}".format(lookup_name)] = lookup_result
+
+    benchmark_results["collection"] = benchmark_collection(max_workers, latency=latency)
+
+    return {"metadata": {"python_version": platform.python_version(),
+                         "platform": platform.platform(),
+                         "timestamp": time.time(),
+                         "dataset_size": dataset_size,
+                         "repeat": repeat_count,
+                         "database_path": database_path,
+                         "max_workers": max_workers,
+                         "latency": latency,
+                         "seed": seed},
+            "benchmarks": benchmark_results,
+            "skipped": skipped_benchmarks}
+
+
+def compare_results(baseline_results, current_results, regression_threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """
+    Compare the median times of two benchmark runs. The result is a dictionary with the ratio of the current time to the
+    time of the baseline for every benchmark of both runs and the list of benchmarks, which are slower than the
+    threshold allows.
+    """
+
+    benchmark_ratios = {}
+    regressions = []
+
+    for benchmark_name, current_result in current_results["benchmarks"].items():
+        baseline_result = baseline_results["benchmarks"].get(benchmark_name)
+
+        # Only benchmarks with the same number of items can be compared.
+        if baseline_result is None or baseline_result["items"] != current_result["items"]:
+            continue
+
+        time_ratio = current_result["median_time"] / baseline_result["median_time"]
+        benchmark_ratios[benchmark_name] = time_ratio
+
+        if time_ratio > 1 + regression_threshold:
+            regressions.append(benchmark_name)
+
+    return {"ratios": benchmark_ratios,
+            "threshold": regression_threshold,
+            "regressions": regressions}
+
+
+def load_results(results_path):
+    """
+    Load the results of a benchmark run from a JSON file.
+    """
+
+    with open(results_path) as results_file:
+        return json.load(results_file)
+
+
+def save_results(benchmark_results, results_path=None):
+    """
+    Save the results of a benchmark run as JSON file. Without a path, they are written to the standard output.
+    """
+
+    if results_path is None:
+        json.dump(benchmark_results, sys.stdout, indent=4)
+        sys.stdout.write("\n")
+
+    else:
+        with open(results_path, "w") as results_file:
+            json.dump(benchmark_results, results_file, indent=4)
@@ -0,0 +1,133 @@
+"""
+In this file, a vectorized counterpart of the IV calculator is defined. It works with columnar arrays instead of
+dictionaries, so many pokemon can be calculated in one NumPy pass. The class IVCalculator stays the reference for the
+results of one single pokemon.
+"""
+
+import numpy
+
+from ivcal.metrics import get_metrics_registry, timed
+
+# Define the order of the status values for the columns of every array with six columns.
+STATUS_VALUES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+# Define the order of the status values for the columns of the nature array. HP is not influenced by a nature.
+NATURE_STATUS_VALUES = ["attack", "defense", "special-attack", "special-defense", "speed"]
+
+
+class BatchIVCalculator:
+    """
+    Create a class for calculating the IV (individual values) of many pokemon at once. Every parameter is an array with
+    one row per pokemon: level has the shape N, stats, evs and base stats have the shape N x 6 in the order of
+    STATUS_VALUES and the nature multipliers have the shape N x 5 in the order of NATURE_STATUS_VALUES.
+    """
+
+    def __init__(self, level_array, stats_array, ev_array, nature_array, base_stats_array):
+        # Make the parameters class-wide accessible as arrays with a fixed shape.
+        self.level_array = numpy.asarray(level_array).reshape(-1)
+        self.stats_array = numpy.asarray(stats_array).reshape(-1, 6)
+        self.ev_array = numpy.asarray(ev_array).reshape(-1, 6)
+        self.nature_array = numpy.asarray(nature_array, dtype=numpy.float64).reshape(-1, 5)
+        self.base_stats_array = numpy.asarray(base_stats_array).reshape(-1, 6)
+
+        # Every array needs one row per pokemon.
+        row_counts = {len(self.level_array), len(self.stats_array), len(self.ev_array), len(self.nature_array),
+                      len(self.base_stats_array)}
+
+        if len(row_counts) != 1:
+            raise ValueError("All arrays for the batch IV calculation need the same number of rows.")
+
+        # The level is a divisor of the stat formula, so a level below 1 would result in infinite or NaN IV values.
+        if numpy.any(self.level_array < 1):
+            raise ValueError("The level of every pokemon needs to be at least 1.")
+
+    @classmethod
+    def from_dictionaries(cls, pokemon_data_list):
+        """
+        Create a batch calculator with a list of tuples, which contain the input data dictionary and the base data
+        dictionary of a pokemon. These are the same dictionaries as for the class IVCalculator.
+        """
+
+        level_list = []
+        stats_list = []
+        ev_list = []
+        nature_list = []
+        base_stats_list = []
+
+        for pokemon_input_data, pokemon_base_data in pokemon_data_list:
+            level_list.append(pokemon_input_data["level"])
+            stats_list.append([pokemon_input_data[value] for value in STATUS_VALUES])
+            ev_list.append([pokemon_input_data["{}_ev".format(value)] for value in STATUS_VALUES])
+            nature_list.append([pokemon_input_data["{}_nature".format(value)] for value in NATURE_STATUS_VALUES])
+            base_stats_list.append([pokemon_base_data[value] for value in STATUS_VALUES])
+
+        return cls(level_list, stats_list, ev_list, nature_list, base_stats_list)
+
+    @timed("ivcal_iv_calculation_seconds", operation="batch_calculate_all_iv_values")
+    def calculate_all_iv_values(self):
+        """
+        Calculate all IV values and return them in an integer array with the shape N x 6 in the order of STATUS_VALUES.
+        """
+
+        # Count the pokemon, because the latency of one call depends on their number.
+        get_metrics_registry().increment("ivcal_batch_pokemon_total", len(self.level_array))
+
+        # Use a float copy of the level as column for broadcasting over the status values.
+        level_column = self.level_array.astype(numpy.float64)[:, numpy.newaxis]
+
+        # Create an empty array for the results, which are not rounded yet.
+        iv_value_array = numpy.empty(self.stats_array.shape, dtype=numpy.float64)
+
+        # The HP value has its own formula.
+        iv_value_array[:, 0] = self.calculate_hp_iv_values(level_column[:, 0])
+
+        # All the other values use the standard formula.
+        iv_value_array[:, 1:] = self.calculate_single_iv_values(level_column)
+
+        return self.round_iv_values(iv_value_array)
+
+    def calculate_single_iv_values(self, level_column):
+        """
+        Calculate the IV values for all status values except HP. The order of the operations is the same as in
+        IVCalculator.calculate_single_iv_value, so the floating point results are the same.
+        """
+
+        stats = self.stats_array[:, 1:].astype(numpy.float64)
+        base_stats = self.base_stats_array[:, 1:]
+        evs = self.ev_array[:, 1:]
+
+        # Use one hell of formula for IV calculation, but for all the pokemon at once.
+        single_iv_values = ((((stats / self.nature_array) - 5) * 100) / level_column) - 2 * base_stats - 0.25 * evs
+
+        return single_iv_values
+
+    def calculate_hp_iv_values(self, level_vector):
+        """
+        Calculate the HP IV values with their specific formula.
+        """
+
+        # The subtraction is done with integers like in the scalar formula and the division converts to float.
+        hp_iv_values = (((self.stats_array[:, 0] - self.level_array - 10) * 100) / level_vector) - 2 * \
+            self.base_stats_array[:, 0] - 0.25 * self.ev_array[:, 0]
+
+        return hp_iv_values
+
+    @staticmethod
+    def round_iv_values(iv_value_array):
+        """
+        Round the IV values to "realistic" values like IVCalculator.round_iv_value. Every IV value can be an integer
+        number between 0 and 31.
+        """
+
+        # Values outside of the range are calculation issues and truncating the clamped values rounds them down.
+        rounded_iv_values = numpy.clip(iv_value_array, 0, 31).astype(numpy.int64)
+
+        return rounded_iv_values
+
+    @staticmethod
+    def results_to_dictionaries(iv_result_array):
+        """
+        Transform the result array to a list of dictionaries in the format of IVCalculator.calculate_all_iv_values.
+        """
+
+        return [dict(zip(STATUS_VALUES, iv_row)) for iv_row in iv_result_array.tolist()]
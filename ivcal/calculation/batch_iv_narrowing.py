@@ -0,0 +1,150 @@
+"""
+In this file, a vectorized counterpart of the IV narrowing is defined. It works with columnar arrays of observations,
+which are grouped in histories of the same pokemon, so millions of histories can be narrowed with a few NumPy passes.
+The class IVNarrower stays the reference for the results of one single pokemon.
+"""
+
+import numpy
+
+from ivcal.calculation.batch_calculator import STATUS_VALUES
+from ivcal.calculation.iv_narrowing import mask_to_iv_values
+from ivcal.metrics import get_metrics_registry, timed
+
+# Define the masks with all IV values below a count between 0 and 32, for example 0b111 for the count 3.
+LOWER_IV_MASKS = numpy.array([(1 << iv_count) - 1 for iv_count in range(33)], dtype=numpy.uint32)
+
+
+class BatchIVNarrower:
+    """
+    Create a class for narrowing the IV values of many pokemon at once. Every array has one row per observation like the
+    arrays of BatchIVCalculator: level has the shape N, stats, evs and base stats have the shape N x 6 in the order of
+    STATUS_VALUES and the nature multipliers have the shape N x 5. The observations of one history are next to each
+    other and the history starts are the sorted positions of the first observation of every history, so the first
+    history starts at 0.
+    """
+
+    def __init__(self, history_starts, level_array, stats_array, ev_array, nature_array, base_stats_array):
+        # Make the parameters class-wide accessible as integer arrays with a fixed shape. 32-bit integers are enough for
+        # the stat formula and faster than 64-bit integers.
+        self.history_starts = numpy.asarray(history_starts, dtype=numpy.intp).reshape(-1)
+        self.level_array = numpy.asarray(level_array, dtype=numpy.int32).reshape(-1, 1)
+        self.stats_array = numpy.asarray(stats_array, dtype=numpy.int32).reshape(-1, 6)
+        self.ev_array = numpy.asarray(ev_array, dtype=numpy.int32).reshape(-1, 6)
+        self.base_stats_array = numpy.asarray(base_stats_array, dtype=numpy.int32).reshape(-1, 6)
+
+        # Calculate the stat formula with integer percentages like the IV range solver. HP always has 100 percent.
+        nature_percentages = numpy.rint(numpy.asarray(nature_array, dtype=numpy.float64).reshape(-1, 5) * 100)
+        self.nature_percentage_array = numpy.hstack([numpy.full((len(nature_percentages), 1), 100, dtype=numpy.int32),
+                                                     nature_percentages.astype(numpy.int32)])
+
+        # Save the part of the stat formula, which does not depend on the IV value.
+        self.stat_offset_array = 2 * self.base_stats_array + self.ev_array // 4
+
+        # Every array needs one row per observation.
+        row_counts = {len(self.level_array), len(self.stats_array), len(self.ev_array), len(self.base_stats_array),
+                      len(self.nature_percentage_array)}
+
+        if len(row_counts) != 1:
+            raise ValueError("All arrays for the batch IV narrowing need the same number of rows.")
+
+        if numpy.any(self.level_array < 1):
+            raise ValueError("The level of every observation needs to be at least 1.")
+
+        # Every history needs at least one observation, otherwise its result would be the one of another history.
+        if len(self.history_starts) == 0 or self.history_starts[0] != 0 \
+                or numpy.any(numpy.diff(self.history_starts) <= 0) or self.history_starts[-1] >= len(self.level_array):
+            raise ValueError("The history starts need to begin with 0 and increase up to the number of observations.")
+
+    @staticmethod
+    def divide_rounding_up(dividend_array, divisor_array):
+        """
+        Divide integer arrays and round the result up.
+        """
+
+        return -(-dividend_array // divisor_array)
+
+    def calculate_minimum_iv_values(self, stat_value_array):
+        """
+        Calculate the smallest IV value of every status value of every observation, which results in at least the given
+        status value. The stat formula of the IV range solver only uses divisions, which are rounded down, so the
+        formula can be inverted exactly with divisions, which are rounded up. The status value never decreases with a
+        larger IV value, so all larger IV values result in at least the given status value as well. The result is
+        between 0 and 32, 32 means that no IV value reaches the status value.
+        """
+
+        # Calculate the smallest first part of the stat formula, which reaches the status value. The nature effect is
+        # inverted for all values except HP and HP has its own formula.
+        minimum_stat_core = self.divide_rounding_up(100 * stat_value_array, self.nature_percentage_array) - 5
+        minimum_stat_core[:, 0] = stat_value_array[:, 0] - self.level_array[:, 0] - 10
+
+        # Invert the first part of the stat formula, which is ((2 * base + iv + ev // 4) * level) // 100.
+        minimum_iv_array = self.divide_rounding_up(100 * minimum_stat_core, self.level_array) - self.stat_offset_array
+
+        return numpy.clip(minimum_iv_array, 0, 32)
+
+    def calculate_observation_masks(self):
+        """
+        Calculate the mask of the possible IV values of every status value for every observation. The result is an
+        array of 32-bit masks with the shape N x 6, a mask is 0 for a status value without a consistent IV value.
+        """
+
+        # The consistent IV values start with the smallest IV value, which reaches the status value, and end before the
+        # smallest IV value, which reaches the next status value.
+        minimum_iv_array = self.calculate_minimum_iv_values(self.stats_array)
+        end_iv_array = self.calculate_minimum_iv_values(self.stats_array + 1)
+
+        # The mask of a range is the difference of the masks with all IV values below its end and below its start.
+        return LOWER_IV_MASKS[end_iv_array] ^ LOWER_IV_MASKS[minimum_iv_array]
+
+    @timed("ivcal_iv_calculation_seconds", operation="batch_narrow_all_histories")
+    def narrow_all_histories(self):
+        """
+        Narrow the possible IV values of every history. The result is an array of 32-bit masks with the shape H x 6 in
+        the order of STATUS_VALUES, in which every mask is the intersection of the masks of all observations of a
+        history.
+        """
+
+        # Count the observations, because the latency of one call depends on their number.
+        get_metrics_registry().increment("ivcal_batch_observations_total", len(self.level_array))
+
+        return numpy.bitwise_and.reduceat(self.calculate_observation_masks(), self.history_starts, axis=0)
+
+    @staticmethod
+    def find_contradictions(candidate_mask_array):
+        """
+        Find the contradictions in the result of narrow_all_histories. The result is a boolean array with the shape
+        H x 6, which is True for a status value without a possible IV value.
+        """
+
+        return candidate_mask_array == 0
+
+    @staticmethod
+    def masks_to_iv_ranges(candidate_mask_array):
+        """
+        Transform the masks to the minimum and the maximum possible IV value. The IV values of an observation are a
+        range, so the intersection of many observations is a range as well and the masks do not have gaps. The result
+        is a tuple with two integer arrays, which have -1 for a contradiction.
+        """
+
+        candidate_masks = candidate_mask_array.astype(numpy.int64)
+        is_contradiction = candidate_masks == 0
+
+        # The lowest set bit is the minimum and the highest set bit is the maximum, the logarithm of a 32-bit integer
+        # is exact enough for both.
+        safe_masks = numpy.where(is_contradiction, 1, candidate_masks)
+        minimum_iv_array = numpy.log2(safe_masks & -safe_masks).astype(numpy.int64)
+        maximum_iv_array = numpy.floor(numpy.log2(safe_masks)).astype(numpy.int64)
+
+        minimum_iv_array[is_contradiction] = -1
+        maximum_iv_array[is_contradiction] = -1
+
+        return minimum_iv_array, maximum_iv_array
+
+    @staticmethod
+    def results_to_candidate_sets(candidate_mask_array):
+        """
+        Transform the result array to a list of dictionaries in the format of IVNarrower.get_candidate_sets.
+        """
+
+        return [{value: mask_to_iv_values(candidate_mask) for value, candidate_mask in zip(STATUS_VALUES, mask_row)}
+                for mask_row in candidate_mask_array.tolist()]
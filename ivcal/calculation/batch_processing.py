@@ -0,0 +1,500 @@
+"""
+In this file, the non-interactive batch mode is defined. Many pokemon are read from a CSV or JSONL file, resolved with
+the species index and the nature table, calculated and written to a result file. The file is processed as a stream of
+chunks with a fixed size, so the memory usage does not depend on the size of the file.
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ivcal.calculation.batch_calculator import BatchIVCalculator, STATUS_VALUES
+from ivcal.calculation.batch_iv_narrowing import BatchIVNarrower
+from ivcal.calculation.calculator_database import DatabaseCalculatorHandler
+from ivcal.database.connection_manager import ConnectionManager, DEFAULT_DATABASE_PATH
+from ivcal.database.snapshot import load_snapshot
+
+# Define the columns with the exact minimum and maximum IV value of every status value.
+RANGE_COLUMNS = ["{}_{}".format(value, bound) for value in STATUS_VALUES for bound in ["min", "max"]]
+
+# Define the columns of the result file.
+RESULT_COLUMNS = ["name", "level", "nature"] + STATUS_VALUES + RANGE_COLUMNS
+
+# Define the largest status value for the exact IV ranges. No IV value results in a larger status value, so larger
+# values are replaced by it and the calculation works with 32-bit integers.
+MAXIMUM_STAT_VALUE = 65535
+
+# Define the number of rows, which are processed together as default.
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def get_file_format(file_path):
+    """
+    Get the format of an input or output file by its extension. CSV and JSONL (one JSON object per line) are possible.
+    """
+
+    file_extension = os.path.splitext(file_path)[1].lower()
+
+    if file_extension == ".csv":
+        return "csv"
+
+    if file_extension in [".jsonl", ".ndjson", ".json"]:
+        return "jsonl"
+
+    raise ValueError("The file {} needs to be a CSV or a JSONL file.".format(file_path))
+
+
+def read_pokemon_rows(input_path):
+    """
+    Read the rows of an input file one after another as tuples with the row number and the row. The row is a dictionary
+    with the same keys as for the interactive dialog: name, level, nature, the six status values like "special-attack"
+    and the six effort values like "special-attack_ev". A line of a JSONL file, which is not valid JSON, is returned as
+    the exception instead of a dictionary, so it can be rejected without stopping the file.
+    """
+
+    with open(input_path, newline="") as input_file:
+        if get_file_format(input_path) == "csv":
+            for row_number, raw_row in enumerate(csv.DictReader(input_file), start=1):
+                yield row_number, raw_row
+
+        else:
+            row_number = 0
+
+            for input_line in input_file:
+                # Empty lines are not rows.
+                if not input_line.strip():
+                    continue
+
+                row_number += 1
+
+                try:
+                    yield row_number, json.loads(input_line)
+
+                except ValueError as json_error:
+                    yield row_number, json_error
+
+
+def chunk_rows(row_iterator, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Group the rows of an iterator in lists with the chunk size. The next rows are only read, when the chunk before is
+    completely processed, so there is never more than one chunk in memory.
+    """
+
+    row_chunk = []
+
+    for row in row_iterator:
+        row_chunk.append(row)
+
+        if len(row_chunk) >= chunk_size:
+            yield row_chunk
+            row_chunk = []
+
+    if row_chunk:
+        yield row_chunk
+
+
+def parse_integer(raw_value):
+    """
+    Transform a value of a row to an integer. A number of a JSONL file can be a float like 50.0, but also 50.5,
+    Infinity or NaN, which are not valid values. A boolean of a JSONL file is a subclass of int in Python, so true
+    would be 1 without its own check. A ValueError is raised for them like for every other invalid value.
+    """
+
+    if isinstance(raw_value, bool):
+        raise ValueError("The value {} is not a number.".format(str(raw_value).lower()))
+
+    if isinstance(raw_value, float) and not raw_value.is_integer():
+        raise ValueError("The value {} is not an integer number.".format(raw_value))
+
+    return int(raw_value)
+
+
+def parse_pokemon_row(raw_row):
+    """
+    Check a row of the input file and transform its values to the types of the interactive dialog. A missing effort
+    value is 0. A ValueError is raised for an invalid row.
+    """
+
+    # A line of a JSONL file, which could not be read, is an exception.
+    if isinstance(raw_row, Exception):
+        raise ValueError("The row is not valid JSON: {}".format(raw_row))
+
+    if not isinstance(raw_row, dict):
+        raise ValueError("The row needs to be an object.")
+
+    pokemon_row = {"name": str(raw_row["name"]).strip().lower(),
+                   "nature": str(raw_row["nature"]).strip().lower(),
+                   "level": parse_integer(raw_row["level"])}
+
+    # The level of a pokemon needs to be at least 1 or as a maximum 100.
+    if pokemon_row["level"] < 1 or pokemon_row["level"] > 100:
+        raise ValueError("The level needs to be between 1 and 100.")
+
+    ev_sum = 0
+
+    for value in STATUS_VALUES:
+        pokemon_row[value] = parse_integer(raw_row[value])
+
+        if pokemon_row[value] < 0:
+            raise ValueError("The status value {} needs to be larger than 0.".format(value))
+
+        ev_value = "{}_ev".format(value)
+        ev_input = raw_row.get(ev_value)
+        pokemon_row[ev_value] = parse_integer(ev_input) if ev_input not in [None, ""] else 0
+
+        if not 0 <= pokemon_row[ev_value] <= 255:
+            raise ValueError("The effort value {} needs to be between 0 and 255.".format(ev_value))
+
+        ev_sum += pokemon_row[ev_value]
+
+    if ev_sum > 510:
+        raise ValueError("The total sum of the effort values must not be larger than 510.")
+
+    return pokemon_row
+
+
+def resolve_name(resource_type, resource_name, get_id_function, get_name_index_function):
+    """
+    Resolve a name of a pokemon or a nature to a tuple with its saved spelling and its id. Most names are spelled
+    correctly, so the name index is only used after the exact lookup. A ValueError with the suggestions of the name
+    index is raised for an unknown name.
+    """
+
+    resource_id = get_id_function(resource_name)
+
+    if resource_id is not None:
+        return resource_name, resource_id
+
+    name_index = get_name_index_function()
+    saved_name = name_index.get_name(resource_name)
+
+    if saved_name is None:
+        not_found_message = "{} {} was not found.".format(resource_type, resource_name)
+        suggestions = name_index.suggest(resource_name)
+
+        if suggestions:
+            not_found_message += " Did you mean {}?".format(", ".join(suggestions))
+
+        raise ValueError(not_found_message)
+
+    return saved_name, name_index.get_id(saved_name)
+
+
+def resolve_pokemon_row(pokemon_row, species_index, nature_table):
+    """
+    Resolve the name and the nature of a parsed row to the base stats and the nature multipliers of the pokemon. A name
+    with another spelling like "mr mime" for "mr-mime" is resolved with the name index and replaced by the saved
+    spelling in the row. A ValueError is raised for an unknown pokemon or nature.
+    """
+
+    pokemon_row["name"], pokemon_id = resolve_name("Pokemon", pokemon_row["name"], species_index.get_pokemon_id_by_name,
+                                                   species_index.get_name_index)
+
+    pokemon_row["nature"], nature_id = resolve_name("Nature", pokemon_row["nature"],
+                                                    nature_table.get_nature_id_by_name, nature_table.get_name_index)
+
+    return species_index.get_base_stats_row(pokemon_id), nature_table.get_multiplier_rows([nature_id])[0]
+
+
+def get_range_values(iv_ranges):
+    """
+    Transform a dictionary with the minimum and the maximum IV value of every status value to a dictionary with the
+    columns of RANGE_COLUMNS. A status value without a consistent IV value has None as minimum and maximum.
+    """
+
+    range_values = {}
+
+    for value in STATUS_VALUES:
+        iv_range = iv_ranges[value]
+
+        if iv_range is None:
+            iv_range = (None, None)
+
+        range_values["{}_min".format(value)], range_values["{}_max".format(value)] = iv_range
+
+    return range_values
+
+
+def calculate_pokemon_rows(pokemon_rows, resolved_rows):
+    """
+    Calculate the IV values of all parsed rows with their resolved base stats and nature multipliers in one batch. The
+    IV values of the IV calculator are completed by the exact IV ranges, which are calculated like a batch IV narrowing
+    with one observation per pokemon. The result is a list of dictionaries with the columns of RESULT_COLUMNS.
+    """
+
+    if not pokemon_rows:
+        return []
+
+    level_list = [pokemon_row["level"] for pokemon_row in pokemon_rows]
+    stats_list = [[pokemon_row[value] for value in STATUS_VALUES] for pokemon_row in pokemon_rows]
+    ev_list = [[pokemon_row["{}_ev".format(value)] for value in STATUS_VALUES] for pokemon_row in pokemon_rows]
+    nature_list = [nature_row for _, nature_row in resolved_rows]
+    base_stats_list = [base_stats_row for base_stats_row, _ in resolved_rows]
+
+    batch_calculator = BatchIVCalculator(level_list, stats_list, ev_list, nature_list, base_stats_list)
+    iv_result_list = BatchIVCalculator.results_to_dictionaries(batch_calculator.calculate_all_iv_values())
+
+    # Every pokemon is its own history with one observation.
+    batch_narrower = BatchIVNarrower(range(len(pokemon_rows)), level_list,
+                                     [[min(stat_value, MAXIMUM_STAT_VALUE) for stat_value in stats_row]
+                                      for stats_row in stats_list], ev_list, nature_list, base_stats_list)
+    minimum_iv_array, maximum_iv_array = BatchIVNarrower.masks_to_iv_ranges(batch_narrower.narrow_all_histories())
+
+    result_rows = []
+
+    for pokemon_row, iv_result, minimum_iv_row, maximum_iv_row in zip(pokemon_rows, iv_result_list,
+                                                                      minimum_iv_array.tolist(),
+                                                                      maximum_iv_array.tolist()):
+        result_row = {"name": pokemon_row["name"], "level": pokemon_row["level"], "nature": pokemon_row["nature"]}
+        result_row.update(iv_result)
+
+        # A contradiction has -1 as minimum and maximum.
+        iv_ranges = {value: (minimum_iv_value, maximum_iv_value) if minimum_iv_value >= 0 else None
+                     for value, minimum_iv_value, maximum_iv_value in zip(STATUS_VALUES, minimum_iv_row,
+                                                                          maximum_iv_row)}
+
+        result_row.update(get_range_values(iv_ranges))
+        result_rows.append(result_row)
+
+    return result_rows
+
+
+def process_chunk(raw_chunk, species_index, nature_table):
+    """
+    Parse, resolve and calculate a chunk of rows with their row numbers. The result is a tuple with a list of result
+    rows and a list of rejected rows. A rejected row is a dictionary with its row number, the error and the original
+    row, so an invalid row does not stop the calculation.
+    """
+
+    pokemon_rows = []
+    resolved_rows = []
+    rejected_rows = []
+
+    for row_number, raw_row in raw_chunk:
+        try:
+            pokemon_row = parse_pokemon_row(raw_row)
+            resolved_rows.append(resolve_pokemon_row(pokemon_row, species_index, nature_table))
+            pokemon_rows.append(pokemon_row)
+
+        except (KeyError, TypeError, ValueError) as row_error:
+            rejected_rows.append({"row_number": row_number,
+                                  "error": "{}: {}".format(type(row_error).__name__, row_error),
+                                  "row": raw_row if isinstance(raw_row, dict) else None})
+
+    return calculate_pokemon_rows(pokemon_rows, resolved_rows), rejected_rows
+
+
+def serialize_result_rows(result_rows, file_format):
+    """
+    Serialize a list of result rows to the text of a CSV file without its header or to the text of a JSONL file.
+    """
+
+    if file_format == "csv":
+        text_buffer = io.StringIO(newline="")
+        csv.DictWriter(text_buffer, fieldnames=RESULT_COLUMNS).writerows(result_rows)
+
+        return text_buffer.getvalue()
+
+    return "".join(json.dumps(result_row) + "\n" for result_row in result_rows)
+
+
+def process_and_serialize_chunk(raw_chunk, species_index, nature_table, file_format):
+    """
+    Process a chunk like process_chunk and serialize its results for the output file. The result is a tuple with the
+    serialized text, the number of result rows and the list of rejected rows.
+    """
+
+    result_rows, rejected_rows = process_chunk(raw_chunk, species_index, nature_table)
+
+    return serialize_result_rows(result_rows, file_format), len(result_rows), rejected_rows
+
+
+def process_chunks(raw_chunks, species_index, nature_table, file_format):
+    """
+    Process and serialize the chunks one after another in the current process.
+    """
+
+    for raw_chunk in raw_chunks:
+        yield process_and_serialize_chunk(raw_chunk, species_index, nature_table, file_format)
+
+
+# Save the species index and the nature table of a worker process, they are loaded once by its initializer.
+worker_species_index = None
+worker_nature_table = None
+
+
+def initialize_worker(database_path, snapshot_path=None):
+    """
+    Initialize a worker process with its own read only connection to the database file and load the species index and
+    the nature table once for all chunks of this worker. With a snapshot file, the worker maps the snapshot instead of
+    opening the database file.
+    """
+
+    global worker_species_index, worker_nature_table
+
+    if snapshot_path is not None:
+        lookup_source = load_snapshot(snapshot_path)
+
+    else:
+        # Use a new connection manager, because connections of the parent process must not be used in a child process.
+        lookup_source = DatabaseCalculatorHandler(read_only=True, connection_manager=ConnectionManager(database_path))
+
+    worker_species_index = lookup_source.get_species_index()
+    worker_nature_table = lookup_source.get_nature_table()
+
+
+def process_chunk_in_worker(raw_chunk, file_format):
+    """
+    Process and serialize a chunk in a worker process, so the parent process only needs to write the text.
+    """
+
+    return process_and_serialize_chunk(raw_chunk, worker_species_index, worker_nature_table, file_format)
+
+
+def get_finished_chunks(pending_futures, ordered):
+    """
+    Remove finished chunks from the deque of pending futures and return their results. With the ordered mode, only the
+    oldest chunk is returned, as soon as it is finished. Otherwise, every finished chunk is returned.
+    """
+
+    if ordered is True:
+        return [pending_futures.popleft().result()]
+
+    finished_futures, _ = wait(pending_futures, return_when=FIRST_COMPLETED)
+
+    for finished_future in finished_futures:
+        pending_futures.remove(finished_future)
+
+    return [finished_future.result() for finished_future in finished_futures]
+
+
+def process_chunks_in_parallel(raw_chunks, database_path, file_format, process_count, ordered=True,
+                               snapshot_path=None):
+    """
+    Process and serialize the chunks in a pool of worker processes. Only twice as many chunks as workers are pending at
+    the same time, so the reading of the input file waits for the workers and the memory usage stays bounded. The
+    results are returned in the order of the input file or, without the ordered mode, as soon as they are finished.
+    """
+
+    with ProcessPoolExecutor(max_workers=process_count, initializer=initialize_worker,
+                             initargs=(database_path, snapshot_path)) as executor:
+        pending_futures = deque()
+
+        for raw_chunk in raw_chunks:
+            pending_futures.append(executor.submit(process_chunk_in_worker, raw_chunk, file_format))
+
+            # Wait for the workers, if there are enough pending chunks.
+            while len(pending_futures) >= 2 * process_count:
+                yield from get_finished_chunks(pending_futures, ordered)
+
+        while pending_futures:
+            yield from get_finished_chunks(pending_futures, ordered)
+
+
+class ResultWriter:
+    """
+    Create a class for writing result rows chunk by chunk to a CSV or a JSONL file. It is used as a context manager.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.file_format = get_file_format(output_path)
+        self.output_file = None
+
+    def __enter__(self):
+        self.output_file = open(self.output_path, "w", newline="")
+
+        if self.file_format == "csv":
+            csv.DictWriter(self.output_file, fieldnames=RESULT_COLUMNS).writeheader()
+
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        self.output_file.close()
+
+    def write_rows(self, result_rows):
+        """
+        Write a list of result rows to the file.
+        """
+
+        self.write_text(serialize_result_rows(result_rows, self.file_format))
+
+    def write_text(self, serialized_text):
+        """
+        Write result rows, which are already serialized with serialize_result_rows, to the file.
+        """
+
+        self.output_file.write(serialized_text)
+
+
+class RejectWriter:
+    """
+    Create a class for writing rejected rows to a JSONL file. Without a path, the rejected rows are logged. It is used
+    as a context manager.
+    """
+
+    def __init__(self, reject_path=None, input_path=None):
+        self.reject_path = reject_path
+        self.input_path = input_path
+        self.reject_file = None
+
+    def __enter__(self):
+        if self.reject_path is not None:
+            self.reject_file = open(self.reject_path, "w")
+
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        if self.reject_file is not None:
+            self.reject_file.close()
+
+    def write_rows(self, rejected_rows):
+        """
+        Write or log a list of rejected rows.
+        """
+
+        for rejected_row in rejected_rows:
+            if self.reject_file is not None:
+                self.reject_file.write(json.dumps(rejected_row) + "\n")
+
+            else:
+                logging.error("Row {} of {} was skipped: {}".format(rejected_row["row_number"], self.input_path,
+                                                                   rejected_row["error"]))
+
+
+def run_batch_calculation(input_path, output_path, species_index=None, nature_table=None, reject_path=None,
+                          chunk_size=DEFAULT_CHUNK_SIZE, process_count=1, database_path=DEFAULT_DATABASE_PATH,
+                          ordered=True, snapshot_path=None):
+    """
+    Calculate the IV values of all pokemon in the input file and write them to the output file. The file is read,
+    calculated and written chunk by chunk. With one process, the species index and the nature table are loaded once by
+    the caller. With more processes, every worker process loads them from the database file or from the snapshot file
+    and the results are merged in the order of the input file or, without the ordered mode, in the order of their
+    calculation. Invalid rows are written to the reject file or logged, if there is not a reject file. The result is a
+    dictionary with the number of calculated and rejected rows.
+    """
+
+    batch_summary = {"calculated": 0, "rejected": 0}
+
+    with ResultWriter(output_path) as result_writer, RejectWriter(reject_path, input_path) as reject_writer:
+        raw_chunks = chunk_rows(read_pokemon_rows(input_path), chunk_size)
+
+        if process_count > 1:
+            chunk_results = process_chunks_in_parallel(raw_chunks, database_path, result_writer.file_format,
+                                                       process_count, ordered, snapshot_path)
+
+        else:
+            chunk_results = process_chunks(raw_chunks, species_index, nature_table, result_writer.file_format)
+
+        for serialized_text, result_count, rejected_rows in chunk_results:
+            result_writer.write_text(serialized_text)
+            reject_writer.write_rows(rejected_rows)
+
+            batch_summary["calculated"] += result_count
+            batch_summary["rejected"] += len(rejected_rows)
+
+    return batch_summary
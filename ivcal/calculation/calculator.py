@@ -1,3 +1,6 @@
+from ivcal.metrics import timed
+
+
 class IVCalculator:
     """
     Create a class for calculating the IV (individual values) of a pokemon with its specific data and the base data for
@@ -9,6 +12,7 @@ class IVCalculator:
         self.pokemon_input_data = pokemon_input_data_dict
         self.pokemon_base_data = pokemon_base_data_dict
 
+    @timed("ivcal_iv_calculation_seconds")
     def calculate_all_iv_values(self):
         """
         Calculate all iv values and return them in a dictionary.
@@ -1,8 +1,10 @@
 import logging
 
+from ivcal.calculation.nature_table import NatureMultiplierTable, get_nature_table
+from ivcal.calculation.species_index import SpeciesIndex, get_species_index
 from ivcal.database.database_master import MasterDatabaseClass
-
-logging.basicConfig(filename="events.log")
+from ivcal.database.schema_migration import migrate_database
+from ivcal.metrics import timed
 
 
 class DatabaseCalculatorHandler(MasterDatabaseClass):
@@ -10,10 +12,15 @@ class DatabaseCalculatorHandler(MasterDatabaseClass):
     Create a database class for access while dealing with the IV calculator.
     """
 
-    def __init__(self):
+    def __init__(self, read_only=False, connection_manager=None):
         # Use the init function of its parent class.
-        super().__init__()
+        super().__init__(read_only, connection_manager)
+
+        # A read only connection can not migrate the database file, but the queries work with every schema version.
+        if read_only is False:
+            migrate_database(self.database_connection)
 
+    @timed("ivcal_database_query_seconds")
     def get_pokemon_id_by_name(self, pokemon_name):
         """
         Get the id of a pokemon by its name.
@@ -36,6 +43,7 @@ class DatabaseCalculatorHandler(MasterDatabaseClass):
 
         return pokemon_id
 
+    @timed("ivcal_database_query_seconds")
     def get_pokemon_base_stats_by_id(self, pokemon_id):
         """
         Get the base stats of a pokemon by its id.
@@ -67,68 +75,69 @@ class DatabaseCalculatorHandler(MasterDatabaseClass):
 
         return status_dictionary
 
-    def get_nature_id_by_name(self, nature_name):
+    @timed("ivcal_database_query_seconds")
+    def get_all_pokemon_rows(self):
         """
-        Get the id of a nature by its name.
+        Get a list with the id, the name and the six base status values of every pokemon with one query.
         """
 
-        # Execute the query for the nature id based on the parameter name.
-        nature_id_query_result = self.database_cursor.execute("""SELECT nature_id FROM nature_id_name_mapping 
-        WHERE nature_name=?;""", (nature_name,))
+        pokemon_query_result = self.database_cursor.execute("""SELECT pokemon_id_name_mapping.pokemon_id, pokemon_name,
+        pokemon_hp, pokemon_attack, pokemon_defense, pokemon_sp_attack, pokemon_sp_defense, pokemon_speed
+        FROM pokemon_id_name_mapping JOIN pokemon_status_data
+        ON pokemon_id_name_mapping.pokemon_id = pokemon_status_data.pokemon_id;""")
 
-        # Get the result, which is a tuple, if the result query is empty.
-        nature_id_result = nature_id_query_result.fetchone()
+        return pokemon_query_result.fetchall()
 
-        if nature_id_result is not None:
-            nature_id_result = nature_id_result[0]
+    def get_species_index(self):
+        """
+        Get the index with the ids and the base stats of all pokemon. It is loaded only once per database file.
+        """
 
-        else:
-            logging.error("Nature name {} was not found in the database.".format(nature_name))
+        return get_species_index(("local", self.database_path), lambda: SpeciesIndex.from_database(self))
 
-        return nature_id_result
+    @timed("ivcal_database_query_seconds")
+    def get_all_nature_rows(self):
+        """
+        Get a list with the id, the name, the decreased and the increased value of every nature with one query.
+        """
 
-    def get_nature_status_effects(self, nature_id):
+        nature_query_result = self.database_cursor.execute("""SELECT nature_id_name_mapping.nature_id, nature_name,
+        decrease, increase FROM nature_id_name_mapping JOIN nature_status_data
+        ON nature_id_name_mapping.nature_id = nature_status_data.nature_id;""")
+
+        return nature_query_result.fetchall()
+
+    def get_nature_table(self):
         """
-        Get the status effects of a pokemon's nature by the nature id. For every status value as key, a new value is
-        defined in a dictionary.
+        Get the table with the multipliers of all natures. It is loaded only once per database file.
         """
 
-        # Execute the necessary query.
-        nature_effect_query_result = self.database_cursor.execute("""SELECT decrease, increase FROM nature_status_data
-        WHERE nature_id=?;""", (nature_id,))
+        return get_nature_table(("local", self.database_path), lambda: NatureMultiplierTable.from_database(self))
 
-        # Get the result of the query. This will be a tuple, if it is not None.
-        nature_effect_result = nature_effect_query_result.fetchone()
+    def get_nature_id_by_name(self, nature_name):
+        """
+        Get the id of a nature by its name.
+        """
 
-        # If the result is not None, the results of the query are not empty.
-        if nature_effect_result is not None:
-            # Define the different status values.
-            status_values = ["attack", "defense", "special-attack", "special-defense", "speed"]
-            # Create a dictionary for saving the results.
-            nature_effect_dictionary = {}
+        # Use the preloaded table instead of a query.
+        nature_id_result = self.get_nature_table().get_nature_id_by_name(nature_name)
 
-            # Check the effect of the nature on every value.
-            for value in status_values:
-                # Prepare a key for compatibility with the IV calculator.
-                nature_key = "{}_nature".format(value)
+        if nature_id_result is None:
+            logging.error("Nature name {} was not found in the database.".format(nature_name))
 
-                # This value is the decreased one.
-                if value == nature_effect_result[0]:
-                    # Set the effect to 0.9 as decreased value.
-                    nature_effect_dictionary[nature_key] = 0.9
+        return nature_id_result
 
-                # This value is the increased one.
-                elif value == nature_effect_result[1]:
-                    # Set the effect to 1.1 as increased value.
-                    nature_effect_dictionary[nature_key] = 1.1
+    def get_nature_status_effects(self, nature_id):
+        """
+        Get the status effects of a pokemon's nature by the nature id. For every status value as key, a new value is
+        defined in a read only dictionary.
+        """
 
-                # If a value is not decreased or increased, there is no effect.
-                else:
-                    nature_effect_dictionary[nature_key] = 1
+        # The effects of every nature are precalculated in the nature table.
+        nature_effect_dictionary = self.get_nature_table().get_nature_status_effects(nature_id)
 
-        else:
+        if nature_effect_dictionary is None:
             # If the nature id is not found, the return value will be None.
-            nature_effect_dictionary = None
             logging.error("Nature id {} was not found in the database.".format(nature_id))
 
         return nature_effect_dictionary
@@ -0,0 +1,143 @@
+"""
+In this file, the narrowing of IV values over many observations of the same pokemon is defined. One observation is a
+snapshot of the level, the status values and the effort values, for example after a level-up. The possible IV values of
+every status value are saved as a 32-bit mask, in which the bit of an IV value is set, if the IV value is still
+possible. Every observation is intersected with these masks, so the possible IV values get fewer with every
+observation.
+"""
+
+from ivcal.calculation.iv_range_solver import find_iv_range, get_nature_percentage, get_stat_table, \
+    POSSIBLE_IV_VALUES
+
+# Define the order of the status values.
+STATUS_VALUES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+# Define the mask with all 32 possible IV values.
+ALL_CANDIDATES_MASK = (1 << len(POSSIBLE_IV_VALUES)) - 1
+
+
+def create_range_mask(minimum_iv_value, maximum_iv_value):
+    """
+    Create a mask with the bits of all IV values between the minimum and the maximum IV value.
+    """
+
+    return ((1 << (maximum_iv_value + 1)) - 1) ^ ((1 << minimum_iv_value) - 1)
+
+
+def mask_to_iv_values(candidate_mask):
+    """
+    Transform a mask to a list with its IV values.
+    """
+
+    return [iv_value for iv_value in POSSIBLE_IV_VALUES if candidate_mask >> iv_value & 1]
+
+
+def get_candidate_mask(stat_table, stat_value):
+    """
+    Get the mask of the IV values in a stat table, which result in the given status value. The mask is 0, if there is
+    not a consistent IV value.
+    """
+
+    iv_range = find_iv_range(stat_table, stat_value)
+
+    if iv_range is None:
+        return 0
+
+    return create_range_mask(*iv_range)
+
+
+class IVNarrower:
+    """
+    Create a class for narrowing the IV values of one pokemon over many observations. The base data dictionary is the
+    same as for the class IVCalculator and every observation is an input data dictionary like for IVCalculator. If an
+    observation leaves no possible IV value for a status value, there is a contradiction. It is saved with the number
+    of the observation, the possible IV values before it and the IV values of the observation, so wrong data can be
+    found.
+    """
+
+    def __init__(self, pokemon_base_data_dict):
+        # Make the parameter class-wide accessible.
+        self.pokemon_base_data = pokemon_base_data_dict
+
+        # Every IV value is possible before the first observation.
+        self.candidate_masks = {value: ALL_CANDIDATES_MASK for value in STATUS_VALUES}
+
+        self.observation_count = 0
+        self.contradictions = []
+
+    def get_observation_masks(self, pokemon_input_data_dict):
+        """
+        Get a dictionary with the mask of the IV values, which are consistent with one observation, for every status
+        value.
+        """
+
+        observation_masks = {}
+
+        for value in STATUS_VALUES:
+            # HP is not influenced by a nature.
+            if value == "hp":
+                is_hp = True
+                nature_percentage = 100
+
+            else:
+                is_hp = False
+                nature_percentage = get_nature_percentage(pokemon_input_data_dict["{}_nature".format(value)])
+
+            stat_table = get_stat_table(self.pokemon_base_data[value], pokemon_input_data_dict["level"],
+                                        pokemon_input_data_dict["{}_ev".format(value)], nature_percentage, is_hp)
+
+            observation_masks[value] = get_candidate_mask(stat_table, pokemon_input_data_dict[value])
+
+        return observation_masks
+
+    def add_observation(self, pokemon_input_data_dict):
+        """
+        Intersect the possible IV values with the IV values of one observation. The result is a list with the status
+        values, which are contradictory after this observation, so an empty list is a consistent observation.
+        """
+
+        contradictory_values = []
+
+        for value, observation_mask in self.get_observation_masks(pokemon_input_data_dict).items():
+            candidate_mask = self.candidate_masks[value] & observation_mask
+
+            # Only the first contradiction of a status value is saved, because all following ones are a result of it.
+            if candidate_mask == 0 and self.candidate_masks[value] != 0:
+                self.contradictions.append({"observation": self.observation_count,
+                                            "value": value,
+                                            "candidates": mask_to_iv_values(self.candidate_masks[value]),
+                                            "observed": mask_to_iv_values(observation_mask)})
+                contradictory_values.append(value)
+
+            self.candidate_masks[value] = candidate_mask
+
+        self.observation_count += 1
+
+        return contradictory_values
+
+    def add_observations(self, pokemon_input_data_list):
+        """
+        Add a list of observations in their order. The result is a list with the contradictory status values.
+        """
+
+        contradictory_values = []
+
+        for pokemon_input_data_dict in pokemon_input_data_list:
+            contradictory_values.extend(self.add_observation(pokemon_input_data_dict))
+
+        return contradictory_values
+
+    def get_candidate_sets(self):
+        """
+        Get a dictionary with a list of the possible IV values for every status value. An empty list is the result of a
+        contradiction.
+        """
+
+        return {value: mask_to_iv_values(candidate_mask) for value, candidate_mask in self.candidate_masks.items()}
+
+    def is_consistent(self):
+        """
+        Check, if every status value has at least one possible IV value.
+        """
+
+        return not self.contradictions
@@ -0,0 +1,120 @@
+"""
+In this file, an exact solver for IV ranges is defined. Instead of inverting the stat formula with a floating point
+division, the stat formula is calculated forward for every possible IV value. These tables are cached, so the IV values
+consistent with a status value can be found with a binary search.
+"""
+
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+from ivcal.metrics import get_metrics_registry, timed
+
+# Every IV value is an integer number between 0 and 31.
+POSSIBLE_IV_VALUES = range(0, 32)
+
+
+def get_nature_percentage(nature_multiplier):
+    """
+    Transform a nature multiplier like 0.9, 1 or 1.1 to an integer percentage, so the stat formula can be calculated
+    without floating point issues.
+    """
+
+    return int(round(nature_multiplier * 100))
+
+
+def calculate_stat_value(base_value, level, ev_value, iv_value, nature_percentage=100, is_hp=False):
+    """
+    Calculate the status value of a pokemon with the stat formula. This is the other way around compared with the
+    calculation of the IV value.
+    """
+
+    # Both formulas share the first part, every division is rounded down.
+    stat_core = ((2 * base_value + iv_value + ev_value // 4) * level) // 100
+
+    # The HP value has its own formula.
+    if is_hp is True:
+        return stat_core + level + 10
+
+    # The nature effect is calculated as percentage and rounded down.
+    return ((stat_core + 5) * nature_percentage) // 100
+
+
+@lru_cache(maxsize=65536)
+def get_stat_table(base_value, level, ev_value, nature_percentage=100, is_hp=False):
+    """
+    Get a tuple with the status value for every possible IV value for one key of base value, level, ev value and nature.
+    The status value never decreases with a larger IV value, so the tuple is sorted.
+    """
+
+    return tuple(calculate_stat_value(base_value, level, ev_value, iv_value, nature_percentage, is_hp)
+                 for iv_value in POSSIBLE_IV_VALUES)
+
+
+# The hit rate of the cached stat tables is a part of the metrics.
+get_metrics_registry().register_cache_info("stat_table", get_stat_table.cache_info)
+
+
+def find_iv_range(stat_table, stat_value):
+    """
+    Find the range of IV values in a stat table, which result in the given status value. The result is a tuple with the
+    minimum and the maximum IV value or None, if there is not a consistent IV value.
+    """
+
+    # Use a binary search for the first and the last position of the status value.
+    first_position = bisect_left(stat_table, stat_value)
+    last_position = bisect_right(stat_table, stat_value)
+
+    # The status value is not in the table, so the input data is not consistent.
+    if first_position == last_position:
+        return None
+
+    return first_position, last_position - 1
+
+
+class IVRangeSolver:
+    """
+    Create a class for finding the exact range of IV values of a pokemon. It uses the same dictionaries as the class
+    IVCalculator, but the result for every status value is a tuple with a minimum and a maximum IV value.
+    """
+
+    def __init__(self, pokemon_input_data_dict, pokemon_base_data_dict):
+        # Make the parameters class-wide accessible.
+        self.pokemon_input_data = pokemon_input_data_dict
+        self.pokemon_base_data = pokemon_base_data_dict
+
+    @timed("ivcal_iv_calculation_seconds")
+    def calculate_all_iv_ranges(self):
+        """
+        Calculate all IV ranges and return them in a dictionary. A status value without a consistent IV value has None
+        as result.
+        """
+
+        # Create an empty dictionary for the results
+        iv_range_dictionary = {}
+
+        # Define the values, which should be calculated for iterating over them.
+        values_to_calculate = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+        for value in values_to_calculate:
+            iv_range_dictionary[value] = self.calculate_single_iv_range(value)
+
+        return iv_range_dictionary
+
+    def calculate_single_iv_range(self, specific_value):
+        """
+        Calculate the IV range for one status value with the cached stat table for its key.
+        """
+
+        # HP is not influenced by a nature.
+        if specific_value == "hp":
+            is_hp = True
+            nature_percentage = 100
+
+        else:
+            is_hp = False
+            nature_percentage = get_nature_percentage(self.pokemon_input_data["{}_nature".format(specific_value)])
+
+        stat_table = get_stat_table(self.pokemon_base_data[specific_value], self.pokemon_input_data["level"],
+                                    self.pokemon_input_data["{}_ev".format(specific_value)], nature_percentage, is_hp)
+
+        return find_iv_range(stat_table, self.pokemon_input_data[specific_value])
@@ -0,0 +1,222 @@
+"""
+In this file, an index for the names of all pokemon or all natures is defined. It finds a name by its exact spelling, by
+its normalized spelling without case, spaces and punctuation, by a prefix and by a small edit distance, so a misspelled
+name gets suggestions without a query or an API call.
+"""
+
+import bisect
+import unicodedata
+from types import MappingProxyType
+
+# Define the replacements of characters, which are part of names, but have another spelling in the PokéAPI.
+CHARACTER_REPLACEMENTS = {"♀": "f", "♂": "m"}
+
+# Define the default maximum edit distance and the default number of suggestions.
+DEFAULT_MAX_DISTANCE = 2
+DEFAULT_SUGGESTION_LIMIT = 5
+
+
+def normalize_name(name):
+    """
+    Normalize a name for comparisons. The name is written in lower case, accents are removed and only letters and
+    digits are kept, so "Mr. Mime", "mr mime" and "mr-mime" have the same normalized name "mrmime".
+    """
+
+    name = "".join(CHARACTER_REPLACEMENTS.get(character, character) for character in str(name).lower())
+
+    # Split the accents from their letters, so they can be removed like the other characters.
+    name = unicodedata.normalize("NFKD", name)
+
+    return "".join(character for character in name if character.isascii() and character.isalnum())
+
+
+def get_edit_distance(first_name, second_name, max_distance):
+    """
+    Get the edit distance between two names, which counts inserted, deleted and replaced characters and swapped
+    neighbours. The calculation stops, if the distance is larger than the maximum distance, and the result is the
+    maximum distance plus 1 in this case.
+    """
+
+    if abs(len(first_name) - len(second_name)) > max_distance:
+        return max_distance + 1
+
+    # Save the last two rows of the distance matrix.
+    previous_row = None
+    current_row = list(range(len(second_name) + 1))
+
+    for first_position in range(1, len(first_name) + 1):
+        previous_row, current_row, next_row = current_row, [first_position], previous_row
+
+        for second_position in range(1, len(second_name) + 1):
+            replace_cost = 0 if first_name[first_position - 1] == second_name[second_position - 1] else 1
+
+            distance = min(previous_row[second_position] + 1,
+                           current_row[second_position - 1] + 1,
+                           previous_row[second_position - 1] + replace_cost)
+
+            # Swapped neighbours count as one edit.
+            if first_position > 1 and second_position > 1 \
+                    and first_name[first_position - 1] == second_name[second_position - 2] \
+                    and first_name[first_position - 2] == second_name[second_position - 1]:
+                distance = min(distance, next_row[second_position - 2] + 1)
+
+            current_row.append(distance)
+
+        if min(current_row) > max_distance:
+            return max_distance + 1
+
+    return min(current_row[-1], max_distance + 1)
+
+
+def get_deletions(name, max_distance):
+    """
+    Get a set of all names, which are created by deleting up to the maximum distance of characters of a name.
+    """
+
+    deletions = {name}
+    current_deletions = {name}
+
+    for _ in range(max_distance):
+        current_deletions = {deletion[:position] + deletion[position + 1:]
+                             for deletion in current_deletions for position in range(len(deletion))}
+        deletions.update(current_deletions)
+
+    return deletions
+
+
+class NameIndex:
+    """
+    Create a class for an immutable index of names with their ids. Two names with a small edit distance share a name,
+    which is created by deleting some of their characters. The deletions of all names are saved with the first search,
+    so a search only compares the names with a common deletion instead of all names.
+    """
+
+    def __init__(self, id_name_pairs, max_distance=DEFAULT_MAX_DISTANCE):
+        ids_by_name = {}
+        names_by_normalized_name = {}
+
+        for resource_id, resource_name in id_name_pairs:
+            ids_by_name[resource_name] = resource_id
+            names_by_normalized_name.setdefault(normalize_name(resource_name), []).append(resource_name)
+
+        self.ids_by_name = MappingProxyType(ids_by_name)
+        self.max_distance = max_distance
+
+        # A normalized name is only unique, if it belongs to one name.
+        self.names_by_normalized_name = MappingProxyType({normalized_name: tuple(resource_names) for normalized_name,
+                                                          resource_names in names_by_normalized_name.items()})
+
+        # Sort the normalized names for the search with a prefix.
+        self.sorted_normalized_names = sorted(self.names_by_normalized_name)
+
+        # The index of the deletions is only created for the first search with an edit distance.
+        self.deletion_index = None
+
+    def __len__(self):
+        return len(self.ids_by_name)
+
+    def get_name(self, resource_name):
+        """
+        Get the saved spelling of a name by its exact or its normalized spelling. The result is None, if the name does
+        not exist or if its normalized spelling belongs to more than one name.
+        """
+
+        if resource_name in self.ids_by_name:
+            return resource_name
+
+        resource_names = self.names_by_normalized_name.get(normalize_name(resource_name), ())
+
+        if len(resource_names) == 1:
+            return resource_names[0]
+
+        return None
+
+    def get_id(self, resource_name):
+        """
+        Get the id of a name by its exact or its normalized spelling. The result is None, if the name is not found.
+        """
+
+        return self.ids_by_name.get(self.get_name(resource_name))
+
+    def find_by_prefix(self, prefix, limit=DEFAULT_SUGGESTION_LIMIT):
+        """
+        Get a sorted list of the names, which start with a prefix in their normalized spelling.
+        """
+
+        normalized_prefix = normalize_name(prefix)
+        matching_names = []
+
+        # The normalized names with the prefix are next to each other in the sorted list.
+        for position in range(bisect.bisect_left(self.sorted_normalized_names, normalized_prefix),
+                              len(self.sorted_normalized_names)):
+            normalized_name = self.sorted_normalized_names[position]
+
+            if not normalized_name.startswith(normalized_prefix) or len(matching_names) >= limit:
+                break
+
+            matching_names.extend(self.names_by_normalized_name[normalized_name])
+
+        return matching_names[:limit]
+
+    def get_deletion_index(self):
+        """
+        Get the index of the deletions with the normalized names, which they are created from.
+        """
+
+        # Two threads may create the index at the same time, but both results are equal.
+        if self.deletion_index is None:
+            deletion_index = {}
+
+            for normalized_name in self.sorted_normalized_names:
+                for deletion in get_deletions(normalized_name, self.max_distance):
+                    deletion_index.setdefault(deletion, []).append(normalized_name)
+
+            self.deletion_index = deletion_index
+
+        return self.deletion_index
+
+    def find_similar(self, resource_name, max_distance=None, limit=DEFAULT_SUGGESTION_LIMIT):
+        """
+        Get a list of the names, whose normalized spelling has an edit distance up to the maximum distance to the
+        normalized spelling of the name, sorted by their distance. Short names only allow a smaller distance, so there
+        are not too many suggestions for them.
+        """
+
+        if max_distance is None:
+            max_distance = self.max_distance
+
+        normalized_name = normalize_name(resource_name)
+        max_distance = min(max_distance, self.max_distance, len(normalized_name) // 3)
+
+        deletion_index = self.get_deletion_index()
+        candidate_names = set()
+
+        for deletion in get_deletions(normalized_name, max_distance):
+            candidate_names.update(deletion_index.get(deletion, ()))
+
+        similar_names = []
+
+        for candidate_name in candidate_names:
+            distance = get_edit_distance(normalized_name, candidate_name, max_distance)
+
+            if distance <= max_distance:
+                similar_names.extend((distance, similar_name)
+                                     for similar_name in self.names_by_normalized_name[candidate_name])
+
+        similar_names.sort()
+
+        return [similar_name for _, similar_name in similar_names[:limit]]
+
+    def suggest(self, resource_name, limit=DEFAULT_SUGGESTION_LIMIT):
+        """
+        Get a list of suggestions for a name. The names with the same normalized spelling are first, then the similar
+        names and then the names with the name as prefix.
+        """
+
+        suggestions = list(self.names_by_normalized_name.get(normalize_name(resource_name), ()))
+
+        for suggestion in self.find_similar(resource_name, limit=limit) + self.find_by_prefix(resource_name, limit):
+            if suggestion not in suggestions:
+                suggestions.append(suggestion)
+
+        return suggestions[:limit]
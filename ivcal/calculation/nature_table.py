@@ -0,0 +1,156 @@
+"""
+In this file, a table for the multipliers of all natures is defined. There are only 25 natures, so they are loaded once
+and every nature lookup is a dictionary access instead of a query or an API call.
+"""
+
+import threading
+from types import MappingProxyType
+
+from ivcal.calculation.name_index import NameIndex
+from ivcal.metrics import get_metrics_registry
+
+# Define the status values, which can be influenced by a nature, in the order of the multiplier rows.
+NATURE_STATUS_VALUES = ["attack", "defense", "special-attack", "special-defense", "speed"]
+
+# Define the number of natures, which exist in the database file or in the API.
+NATURE_COUNT = 25
+
+
+def build_nature_effect(decreased_value, increased_value):
+    """
+    Build a tuple with the multiplier of the nature for every status value in NATURE_STATUS_VALUES. The decreased value
+    has 0.9, the increased value has 1.1 and all the other values have 1 as multiplier.
+    """
+
+    multiplier_list = []
+
+    for value in NATURE_STATUS_VALUES:
+        if value == decreased_value:
+            multiplier_list.append(0.9)
+
+        elif value == increased_value:
+            multiplier_list.append(1.1)
+
+        else:
+            multiplier_list.append(1)
+
+    return tuple(multiplier_list)
+
+
+class NatureMultiplierTable:
+    """
+    Create a class for an immutable table with the precalculated multipliers of all natures. The table is indexed by the
+    nature id and by the nature name and the dictionaries with the nature effects are read only, so they can be shared.
+    """
+
+    def __init__(self, nature_rows):
+        # Every row is a tuple with the id, the name, the decreased value and the increased value of a nature.
+        nature_ids_by_name = {}
+        multiplier_rows_by_id = {}
+        nature_effects_by_id = {}
+
+        for nature_id, nature_name, decreased_value, increased_value in nature_rows:
+            multiplier_row = build_nature_effect(decreased_value, increased_value)
+
+            nature_ids_by_name[nature_name] = nature_id
+            multiplier_rows_by_id[nature_id] = multiplier_row
+
+            # Prepare the keys for compatibility with the IV calculator.
+            nature_effects_by_id[nature_id] = MappingProxyType({"{}_nature".format(value): multiplier for value,
+                                                                multiplier in zip(NATURE_STATUS_VALUES,
+                                                                                  multiplier_row)})
+
+        self.nature_ids_by_name = MappingProxyType(nature_ids_by_name)
+        self.multiplier_rows_by_id = MappingProxyType(multiplier_rows_by_id)
+        self.nature_effects_by_id = MappingProxyType(nature_effects_by_id)
+
+        # The index of the names is only created for the first search of a misspelled name.
+        self.name_index = None
+
+    def __len__(self):
+        return len(self.multiplier_rows_by_id)
+
+    @classmethod
+    def from_database(cls, database_handler):
+        """
+        Load the table with one query of a database handler for the calculator.
+        """
+
+        return cls(database_handler.get_all_nature_rows())
+
+    @classmethod
+    def from_api(cls, api_client):
+        """
+        Load the table with the API client. Every nature is fetched only once.
+        """
+
+        nature_rows = []
+
+        for nature_id in range(1, NATURE_COUNT + 1):
+            nature_id, nature_name, nature_effect_container = api_client.fetch_nature_data(nature_id)
+
+            # Skip the natures with API errors, they are logged by the API client.
+            if nature_name is not None:
+                nature_rows.append((nature_id, nature_name, nature_effect_container["decreased"],
+                                    nature_effect_container["increased"]))
+
+        return cls(nature_rows)
+
+    def get_nature_id_by_name(self, nature_name):
+        """
+        Get the id of a nature by its name. The result is None, if the nature does not exist.
+        """
+
+        return self.nature_ids_by_name.get(nature_name)
+
+    def get_name_index(self):
+        """
+        Get the index of the nature names for the search with a normalized spelling, a prefix or an edit distance.
+        """
+
+        if self.name_index is None:
+            self.name_index = NameIndex((nature_id, nature_name) for nature_name, nature_id
+                                        in self.nature_ids_by_name.items())
+
+        return self.name_index
+
+    def get_nature_status_effects(self, nature_id):
+        """
+        Get the read only dictionary with the effect of a nature on every status value, like it is used by the IV
+        calculator. The result is None, if the nature does not exist.
+        """
+
+        return self.nature_effects_by_id.get(nature_id)
+
+    def get_multiplier_rows(self, nature_id_list):
+        """
+        Get a list with the tuple of multipliers for every nature id in the list, in the order of NATURE_STATUS_VALUES.
+        This is the format of the nature array for the batch IV calculation.
+        """
+
+        return [self.multiplier_rows_by_id[nature_id] for nature_id in nature_id_list]
+
+
+# Save the loaded tables for every data source, so every table is only loaded once per process.
+loaded_nature_tables = {}
+nature_table_lock = threading.Lock()
+
+
+def get_nature_table(data_source_key, load_table_function):
+    """
+    Get the nature table of a data source like ("local", "pokemon.db") or ("api",). The table is loaded with the load
+    function for the first usage. An incomplete table, for example before the first data collection, is not kept, so it
+    is loaded again for the next usage.
+    """
+
+    with nature_table_lock:
+        nature_table = loaded_nature_tables.get(data_source_key)
+        get_metrics_registry().count_cache_lookup("nature_table", nature_table is not None)
+
+        if nature_table is None:
+            nature_table = load_table_function()
+
+            if len(nature_table) == NATURE_COUNT:
+                loaded_nature_tables[data_source_key] = nature_table
+
+    return nature_table
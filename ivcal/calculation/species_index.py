@@ -0,0 +1,108 @@
+"""
+In this file, an index for the ids and the base stats of all pokemon is defined. It is loaded once, so many pokemon can
+be resolved without a query for every single pokemon.
+"""
+
+import threading
+from types import MappingProxyType
+
+from ivcal.calculation.name_index import NameIndex
+from ivcal.metrics import get_metrics_registry
+
+# Define the order of the base status values in the rows of the index.
+STATUS_VALUES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+
+class SpeciesIndex:
+    """
+    Create a class for an immutable index of all pokemon. The index maps the name of a pokemon to its id and the id to a
+    tuple with its base status values in the order of STATUS_VALUES.
+    """
+
+    def __init__(self, pokemon_rows):
+        # Every row is a tuple with the id, the name and the six base status values of a pokemon.
+        pokemon_ids_by_name = {}
+        base_stats_by_id = {}
+
+        for pokemon_row in pokemon_rows:
+            pokemon_ids_by_name[pokemon_row[1]] = pokemon_row[0]
+            base_stats_by_id[pokemon_row[0]] = tuple(pokemon_row[2:8])
+
+        self.pokemon_ids_by_name = MappingProxyType(pokemon_ids_by_name)
+        self.base_stats_by_id = MappingProxyType(base_stats_by_id)
+
+        # The index of the names is only created for the first search of a misspelled name.
+        self.name_index = None
+
+    def __len__(self):
+        return len(self.base_stats_by_id)
+
+    @classmethod
+    def from_database(cls, database_handler):
+        """
+        Load the index with one query of a database handler for the calculator.
+        """
+
+        return cls(database_handler.get_all_pokemon_rows())
+
+    def get_pokemon_id_by_name(self, pokemon_name):
+        """
+        Get the id of a pokemon by its name. The result is None, if the pokemon does not exist.
+        """
+
+        return self.pokemon_ids_by_name.get(pokemon_name)
+
+    def get_name_index(self):
+        """
+        Get the index of the pokemon names for the search with a normalized spelling, a prefix or an edit distance.
+        """
+
+        if self.name_index is None:
+            self.name_index = NameIndex((pokemon_id, pokemon_name) for pokemon_name, pokemon_id
+                                        in self.pokemon_ids_by_name.items())
+
+        return self.name_index
+
+    def get_base_stats_row(self, pokemon_id):
+        """
+        Get the tuple with the base status values of a pokemon by its id. The result is None, if the pokemon does not
+        exist.
+        """
+
+        return self.base_stats_by_id.get(pokemon_id)
+
+    def get_pokemon_base_stats_by_id(self, pokemon_id):
+        """
+        Get the base stats of a pokemon by its id as dictionary, like it is used by the IV calculator.
+        """
+
+        base_stats_row = self.base_stats_by_id.get(pokemon_id)
+
+        if base_stats_row is None:
+            return None
+
+        return dict(zip(STATUS_VALUES, base_stats_row))
+
+
+# Save the loaded indexes for every data source, so every index is only loaded once per process.
+loaded_species_indexes = {}
+species_index_lock = threading.Lock()
+
+
+def get_species_index(data_source_key, load_index_function):
+    """
+    Get the species index of a data source like ("local", "pokemon.db"). The index is loaded with the load function for
+    the first usage. An empty index, for example before the first data collection, is not kept.
+    """
+
+    with species_index_lock:
+        species_index = loaded_species_indexes.get(data_source_key)
+        get_metrics_registry().count_cache_lookup("species_index", species_index is not None)
+
+        if species_index is None:
+            species_index = load_index_function()
+
+            if len(species_index) > 0:
+                loaded_species_indexes[data_source_key] = species_index
+
+    return species_index
@@ -1,8 +1,7 @@
 import logging
 
 from ivcal.calculation.calculator_database import DatabaseCalculatorHandler
-
-logging.basicConfig(filename="events.log")
+from ivcal.calculation.nature_table import NatureMultiplierTable, get_nature_table
 
 
 class UserInteraction:
@@ -68,17 +67,21 @@ class UserInteraction:
             # Pokemon names are stored in lower case.
             pokemon_user_name = input("What is the name of your pokemon? ").lower()
 
-            # Save the name of the current pokemon.
-            self.current_pokemon_data["name"] = pokemon_user_name
-
             if self.data_source == "local":
-                pokemon_id = self.database_handler.get_pokemon_id_by_name(pokemon_user_name)
+                # Use the name index of the preloaded species index, which also finds other spellings like "mr mime",
+                # instead of a query for every try.
+                name_index = self.database_handler.get_species_index().get_name_index()
+                pokemon_user_name, pokemon_id = self.find_name(pokemon_user_name, name_index)
 
             else:
+                name_index = None
                 pokemon_id = self.api_client.fetch_pokemon_id_with_name(pokemon_user_name)
 
+            # Save the name of the current pokemon.
+            self.current_pokemon_data["name"] = pokemon_user_name
+
             if pokemon_id is None:
-                print("Pokemon not found! Please try again.")
+                self.show_not_found("Pokemon", pokemon_user_name, name_index)
 
         # After leaving the while loop with correct input, the id is stored in the dictionary for pokemon data.
         self.current_pokemon_data["id"] = pokemon_id
@@ -201,20 +204,46 @@ class UserInteraction:
             # Nature names are stored in lower case.
             nature_name = input("What is the nature of your pokemon? ").lower()
 
-            if self.data_source == "local":
-                nature_id = self.database_handler.get_nature_id_by_name(nature_name)
-
-            else:
-                nature_id = self.api_client.fetch_nature_id_with_name(nature_name)
+            # Both data sources have a preloaded nature table with a name index.
+            name_index = self.get_nature_table().get_name_index()
+            nature_name, nature_id = self.find_name(nature_name, name_index)
 
             if nature_id is None:
-                print("Nature not found! Please try again.")
+                self.show_not_found("Nature", nature_name, name_index)
 
         # After leaving the while loop with correct input, the id is stored in the dictionary for pokemon data.
         self.current_pokemon_data["nature_id"] = nature_id
 
         self.get_nature_influence_stats()
 
+    @staticmethod
+    def find_name(user_name, name_index):
+        """
+        Find a name of the user in a name index. The result is a tuple with the saved spelling of the name and its id.
+        If the name is not found, the result is the name of the user and None.
+        """
+
+        saved_name = name_index.get_name(user_name)
+
+        if saved_name is None:
+            return user_name, None
+
+        return saved_name, name_index.get_id(saved_name)
+
+    @staticmethod
+    def show_not_found(resource_type, user_name, name_index=None):
+        """
+        Show the user, that a pokemon or a nature was not found, with the suggestions of the name index.
+        """
+
+        suggestions = name_index.suggest(user_name) if name_index is not None else []
+
+        if suggestions:
+            print("{} not found! Did you mean {}? Please try again.".format(resource_type, ", ".join(suggestions)))
+
+        else:
+            print("{} not found! Please try again.".format(resource_type))
+
     def get_pokemon_base_stats(self):
         """
         Get the base stats of a pokemon by the given method.
@@ -239,39 +268,27 @@ class UserInteraction:
         """
 
         if self.data_source == "local":
-            # Ask the local database.
+            # Ask the local database, which uses its preloaded nature table.
             nature_effect_result = self.database_handler.get_nature_status_effects(self.current_pokemon_data[
                                                                                        "nature_id"])
 
         else:
-            # Use the api function, which returns a dictionary with a decreased and an increased value.
-            nature_effect_dict = self.api_client.fetch_nature_with_status_effect(self.current_pokemon_data["nature_id"])
-
-            # Make a list of potential influenced natures for iterating.
-            influenced_natures = ["attack", "defense", "special-attack", "special-defense", "speed"]
-
-            # Make a dictionary for saving the results.
-            nature_effect_result = {}
-
-            for nature in influenced_natures:
-                # Define the nature effect for its further use in the application and in the dictionary.
-                nature_effect = "{}_nature".format(nature)
+            # Use the nature table, which is fetched once with the api.
+            nature_effect_result = self.get_nature_table().get_nature_status_effects(self.current_pokemon_data[
+                                                                                         "nature_id"])
 
-                # Check for decreased nature.
-                if nature == nature_effect_dict["decreased"]:
-                    # Set the value to 0.9
-                    nature_effect_result[nature_effect] = 0.9
+        # Update the class-wide dictionary with the new data
+        self.current_pokemon_data.update(nature_effect_result)
 
-                # Check for increased nature.
-                elif nature == nature_effect_dict["increased"]:
-                    # Set the value to 1.1
-                    nature_effect_result[nature_effect] = 1.1
+    def get_nature_table(self):
+        """
+        Get the table with the multipliers of all natures for the data source. The table is only loaded once.
+        """
 
-                else:
-                    nature_effect_result[nature_effect] = 1
+        if self.data_source == "local":
+            return self.database_handler.get_nature_table()
 
-        # Update the class-wide dictionary with the new data
-        self.current_pokemon_data.update(nature_effect_result)
+        return get_nature_table(("api",), lambda: NatureMultiplierTable.from_api(self.api_client))
 
     def show_iv_result(self, iv_calculation_result):
         """
@@ -2,8 +2,32 @@ import logging
 
 from .call_api import APIClient
 from ivcal.database.database_master import MasterDatabaseClass
+from ivcal.database.schema_migration import migrate_database
+from ivcal.metrics import timed
 
-logging.basicConfig(filename="events.log")
+# Define the number of rows, which are written in one transaction as default.
+DEFAULT_BATCH_SIZE = 100
+
+# Define the queries for inserting data, so single and bulk inserts use the same statements. Existing rows are replaced,
+# so a collection run can repeat the rows of an interrupted run.
+POKEMON_STATUS_INSERT_QUERY = '''INSERT OR REPLACE INTO pokemon_status_data (pokemon_id, pokemon_hp, pokemon_attack,
+    pokemon_defense, pokemon_sp_attack, pokemon_sp_defense, pokemon_speed) VALUES (?, ?, ?, ?, ?, ?, ?);'''
+
+POKEMON_ID_NAME_INSERT_QUERY = '''INSERT OR REPLACE INTO pokemon_id_name_mapping (pokemon_id, pokemon_name)
+    VALUES (?, ?);'''
+
+NATURE_STATUS_INSERT_QUERY = '''INSERT OR REPLACE INTO nature_status_data (nature_id, decrease, increase)
+    VALUES (?, ?, ?);'''
+
+NATURE_ID_NAME_INSERT_QUERY = '''INSERT OR REPLACE INTO nature_id_name_mapping (nature_id, nature_name)
+    VALUES (?, ?);'''
+
+CHECKPOINT_INSERT_QUERY = '''INSERT OR REPLACE INTO collection_checkpoint (resource_type, resource_id, status)
+    VALUES (?, ?, ?);'''
+
+# Define the tables with their id column, which need to contain an id before a pokemon or a nature is complete.
+POKEMON_TABLES = [("pokemon_status_data", "pokemon_id"), ("pokemon_id_name_mapping", "pokemon_id")]
+NATURE_TABLES = [("nature_status_data", "nature_id"), ("nature_id_name_mapping", "nature_id")]
 
 
 class DatabaseAPIHandler(MasterDatabaseClass):
@@ -12,34 +36,83 @@ class DatabaseAPIHandler(MasterDatabaseClass):
     class.
     """
 
-    def __init__(self):
-        # Use the init function of its parent class.
-        super().__init__()
-        # Get a client for API calls.
-        self.api_client = APIClient()
+    def __init__(self, connection_manager=None, api_client=None):
+        # Use the init function of its parent class. The collection writes, so the connection can not be read only.
+        super().__init__(connection_manager=connection_manager)
+        # Get a client for API calls, if there is not a given one.
+        if api_client is None:
+            api_client = APIClient()
+
+        self.api_client = api_client
 
         self.init_database()
 
     def init_database(self):
         """
-        Initialize tables in the database file, if they are not there already.
+        Initialize tables in the database file, if they are not there already. An existing database file is migrated to
+        the current schema.
+        """
+
+        migrate_database(self.database_connection)
+
+    def get_existing_ids(self, table_name, id_column_name):
+        """
+        Get a set with all the ids, which are already saved in a table. The table name and the column name come from the
+        definitions in this file and not from a user.
+        """
+
+        id_query_result = self.database_cursor.execute("SELECT {} FROM {};".format(id_column_name, table_name))
+
+        return {id_row[0] for id_row in id_query_result.fetchall()}
+
+    def get_missing_ids(self, id_range, table_list):
+        """
+        Get a list of all ids in the range, which are not saved in every table of the list. The list contains tuples
+        with the table name and its id column, like POKEMON_TABLES.
+        """
+
+        complete_ids = None
+
+        for table_name, id_column_name in table_list:
+            existing_ids = self.get_existing_ids(table_name, id_column_name)
+
+            # An id is only complete, if it is part of every table.
+            if complete_ids is None:
+                complete_ids = existing_ids
+
+            else:
+                complete_ids = complete_ids & existing_ids
+
+        return [resource_id for resource_id in id_range if resource_id not in complete_ids]
+
+    @timed("ivcal_database_table_insert_seconds")
+    def save_checkpoint_data(self, resource_type, data_lists, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Save the progress of a collection for a list of results. A result is complete, if all of its values are not
+        None. Otherwise, there has been an API error and the result is saved as failed.
         """
 
-        # Create a table for the pokemon status data.
-        self.database_cursor.execute('''CREATE TABLE IF NOT EXISTS pokemon_status_data (pokemon_id primary key, 
-        pokemon_hp, pokemon_attack, pokemon_defense, pokemon_sp_attack, pokemon_sp_defense, pokemon_speed);''')
+        row_list = []
+
+        for data_list in data_lists:
+            # The first element of every result is the id.
+            if all(value is not None for value in data_list[1:]):
+                row_list.append((resource_type, data_list[0], "complete"))
+
+            else:
+                row_list.append((resource_type, data_list[0], "failed"))
 
-        # Create a table for a mapping between the id and the name of a pokemon.
-        self.database_cursor.execute('''CREATE TABLE IF NOT EXISTS pokemon_id_name_mapping (pokemon_id primary key, 
-        pokemon_name);''')
+        self.save_rows_in_batches(CHECKPOINT_INSERT_QUERY, row_list, batch_size)
+
+    def get_checkpoint_ids(self, resource_type, status):
+        """
+        Get a list of the ids of a resource type with a specific status in the progress of the collection.
+        """
 
-        # Create a table for the nature data and the effect of a nature on the status data.
-        self.database_cursor.execute('''CREATE TABLE IF NOT EXISTS nature_status_data (nature_id primary key,
-         decrease, increase);''')
+        checkpoint_query_result = self.database_cursor.execute('''SELECT resource_id FROM collection_checkpoint
+        WHERE resource_type=? AND status=? ORDER BY resource_id;''', (resource_type, status))
 
-        # Create a table for a mapping between the id and the name of a nature.
-        self.database_cursor.execute('''CREATE TABLE IF NOT EXISTS nature_id_name_mapping (nature_id primary key,
-        nature_name);''')
+        return [checkpoint_row[0] for checkpoint_row in checkpoint_query_result.fetchall()]
 
     def get_pokemon_status_data(self, pokemon_id):
         """
@@ -69,6 +142,51 @@ class DatabaseAPIHandler(MasterDatabaseClass):
 
         return nature_id, nature_name
 
+    def get_pokemon_data(self, pokemon_id):
+        """
+        Use the API client to get the name and the status data of a pokemon with one single API call.
+        """
+
+        pokemon_data_list = self.api_client.fetch_pokemon_data(pokemon_id)
+
+        return pokemon_data_list
+
+    def get_nature_data(self, nature_id):
+        """
+        Use the API client to get the name and the status effect of a nature with one single API call.
+        """
+
+        nature_data_list = self.api_client.fetch_nature_data(nature_id)
+
+        return nature_data_list
+
+    # The saving of a complete pokemon or nature is timed in the histogram of the inserts and the saving of one table in
+    # its own histogram, so every insert is counted only once per histogram.
+    @timed("ivcal_database_insert_seconds")
+    def save_pokemon_data(self, pokemon_data_list):
+        """
+        Get a list with the pokemon id, the pokemon name and the status data and save the id name mapping and the status
+        data in the database file.
+        """
+
+        pokemon_id, pokemon_name, pokemon_status_container = pokemon_data_list
+
+        self.save_pokemon_id_name_data([pokemon_id, pokemon_name])
+        self.save_pokemon_status_data([pokemon_id, pokemon_status_container])
+
+    @timed("ivcal_database_insert_seconds")
+    def save_nature_data(self, nature_data_list):
+        """
+        Get a list with the nature id, the nature name and the status effect and save the id name mapping and the status
+        effect in the database file.
+        """
+
+        nature_id, nature_name, nature_status_container = nature_data_list
+
+        self.save_nature_id_name_data([nature_id, nature_name])
+        self.save_nature_status_data([nature_id, nature_status_container])
+
+    @timed("ivcal_database_table_insert_seconds")
     def save_pokemon_status_data(self, pokemon_data_list):
         """
         Get a list of data with the pokemon id and the values as parameters and save them in the database file.
@@ -82,20 +200,19 @@ class DatabaseAPIHandler(MasterDatabaseClass):
             pokemon_status_container = pokemon_data_list[1]
 
             try:
-                self.database_cursor.execute('''INSERT INTO pokemon_status_data (pokemon_id, pokemon_hp, pokemon_attack, 
-                    pokemon_defense, pokemon_sp_attack, pokemon_sp_defense, pokemon_speed) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?);''', (pokemon_id,
-                                                       pokemon_status_container["hp"],
-                                                       pokemon_status_container["attack"],
-                                                       pokemon_status_container["defense"],
-                                                       pokemon_status_container["special-attack"],
-                                                       pokemon_status_container["special-defense"],
-                                                       pokemon_status_container["speed"]
-                                                       ))
+                self.database_cursor.execute(POKEMON_STATUS_INSERT_QUERY, (pokemon_id,
+                                                                           pokemon_status_container["hp"],
+                                                                           pokemon_status_container["attack"],
+                                                                           pokemon_status_container["defense"],
+                                                                           pokemon_status_container["special-attack"],
+                                                                           pokemon_status_container["special-defense"],
+                                                                           pokemon_status_container["speed"]
+                                                                           ))
 
             except Exception as database_error:
                 logging.error("An exception occurred: {}".format(database_error), exc_info=True)
 
+    @timed("ivcal_database_table_insert_seconds")
     def save_pokemon_id_name_data(self, pokemon_id_and_name_list):
         """
         Get the pokemon id as parameter in a list and fetch the name of the pokemon with its id. Save both in a
@@ -108,13 +225,13 @@ class DatabaseAPIHandler(MasterDatabaseClass):
         # Check for potential errors which will be returned as None.
         if pokemon_name is not None:
             try:
-                self.database_cursor.execute('''INSERT INTO pokemon_id_name_mapping (pokemon_id, pokemon_name) 
-                VALUES (?, ?);''', (pokemon_id, pokemon_name))
+                self.database_cursor.execute(POKEMON_ID_NAME_INSERT_QUERY, (pokemon_id, pokemon_name))
 
             except Exception as database_error:
                 logging.error("Something went wrong while inserting the pokemon id and pokemon name data to the "
                               "database. This error occurred: {}".format(database_error), exc_info=True)
 
+    @timed("ivcal_database_table_insert_seconds")
     def save_nature_status_data(self, nature_data_list):
         """
         Get a list of data about the nature and save the id and the decreased and increased value in a database.
@@ -125,15 +242,15 @@ class DatabaseAPIHandler(MasterDatabaseClass):
             nature_status_container = nature_data_list[1]
 
             try:
-                self.database_cursor.execute('''INSERT INTO nature_status_data (nature_id, decrease, increase) 
-                VALUES (?, ?, ?)''', (nature_id,
-                                      nature_status_container["decreased"],
-                                      nature_status_container["increased"]
-                                      ))
+                self.database_cursor.execute(NATURE_STATUS_INSERT_QUERY, (nature_id,
+                                                                          nature_status_container["decreased"],
+                                                                          nature_status_container["increased"]
+                                                                          ))
 
             except Exception as database_error:
                 logging.error("An exception occurred: {}".format(database_error), exc_info=True)
 
+    @timed("ivcal_database_table_insert_seconds")
     def save_nature_id_name_data(self, nature_name_id_data_list):
         """
         Get the pokemon id as a parameter (in a list) and fetch the name of the nature with its id. Save both in a
@@ -145,9 +262,130 @@ class DatabaseAPIHandler(MasterDatabaseClass):
 
         if nature_name is not None:
             try:
-                self.database_cursor.execute('''INSERT INTO nature_id_name_mapping (nature_id, nature_name)
-                VALUES (?, ?)''', (nature_id, nature_name))
+                self.database_cursor.execute(NATURE_ID_NAME_INSERT_QUERY, (nature_id, nature_name))
 
             except Exception as database_error:
                 logging.error("Something went wrong while inserting the pokemon id and pokemon name data to the "
                               "database. This error occurred: {}".format(database_error), exc_info=True)
+
+    def save_rows_in_batches(self, insert_query, row_list, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Save a list of rows with one insert query. The rows are written with executemany in transactions of the given
+        batch size, so there is only one commit per batch. If a batch fails, its transaction is rolled back and the rows
+        of this batch are saved one by one, so only the bad rows are lost and logged.
+        """
+
+        if batch_size < 1:
+            raise ValueError("The batch size needs to be at least 1, not {}.".format(batch_size))
+
+        for batch_start in range(0, len(row_list), batch_size):
+            row_batch = row_list[batch_start:batch_start + batch_size]
+
+            try:
+                # The connection is in autocommit mode, so the transaction needs to be started explicitly.
+                self.database_cursor.execute("BEGIN;")
+                self.database_cursor.executemany(insert_query, row_batch)
+                self.database_cursor.execute("COMMIT;")
+
+            except Exception as database_error:
+                # Undo the complete batch, if the transaction is still open.
+                if self.database_connection.in_transaction:
+                    self.database_cursor.execute("ROLLBACK;")
+
+                logging.warning("A batch insert failed and is repeated row by row. This error occurred: "
+                                "{}".format(database_error))
+
+                for row in row_batch:
+                    self.save_single_row(insert_query, row)
+
+    def save_single_row(self, insert_query, row):
+        """
+        Save one row with an insert query as fallback for a failed batch. It is not timed, because its time is already
+        part of the time of the batch.
+        """
+
+        try:
+            self.database_cursor.execute(insert_query, row)
+
+        except Exception as database_error:
+            logging.error("An exception occurred while inserting the row {}: {}".format(row, database_error),
+                          exc_info=True)
+
+    @timed("ivcal_database_table_insert_seconds")
+    def save_pokemon_status_data_bulk(self, pokemon_data_lists, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Save the status data of many pokemon. Every element is a list like for save_pokemon_status_data.
+        """
+
+        # Skip the pokemon with API errors like in the single version.
+        row_list = [(pokemon_id,
+                     pokemon_status_container["hp"],
+                     pokemon_status_container["attack"],
+                     pokemon_status_container["defense"],
+                     pokemon_status_container["special-attack"],
+                     pokemon_status_container["special-defense"],
+                     pokemon_status_container["speed"])
+                    for pokemon_id, pokemon_status_container in pokemon_data_lists
+                    if isinstance(pokemon_status_container, dict)]
+
+        self.save_rows_in_batches(POKEMON_STATUS_INSERT_QUERY, row_list, batch_size)
+
+    @timed("ivcal_database_table_insert_seconds")
+    def save_pokemon_id_name_data_bulk(self, pokemon_id_and_name_lists, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Save the names of many pokemon. Every element is a list like for save_pokemon_id_name_data.
+        """
+
+        row_list = [(pokemon_id, pokemon_name) for pokemon_id, pokemon_name in pokemon_id_and_name_lists
+                    if pokemon_name is not None]
+
+        self.save_rows_in_batches(POKEMON_ID_NAME_INSERT_QUERY, row_list, batch_size)
+
+    @timed("ivcal_database_table_insert_seconds")
+    def save_nature_status_data_bulk(self, nature_data_lists, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Save the status effects of many natures. Every element is a list like for save_nature_status_data.
+        """
+
+        row_list = [(nature_id, nature_status_container["decreased"], nature_status_container["increased"])
+                    for nature_id, nature_status_container in nature_data_lists
+                    if isinstance(nature_status_container, dict)]
+
+        self.save_rows_in_batches(NATURE_STATUS_INSERT_QUERY, row_list, batch_size)
+
+    @timed("ivcal_database_table_insert_seconds")
+    def save_nature_id_name_data_bulk(self, nature_id_and_name_lists, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Save the names of many natures. Every element is a list like for save_nature_id_name_data.
+        """
+
+        row_list = [(nature_id, nature_name) for nature_id, nature_name in nature_id_and_name_lists
+                    if nature_name is not None]
+
+        self.save_rows_in_batches(NATURE_ID_NAME_INSERT_QUERY, row_list, batch_size)
+
+    @timed("ivcal_database_insert_seconds")
+    def save_pokemon_data_bulk(self, pokemon_data_lists, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Save the names and the status data of many pokemon. Every element is a list like for save_pokemon_data.
+        """
+
+        self.save_pokemon_id_name_data_bulk([[pokemon_id, pokemon_name]
+                                             for pokemon_id, pokemon_name, _ in pokemon_data_lists], batch_size)
+        self.save_pokemon_status_data_bulk([[pokemon_id, pokemon_status_container]
+                                            for pokemon_id, _, pokemon_status_container in pokemon_data_lists],
+                                           batch_size)
+        self.save_checkpoint_data("pokemon", pokemon_data_lists, batch_size)
+
+    @timed("ivcal_database_insert_seconds")
+    def save_nature_data_bulk(self, nature_data_lists, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Save the names and the status effects of many natures. Every element is a list like for save_nature_data.
+        """
+
+        self.save_nature_id_name_data_bulk([[nature_id, nature_name]
+                                            for nature_id, nature_name, _ in nature_data_lists], batch_size)
+        self.save_nature_status_data_bulk([[nature_id, nature_status_container]
+                                           for nature_id, _, nature_status_container in nature_data_lists],
+                                          batch_size)
+        self.save_checkpoint_data("nature", nature_data_lists, batch_size)
@@ -0,0 +1,487 @@
+"""
+In this file, an asyncio counterpart of the API client is defined. Every fetch is a coroutine, so hundreds of lookups
+can run on one event loop without a pool of threads. The backend "pokeapi" uses aiohttp with a pool of keep-alive
+connections to the PokéAPI, the backend "local" uses the local stand-in of the PokéAPI without blocking the event loop.
+"""
+
+import asyncio
+import logging
+
+from .response_cache import ResponseCache
+from ivcal.metrics import get_metrics_registry, timed
+
+# Define the address of the PokéAPI.
+POKEAPI_BASE_URL = "https://pokeapi.co/api/v2"
+
+# Define the default number of connections in the pool and the default time in seconds, after which an idle connection
+# of the pool is closed.
+DEFAULT_CONNECTION_LIMIT = 100
+DEFAULT_KEEP_ALIVE_TIMEOUT = 30
+
+# Define the default time in seconds for one request.
+DEFAULT_REQUEST_TIMEOUT = 30
+
+# Define the natures without an effect on the stats, like for the API client.
+NEUTRAL_NATURE_IDS = [1, 7, 13, 19, 25]
+
+
+class APIResponseError(Exception):
+    """
+    Create an error for a response of the PokéAPI with a status code, which is not successful. The number of seconds of
+    the header Retry-After is saved, if the response has it.
+    """
+
+    def __init__(self, status_code, message, retry_after=None):
+        super().__init__("{} {}".format(status_code, message))
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AiohttpPokeAPIBackend:
+    """
+    Create a class for the requests to the PokéAPI with aiohttp. All requests share one session with a pool of
+    keep-alive connections, which is created with the first request in the running event loop.
+    """
+
+    def __init__(self, base_url=POKEAPI_BASE_URL, connection_limit=DEFAULT_CONNECTION_LIMIT,
+                 keep_alive_timeout=DEFAULT_KEEP_ALIVE_TIMEOUT, request_timeout=DEFAULT_REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.connection_limit = connection_limit
+        self.keep_alive_timeout = keep_alive_timeout
+        self.request_timeout = request_timeout
+
+        self.client_session = None
+
+    def get_session(self):
+        """
+        Get the session of the backend. aiohttp is only imported, if this backend is used.
+        """
+
+        if self.client_session is None:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(limit=self.connection_limit, keepalive_timeout=self.keep_alive_timeout,
+                                             ttl_dns_cache=300)
+            self.client_session = aiohttp.ClientSession(connector=connector,
+                                                        timeout=aiohttp.ClientTimeout(total=self.request_timeout))
+
+        return self.client_session
+
+    async def get_json(self, resource_type, id_or_name):
+        """
+        Get the JSON data of a resource by its id or its name. An unsuccessful response raises an APIResponseError.
+        """
+
+        request_url = "{}/{}/{}/".format(self.base_url, resource_type, str(id_or_name).lower())
+
+        async with self.get_session().get(request_url) as response:
+            if response.status != 200:
+                retry_after = response.headers.get("Retry-After")
+
+                raise APIResponseError(response.status, response.reason,
+                                       float(retry_after) if retry_after and retry_after.isdigit() else None)
+
+            return await response.json()
+
+    async def get_pokemon_record(self, pokemon_id_or_name):
+        """
+        Get the record of a pokemon with its id, its name and its stats.
+        """
+
+        pokemon_data = await self.get_json("pokemon", pokemon_id_or_name)
+
+        return {"id": pokemon_data["id"],
+                "name": pokemon_data["name"],
+                "stats": {stat["stat"]["name"]: stat["base_stat"] for stat in pokemon_data["stats"]}}
+
+    async def get_nature_record(self, nature_id_or_name):
+        """
+        Get the record of a nature with its id, its name, its decreased and its increased value.
+        """
+
+        nature_data = await self.get_json("nature", nature_id_or_name)
+
+        decreased_stat = nature_data.get("decreased_stat")
+        increased_stat = nature_data.get("increased_stat")
+
+        return {"id": nature_data["id"],
+                "name": nature_data["name"],
+                "decreased": decreased_stat["name"] if decreased_stat is not None else None,
+                "increased": increased_stat["name"] if increased_stat is not None else None}
+
+    async def close(self):
+        """
+        Close the session and all connections of the pool.
+        """
+
+        if self.client_session is not None:
+            await self.client_session.close()
+            self.client_session = None
+
+
+class AsyncLocalBackend:
+    """
+    Create an adapter for the local stand-in of the PokéAPI. The latency is awaited instead of blocking the thread, so
+    many requests wait at the same time on one event loop. The fixtures, the errors and the rate limit are the same as
+    for the synchronous stand-in.
+    """
+
+    def __init__(self, local_backend=None, **backend_options):
+        if local_backend is None:
+            from .local_api_backend import LocalPokeAPIBackend
+
+            fixtures_path = backend_options.pop("fixtures_path", None)
+
+            if fixtures_path is not None:
+                local_backend = LocalPokeAPIBackend.from_fixtures_file(fixtures_path, **backend_options)
+
+            else:
+                local_backend = LocalPokeAPIBackend(**backend_options)
+
+        self.local_backend = local_backend
+
+    async def get_record(self, resource_type, id_or_name):
+        """
+        Get the record of a resource type after the checks and the waiting time of a request.
+        """
+
+        from .local_api_backend import LocalBackendError
+
+        response_time, error_status_code = self.local_backend.admit_request()
+
+        if response_time > 0:
+            await asyncio.sleep(response_time)
+
+        if error_status_code is not None:
+            raise LocalBackendError(error_status_code, "Server Error")
+
+        return self.local_backend.find_record(resource_type, id_or_name)
+
+    async def get_pokemon_record(self, pokemon_id_or_name):
+        """
+        Get the record of a pokemon with its id, its name and its stats.
+        """
+
+        return await self.get_record("pokemon", pokemon_id_or_name)
+
+    async def get_nature_record(self, nature_id_or_name):
+        """
+        Get the record of a nature with its id, its name, its decreased and its increased value.
+        """
+
+        return await self.get_record("nature", nature_id_or_name)
+
+    def get_statistics(self):
+        """
+        Get the statistics of the local backend.
+        """
+
+        return self.local_backend.get_statistics()
+
+    async def close(self):
+        """
+        Close the backend. The local backend does not have connections.
+        """
+
+
+def create_async_backend(backend="pokeapi", backend_options=None):
+    """
+    Create the asynchronous backend for the API calls. The backend "pokeapi" uses aiohttp with the options for its
+    connection pool, the backend "local" uses the local stand-in with its options.
+    """
+
+    if backend_options is None:
+        backend_options = {}
+
+    if backend == "pokeapi":
+        return AiohttpPokeAPIBackend(**backend_options)
+
+    if backend == "local":
+        return AsyncLocalBackend(**dict(backend_options))
+
+    raise ValueError("The backend {} is not one of {}.".format(backend, ["pokeapi", "local"]))
+
+
+class AsyncAPIClient:
+    """
+    Create a class with the same fetch methods as the API client, but every fetch method is a coroutine. Every fetched
+    record is saved in memory with its id and its name and parallel fetches of the same key share one request.
+    """
+
+    def __init__(self, use_response_cache=True, response_cache=None, backend_client=None, backend="pokeapi",
+                 backend_options=None):
+        if backend_client is None:
+            backend_client = create_async_backend(backend, backend_options)
+
+        self.backend_client = backend_client
+
+        # Use the persistent cache like the API client. The records of the local backend are test data, which must not
+        # be served to a later run with the PokéAPI, so the local backend does not use the cache.
+        if use_response_cache is True and response_cache is None and backend != "local" \
+                and not isinstance(backend_client, AsyncLocalBackend):
+            response_cache = ResponseCache()
+
+        self.response_cache = response_cache
+
+        self.memory_records = {}
+
+        # Save the fetches, which are running at the moment, as futures of the event loop.
+        self.in_flight_fetches = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exception_type, exception_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        Close the backend and its connections.
+        """
+
+        await self.backend_client.close()
+
+    async def get_record(self, resource_type, resource_id_or_name, load_record_function):
+        """
+        Get the record of a resource type by its id or name from memory. If the record is not in memory, it is loaded
+        with the load coroutine function and saved with its id and its name. If another task loads the same key at the
+        moment, its result is awaited instead of a second request.
+        """
+
+        memory_key = (resource_type, ResponseCache.normalize_key(resource_id_or_name))
+
+        record = self.memory_records.get(memory_key)
+
+        get_metrics_registry().count_cache_lookup("async_api_memory", record is not None)
+
+        if record is not None:
+            return record
+
+        in_flight_fetch = self.in_flight_fetches.get(memory_key)
+
+        # Wait for the fetch of another task. The shield keeps the fetch running, if this task is cancelled.
+        if in_flight_fetch is not None:
+            return await asyncio.shield(in_flight_fetch)
+
+        in_flight_fetch = asyncio.get_running_loop().create_future()
+        self.in_flight_fetches[memory_key] = in_flight_fetch
+
+        try:
+            record = await load_record_function(resource_id_or_name)
+
+            # Index the record by its id and by its name.
+            for record_key in [record["id"], record["name"]]:
+                self.memory_records[(resource_type, ResponseCache.normalize_key(record_key))] = record
+
+            in_flight_fetch.set_result(record)
+
+        except BaseException as api_error:
+            get_metrics_registry().increment("ivcal_api_errors_total", resource=resource_type)
+
+            # A cancelled fetch is an error for the waiting tasks as well.
+            if isinstance(api_error, asyncio.CancelledError):
+                in_flight_fetch.cancel()
+
+            else:
+                in_flight_fetch.set_exception(api_error)
+
+                # Mark the error as retrieved, so there is no warning without waiting tasks.
+                in_flight_fetch.exception()
+
+            raise
+
+        finally:
+            del self.in_flight_fetches[memory_key]
+
+        return record
+
+    async def load_record(self, resource_type, resource_id_or_name, backend_function):
+        """
+        Load the record of a resource type by its id or name. The cache is used before the backend and a fetched record
+        is saved in the cache with its id and its name. The queries of the cache block until they are written, so they
+        run in a thread and not in the event loop.
+        """
+
+        if self.response_cache is not None:
+            cached_record = await asyncio.to_thread(self.response_cache.get, resource_type, resource_id_or_name)
+
+            if cached_record is not None:
+                return cached_record
+
+        get_metrics_registry().increment("ivcal_api_requests_total", resource=resource_type)
+        record = await backend_function(resource_id_or_name)
+
+        if self.response_cache is not None:
+            await asyncio.to_thread(self.response_cache.set, resource_type, [record["id"], record["name"]], record)
+
+        return record
+
+    async def get_pokemon_record(self, pokemon_id_or_name):
+        """
+        Get a dictionary with the id, the name and the stats of a pokemon by its id or name. API errors are raised.
+        """
+
+        return await self.get_record("pokemon", pokemon_id_or_name,
+                                     lambda id_or_name: self.load_record("pokemon", id_or_name,
+                                                                         self.backend_client.get_pokemon_record))
+
+    async def get_nature_record(self, nature_id_or_name):
+        """
+        Get a dictionary with the id, the name, the decreased and the increased value of a nature by its id or name.
+        API errors are raised.
+        """
+
+        return await self.get_record("nature", nature_id_or_name,
+                                     lambda id_or_name: self.load_record("nature", id_or_name,
+                                                                         self.backend_client.get_nature_record))
+
+    @timed("ivcal_api_fetch_seconds", operation="async_fetch_pokemon_with_stats")
+    async def fetch_pokemon_with_stats(self, pokemon_id):
+        """
+        Get a list with the id and the stats of a pokemon. The stats are None in an error case.
+        """
+
+        status_container = None
+
+        try:
+            status_container = (await self.get_pokemon_record(pokemon_id))["stats"]
+
+        except Exception as api_error:
+            logging.error("An error occurred during the API call (get pokemon by id): {}".format(api_error),
+                          exc_info=True)
+
+        return [pokemon_id, status_container]
+
+    @timed("ivcal_api_fetch_seconds", operation="async_fetch_pokemon_name_with_id")
+    async def fetch_pokemon_name_with_id(self, pokemon_id):
+        """
+        Get the name of a pokemon by its id.
+        """
+
+        pokemon_name = None
+
+        try:
+            pokemon_name = (await self.get_pokemon_record(pokemon_id))["name"]
+
+        except Exception as api_error:
+            logging.error("An error occurred during the API call (fetch pokemon with id): {}".format(api_error),
+                          exc_info=True)
+
+        return pokemon_name
+
+    @timed("ivcal_api_fetch_seconds", operation="async_fetch_pokemon_id_with_name")
+    async def fetch_pokemon_id_with_name(self, pokemon_name):
+        """
+        Get the id of a pokemon by its name.
+        """
+
+        pokemon_id = None
+
+        try:
+            pokemon_id = (await self.get_pokemon_record(pokemon_name))["id"]
+
+        except Exception as api_error:
+            logging.error("An error occurred during the API call (fetch pokemon with name): {}".format(api_error),
+                          exc_info=True)
+
+        return pokemon_id
+
+    @timed("ivcal_api_fetch_seconds", operation="async_fetch_nature_with_status_effect")
+    async def fetch_nature_with_status_effect(self, nature_id):
+        """
+        Get the decreased and the increased value of a nature by its id. The result is None in an error case.
+        """
+
+        # Natures without an effect do not need a request.
+        if nature_id in NEUTRAL_NATURE_IDS:
+            return {"decreased": None,
+                    "increased": None}
+
+        nature_effect_container = None
+
+        try:
+            nature_record = await self.get_nature_record(nature_id)
+
+            nature_effect_container = {"decreased": nature_record["decreased"],
+                                       "increased": nature_record["increased"]}
+
+        except Exception as api_error:
+            logging.error("An error occurred during the API call (fetch nature wih status effect): "
+                          "{}".format(api_error), exc_info=True)
+
+        return nature_effect_container
+
+    @timed("ivcal_api_fetch_seconds", operation="async_fetch_nature_name_with_id")
+    async def fetch_nature_name_with_id(self, nature_id):
+        """
+        Get the name of a nature by its id.
+        """
+
+        nature_name = None
+
+        try:
+            nature_name = (await self.get_nature_record(nature_id))["name"]
+
+        except Exception as api_error:
+            logging.error("An error occurred during the API call (fetch nature with id): {}".format(api_error),
+                          exc_info=True)
+
+        return nature_name
+
+    @timed("ivcal_api_fetch_seconds", operation="async_fetch_nature_id_with_name")
+    async def fetch_nature_id_with_name(self, nature_name):
+        """
+        Get the id of a nature by its name.
+        """
+
+        nature_id = None
+
+        try:
+            nature_id = (await self.get_nature_record(nature_name))["id"]
+
+        except Exception as api_error:
+            logging.error("An error occurred during the API call (fetch nature with name): {}".format(api_error),
+                          exc_info=True)
+
+        return nature_id
+
+    @timed("ivcal_api_fetch_seconds", operation="async_fetch_pokemon_data")
+    async def fetch_pokemon_data(self, pokemon_id):
+        """
+        Get a list with the id, the name and the stats of a pokemon. The name and the stats are None in an error case.
+        """
+
+        pokemon_name = None
+        status_container = None
+
+        try:
+            pokemon_record = await self.get_pokemon_record(pokemon_id)
+            pokemon_name = pokemon_record["name"]
+            status_container = pokemon_record["stats"]
+
+        except Exception as api_error:
+            logging.error("An error occurred during the API call (fetch pokemon data): {}".format(api_error),
+                          exc_info=True)
+
+        return [pokemon_id, pokemon_name, status_container]
+
+    @timed("ivcal_api_fetch_seconds", operation="async_fetch_nature_data")
+    async def fetch_nature_data(self, nature_id):
+        """
+        Get a list with the id, the name and the effect of a nature. The name and the effect are None in an error case.
+        """
+
+        nature_name = None
+        nature_effect_container = None
+
+        try:
+            nature_record = await self.get_nature_record(nature_id)
+            nature_name = nature_record["name"]
+            nature_effect_container = {"decreased": nature_record["decreased"],
+                                       "increased": nature_record["increased"]}
+
+        except Exception as api_error:
+            logging.error("An error occurred during the API call (fetch nature data): {}".format(api_error),
+                          exc_info=True)
+
+        return [nature_id, nature_name, nature_effect_container]
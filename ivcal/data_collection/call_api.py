@@ -1,7 +1,42 @@
-import pokepy
 import logging
+import threading
+from concurrent.futures import Future
 
-logging.basicConfig(filename="events.log")
+from .response_cache import ResponseCache
+from ivcal.metrics import get_metrics_registry, timed
+
+# Define the names of the backends, which can be used by the API client.
+CLIENT_BACKENDS = ["pokeapi", "local"]
+
+
+def create_client(backend="pokeapi", backend_options=None):
+    """
+    Create the client of a backend for the API calls. The backend "pokeapi" is the pokepy client for the PokéAPI, the
+    backend "local" is the local stand-in with its fixtures. The options are given to the local backend, for example
+    the path of a fixtures file, the latency or the error rate. The modules of a backend are only imported, if it is
+    used.
+    """
+
+    if backend_options is None:
+        backend_options = {}
+
+    if backend == "pokeapi":
+        import pokepy
+
+        return pokepy.V2Client()
+
+    if backend == "local":
+        from .local_api_backend import LocalPokeAPIBackend
+
+        backend_options = dict(backend_options)
+        fixtures_path = backend_options.pop("fixtures_path", None)
+
+        if fixtures_path is not None:
+            return LocalPokeAPIBackend.from_fixtures_file(fixtures_path, **backend_options)
+
+        return LocalPokeAPIBackend(**backend_options)
+
+    raise ValueError("The backend {} is not one of {}.".format(backend, CLIENT_BACKENDS))
 
 
 class APIClient:
@@ -10,10 +45,161 @@ class APIClient:
     fetched pokemon with their stats.
     """
 
-    def __init__(self):
-        # Create a client for API calls.
-        self.client = pokepy.V2Client()
+    def __init__(self, use_response_cache=True, response_cache=None, client=None, backend="pokeapi",
+                 backend_options=None, request_scheduler=None):
+        # Create a client for API calls with the backend. Another client with the methods get_pokemon and get_nature
+        # can be used instead, for example a fake client for benchmarks.
+        if client is None:
+            client = create_client(backend, backend_options)
+
+        self.client = client
+
+        # Send the requests of the client through a request scheduler, which limits their rate and retries temporary
+        # errors. Without a scheduler, every request is sent once.
+        self.request_scheduler = request_scheduler
+
+        # Use a persistent cache for the responses, so a pokemon or a nature is only fetched once over many runs. The
+        # records of the local backend are test data, which must not be served to a later run with the PokéAPI, and a
+        # load test needs to reach the backend, so the local backend does not use the cache.
+        if use_response_cache is True and response_cache is None and backend != "local":
+            response_cache = ResponseCache()
+
+        self.response_cache = response_cache
+
+        # Save every fetched record in memory with its id and its name, so there is only one fetch per pokemon or
+        # nature in a process.
+        self.memory_records = {}
+
+        # Save the fetches, which are running at the moment, so parallel requests for the same key share one fetch.
+        self.in_flight_fetches = {}
+        self.record_lock = threading.Lock()
+
+    def get_record(self, resource_type, resource_id_or_name, load_record_function):
+        """
+        Get the record of a resource type by its id or name from memory. If the record is not in memory, it is loaded
+        with the load function and saved with its id and its name. If another thread loads the same key at the moment,
+        its result is used instead of a second fetch.
+        """
+
+        memory_key = (resource_type, ResponseCache.normalize_key(resource_id_or_name))
+
+        with self.record_lock:
+            record = self.memory_records.get(memory_key)
+
+            get_metrics_registry().count_cache_lookup("api_memory", record is not None)
+
+            if record is not None:
+                return record
+
+            in_flight_fetch = self.in_flight_fetches.get(memory_key)
+
+            # The first request for a key is responsible for the fetch.
+            is_fetching_thread = in_flight_fetch is None
+
+            if is_fetching_thread is True:
+                in_flight_fetch = Future()
+                self.in_flight_fetches[memory_key] = in_flight_fetch
+
+        # Wait for the fetch of another thread, which raises its error as well.
+        if is_fetching_thread is False:
+            return in_flight_fetch.result()
+
+        try:
+            record = load_record_function(resource_id_or_name)
+
+            with self.record_lock:
+                # Index the record by its id and by its name.
+                for record_key in [record["id"], record["name"]]:
+                    self.memory_records[(resource_type, ResponseCache.normalize_key(record_key))] = record
+
+            in_flight_fetch.set_result(record)
+
+        except Exception as api_error:
+            get_metrics_registry().increment("ivcal_api_errors_total", resource=resource_type)
+            in_flight_fetch.set_exception(api_error)
+
+            raise
+
+        finally:
+            with self.record_lock:
+                del self.in_flight_fetches[memory_key]
+
+        return record
+
+    def send_request(self, request_function, resource_id_or_name):
+        """
+        Send a request of the client for a resource id or name, with the request scheduler, if there is one.
+        """
+
+        if self.request_scheduler is None:
+            return request_function(resource_id_or_name)
+
+        return self.request_scheduler.execute(request_function, resource_id_or_name)
+
+    def get_pokemon_record(self, pokemon_id_or_name):
+        """
+        Get a dictionary with the id, the name and the stats of a pokemon by its id or name. API errors are raised.
+        """
+
+        return self.get_record("pokemon", pokemon_id_or_name, self.load_pokemon_record)
+
+    def get_nature_record(self, nature_id_or_name):
+        """
+        Get a dictionary with the id, the name, the decreased and the increased value of a nature by its id or name.
+        API errors are raised.
+        """
 
+        return self.get_record("nature", nature_id_or_name, self.load_nature_record)
+
+    def load_pokemon_record(self, pokemon_id_or_name):
+        """
+        Load the record of a pokemon by its id or name. The cache is used before the API and a fetched pokemon is saved
+        in the cache with its id and its name.
+        """
+
+        if self.response_cache is not None:
+            pokemon_record = self.response_cache.get("pokemon", pokemon_id_or_name)
+
+            if pokemon_record is not None:
+                return pokemon_record
+
+        # Get pokemon based on its id or name.
+        get_metrics_registry().increment("ivcal_api_requests_total", resource="pokemon")
+        pokemon = self.send_request(self.client.get_pokemon, pokemon_id_or_name)
+
+        pokemon_record = {"id": pokemon.id,
+                          "name": pokemon.name,
+                          "stats": self.modify_status_list(pokemon.stats)}
+
+        if self.response_cache is not None:
+            self.response_cache.set("pokemon", [pokemon.id, pokemon.name], pokemon_record)
+
+        return pokemon_record
+
+    def load_nature_record(self, nature_id_or_name):
+        """
+        Load the record of a nature by its id or name. The cache is used like for load_pokemon_record.
+        """
+
+        if self.response_cache is not None:
+            nature_record = self.response_cache.get("nature", nature_id_or_name)
+
+            if nature_record is not None:
+                return nature_record
+
+        get_metrics_registry().increment("ivcal_api_requests_total", resource="nature")
+        nature = self.send_request(self.client.get_nature, nature_id_or_name)
+
+        nature_record = {"id": nature.id,
+                         "name": nature.name}
+        nature_record.update(self.modify_nature_effect(nature))
+
+        if self.response_cache is not None:
+            self.response_cache.set("nature", [nature.id, nature.name], nature_record)
+
+        return nature_record
+
+    @timed("ivcal_api_fetch_seconds")
     def fetch_pokemon_with_stats(self, pokemon_id):
         """
         Use the pokepy client and a pokemon id as parameter to get the stats of one pokemon. The output format for the
@@ -28,14 +214,9 @@ class APIClient:
         status_container = None
 
         try:
-            # Get pokemon based on its id or name.
-            pokemon = self.client.get_pokemon(pokemon_id)
-            # Get the stats of a pokemon, which are represented in a list.
-            status_container = pokemon.stats
-
             # This function is only for one pokemon, so the return value should contain, in the best case, a number as
             # pokemon id and a dictionary with the status values of the pokemon.
-            status_container = self.modify_status_list(status_container)
+            status_container = self.get_pokemon_record(pokemon_id)["stats"]
 
         except Exception as api_error:
             logging.error("An error occurred during the API call (get pokemon by id): {}".format(api_error),
@@ -49,6 +230,7 @@ class APIClient:
 
         return pokemon_result_list
 
+    @timed("ivcal_api_fetch_seconds")
     def fetch_pokemon_name_with_id(self, pokemon_id):
         """
         Get the name of a pokemon by its id.
@@ -57,7 +239,7 @@ class APIClient:
         pokemon_name = None
 
         try:
-            pokemon_name = self.client.get_pokemon(pokemon_id).name
+            pokemon_name = self.get_pokemon_record(pokemon_id)["name"]
 
         except Exception as api_error:
             logging.error("An error occurred during the API call (fetch pokemon with id): {}".format(api_error),
@@ -65,6 +247,7 @@ class APIClient:
 
         return pokemon_name
 
+    @timed("ivcal_api_fetch_seconds")
     def fetch_pokemon_id_with_name(self, pokemon_name):
         """
         Get the id of a pokemon by its name as other way around compared with fetch_pokemon_name_with_id
@@ -73,7 +256,7 @@ class APIClient:
         pokemon_id = None
 
         try:
-            pokemon_id = self.client.get_pokemon(pokemon_name).id
+            pokemon_id = self.get_pokemon_record(pokemon_name)["id"]
 
         except Exception as api_error:
             logging.error("An error occurred during the API call (fetch pokemon with name): {}".format(api_error),
@@ -81,6 +264,7 @@ class APIClient:
 
         return pokemon_id
 
+    @timed("ivcal_api_fetch_seconds")
     def fetch_nature_with_status_effect(self, nature_id):
         """
         Get the nature by its id.
@@ -91,11 +275,11 @@ class APIClient:
         # pokemon.
         if nature_id not in [1, 7, 13, 19, 25]:
             try:
-                nature = self.client.get_nature(nature_id)
+                nature_record = self.get_nature_record(nature_id)
 
                 # Make the container to a dictionary for more related data.
-                nature_effect_container = {"decreased": nature.decreased_stat.name,
-                                           "increased": nature.increased_stat.name}
+                nature_effect_container = {"decreased": nature_record["decreased"],
+                                           "increased": nature_record["increased"]}
 
             except Exception as api_error:
                 logging.error("An error occurred during the API call (fetch nature wih status effect): "
@@ -108,6 +292,7 @@ class APIClient:
 
         return nature_effect_container
 
+    @timed("ivcal_api_fetch_seconds")
     def fetch_nature_name_with_id(self, nature_id):
         """
         Get the name of a nature by its id.
@@ -115,8 +300,7 @@ class APIClient:
 
         nature_name = None
         try:
-            nature = self.client.get_nature(nature_id)
-            nature_name = nature.name
+            nature_name = self.get_nature_record(nature_id)["name"]
 
         except Exception as api_error:
             logging.error("An error occurred during the API call (fetch nature with id): {}".format(api_error),
@@ -124,6 +308,7 @@ class APIClient:
 
         return nature_name
 
+    @timed("ivcal_api_fetch_seconds")
     def fetch_nature_id_with_name(self, nature_name):
         """
         Get the name of a nature by its id.
@@ -131,8 +316,7 @@ class APIClient:
 
         nature_id = None
         try:
-            nature = self.client.get_nature(nature_name)
-            nature_id = nature.id
+            nature_id = self.get_nature_record(nature_name)["id"]
 
         except Exception as api_error:
             logging.error("An error occurred during the API call (fetch nature with name): {}".format(api_error),
@@ -140,6 +324,66 @@ class APIClient:
 
         return nature_id
 
+    @timed("ivcal_api_fetch_seconds")
+    def fetch_pokemon_data(self, pokemon_id):
+        """
+        Get the name and the stats of a pokemon with only one API call. The result is a list with the id, the name and
+        a dictionary with the stats of the pokemon. The name and the stats are None in an error case.
+        """
+
+        pokemon_name = None
+        status_container = None
+
+        try:
+            # Get the pokemon once and derive all the necessary data from this record.
+            pokemon_record = self.get_pokemon_record(pokemon_id)
+            pokemon_name = pokemon_record["name"]
+            status_container = pokemon_record["stats"]
+
+        except Exception as api_error:
+            logging.error("An error occurred during the API call (fetch pokemon data): {}".format(api_error),
+                          exc_info=True)
+
+        return [pokemon_id, pokemon_name, status_container]
+
+    @timed("ivcal_api_fetch_seconds")
+    def fetch_nature_data(self, nature_id):
+        """
+        Get the name and the status effect of a nature with only one API call. The result is a list with the id, the
+        name and a dictionary with the decreased and the increased value. The name and the dictionary are None in an
+        error case.
+        """
+
+        nature_name = None
+        nature_effect_container = None
+
+        try:
+            # Get the nature once and derive all the necessary data from this record.
+            nature_record = self.get_nature_record(nature_id)
+            nature_name = nature_record["name"]
+            nature_effect_container = {"decreased": nature_record["decreased"],
+                                       "increased": nature_record["increased"]}
+
+        except Exception as api_error:
+            logging.error("An error occurred during the API call (fetch nature data): {}".format(api_error),
+                          exc_info=True)
+
+        return [nature_id, nature_name, nature_effect_container]
+
+    @staticmethod
+    def modify_nature_effect(nature):
+        """
+        Transform the decreased and the increased stat of a nature to a dictionary. Natures without an effect on the
+        stats of a pokemon have None for both values.
+        """
+
+        # Natures without an effect do not have a decreased or an increased stat.
+        decreased_stat = nature.decreased_stat.name if nature.decreased_stat is not None else None
+        increased_stat = nature.increased_stat.name if nature.increased_stat is not None else None
+
+        return {"decreased": decreased_stat,
+                "increased": increased_stat}
+
     @staticmethod
     def modify_status_list(pokemon_stats_list):
         """
@@ -0,0 +1,285 @@
+"""
+In this file, a local stand-in for the PokéAPI is defined. It serves pokemon and natures from recorded fixtures with the
+same attributes as the objects of pokepy, so it can replace the pokepy client of the API client. The latency, the
+jitter, the rate of errors and a rate limit are configurable, so the data collection can be load-tested offline with
+repeatable numbers.
+"""
+
+import collections
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+# Define the order of the status values in the fixtures.
+STATUS_VALUES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+# Define the status codes of the errors, which are returned like temporary errors of a server.
+SERVER_ERROR_STATUS_CODES = [500, 502, 503]
+
+
+class LocalBackendError(Exception):
+    """
+    Create an error of the local backend with the status code of an HTTP response.
+    """
+
+    def __init__(self, status_code, message):
+        super().__init__("{} {}".format(status_code, message))
+        self.status_code = status_code
+
+
+class RateLimitError(LocalBackendError):
+    """
+    Create an error for a request, which exceeds the rate limit. The number of seconds, after which a new request is
+    allowed, is saved like the header Retry-After of a response.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(429, "Too Many Requests, retry after {:.3f} seconds".format(retry_after))
+        self.retry_after = retry_after
+
+
+def create_synthetic_fixtures(pokemon_count=807, nature_count=25):
+    """
+    Create fixtures with generated pokemon and natures, which have names like "pokemon-25" and "nature-3". Like in the
+    games, every sixth nature does not have an effect.
+    """
+
+    pokemon_records = []
+    nature_records = []
+
+    for pokemon_id in range(1, pokemon_count + 1):
+        pokemon_records.append({"id": pokemon_id,
+                                "name": "pokemon-{}".format(pokemon_id),
+                                "stats": {value: (pokemon_id * 7 + position * 13) % 200 + 20
+                                          for position, value in enumerate(STATUS_VALUES)}})
+
+    for nature_id in range(1, nature_count + 1):
+        decreased_value = STATUS_VALUES[1 + (nature_id - 1) // 5 % 5]
+        increased_value = STATUS_VALUES[1 + (nature_id - 1) % 5]
+
+        if decreased_value == increased_value:
+            decreased_value = None
+            increased_value = None
+
+        nature_records.append({"id": nature_id,
+                               "name": "nature-{}".format(nature_id),
+                               "decreased": decreased_value,
+                               "increased": increased_value})
+
+    return {"pokemon": pokemon_records, "nature": nature_records}
+
+
+def create_fixtures_from_database(database_handler):
+    """
+    Create fixtures with the pokemon and the natures of a database handler for the calculator, so a collected database
+    file can be served again.
+    """
+
+    pokemon_records = [{"id": pokemon_row[0],
+                        "name": pokemon_row[1],
+                        "stats": dict(zip(STATUS_VALUES, pokemon_row[2:8]))}
+                       for pokemon_row in database_handler.get_all_pokemon_rows()]
+
+    nature_records = [{"id": nature_id,
+                       "name": nature_name,
+                       "decreased": decreased_value,
+                       "increased": increased_value}
+                      for nature_id, nature_name, decreased_value, increased_value
+                      in database_handler.get_all_nature_rows()]
+
+    return {"pokemon": pokemon_records, "nature": nature_records}
+
+
+def record_fixtures(api_client, pokemon_ids=range(1, 808), nature_ids=range(1, 26)):
+    """
+    Record the fixtures with the records of an API client, for example with the real PokéAPI. Ids, which can not be
+    fetched, are missing in the fixtures.
+    """
+
+    fixtures = {"pokemon": [], "nature": []}
+
+    for resource_type, resource_ids, get_record_function in [("pokemon", pokemon_ids, api_client.get_pokemon_record),
+                                                             ("nature", nature_ids, api_client.get_nature_record)]:
+        for resource_id in resource_ids:
+            try:
+                fixtures[resource_type].append(get_record_function(resource_id))
+
+            except Exception:
+                continue
+
+    return fixtures
+
+
+def save_fixtures(fixtures, fixtures_path):
+    """
+    Save fixtures as JSON file.
+    """
+
+    with open(fixtures_path, "w") as fixtures_file:
+        json.dump(fixtures, fixtures_file, indent=4)
+
+
+def load_fixtures(fixtures_path):
+    """
+    Load fixtures from a JSON file.
+    """
+
+    with open(fixtures_path) as fixtures_file:
+        return json.load(fixtures_file)
+
+
+class LocalPokeAPIBackend:
+    """
+    Create a class with the methods get_pokemon and get_nature of the pokepy client, which serves the records of
+    fixtures. Every request waits for the latency with a random jitter, fails with a server error with the error rate
+    and fails with a RateLimitError, if there are more requests in one second than the rate limit allows.
+    """
+
+    def __init__(self, fixtures=None, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit=None, seed=None):
+        if fixtures is None:
+            fixtures = create_synthetic_fixtures()
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+
+        # Index every record by its id and its name like the PokéAPI.
+        self.records = {}
+
+        for resource_type in ["pokemon", "nature"]:
+            for record in fixtures.get(resource_type, []):
+                self.records[(resource_type, str(record["id"]))] = record
+                self.records[(resource_type, record["name"].lower())] = record
+
+        # Use an own random generator, so a seed makes the errors and the latency repeatable.
+        self.random_generator = random.Random(seed)
+
+        # Save the times of the requests in the last second for the rate limit.
+        self.request_times = collections.deque()
+
+        # Count the requests, the server errors and the rate limited requests for statistics.
+        self.request_count = 0
+        self.error_count = 0
+        self.rate_limited_count = 0
+
+        # The backend is used by the worker threads of the data collection.
+        self.backend_lock = threading.Lock()
+
+    @classmethod
+    def from_fixtures_file(cls, fixtures_path, **backend_options):
+        """
+        Create a backend with the fixtures of a JSON file.
+        """
+
+        return cls(load_fixtures(fixtures_path), **backend_options)
+
+    def admit_request(self):
+        """
+        Count a request and decide, if it fails with the rate limit or a server error. The result is a tuple with the
+        time in seconds, which the request waits for its response, and the status code of a server error or None.
+        """
+
+        with self.backend_lock:
+            current_time = time.monotonic()
+            self.request_count += 1
+
+            if self.rate_limit is not None:
+                # Remove the requests, which are older than one second.
+                while self.request_times and current_time - self.request_times[0] >= 1:
+                    self.request_times.popleft()
+
+                if len(self.request_times) >= self.rate_limit:
+                    self.rate_limited_count += 1
+
+                    raise RateLimitError(1 - (current_time - self.request_times[0]))
+
+                self.request_times.append(current_time)
+
+            response_time = max(0.0, self.latency + self.random_generator.uniform(-self.jitter, self.jitter))
+            error_status_code = None
+
+            if self.random_generator.random() < self.error_rate:
+                self.error_count += 1
+                error_status_code = self.random_generator.choice(SERVER_ERROR_STATUS_CODES)
+
+        return response_time, error_status_code
+
+    def check_request(self):
+        """
+        Check a request and wait for its response time. A server error is raised after the waiting.
+        """
+
+        response_time, error_status_code = self.admit_request()
+
+        # Wait outside of the lock, so parallel requests wait at the same time.
+        if response_time > 0:
+            time.sleep(response_time)
+
+        if error_status_code is not None:
+            raise LocalBackendError(error_status_code, "Server Error")
+
+    def find_record(self, resource_type, id_or_name):
+        """
+        Find the record of a resource type by its id or its name. An unknown id or name fails like a missing resource
+        of the PokéAPI.
+        """
+
+        record = self.records.get((resource_type, str(id_or_name).lower()))
+
+        if record is None:
+            raise LocalBackendError(404, "Not Found")
+
+        return record
+
+    def get_record(self, resource_type, id_or_name):
+        """
+        Get the record of a resource type by its id or its name after the checks of a request.
+        """
+
+        self.check_request()
+
+        return self.find_record(resource_type, id_or_name)
+
+    def get_pokemon(self, pokemon_id_or_name):
+        """
+        Get a pokemon with the attributes id, name and stats like pokepy.
+        """
+
+        pokemon_record = self.get_record("pokemon", pokemon_id_or_name)
+
+        pokemon_stats = [SimpleNamespace(stat=SimpleNamespace(name=value), base_stat=base_stat)
+                         for value, base_stat in pokemon_record["stats"].items()]
+
+        return SimpleNamespace(id=pokemon_record["id"], name=pokemon_record["name"], stats=pokemon_stats)
+
+    def get_nature(self, nature_id_or_name):
+        """
+        Get a nature with the attributes id, name, decreased_stat and increased_stat like pokepy.
+        """
+
+        nature_record = self.get_record("nature", nature_id_or_name)
+
+        decreased_stat = None
+        increased_stat = None
+
+        if nature_record["decreased"] is not None:
+            decreased_stat = SimpleNamespace(name=nature_record["decreased"])
+
+        if nature_record["increased"] is not None:
+            increased_stat = SimpleNamespace(name=nature_record["increased"])
+
+        return SimpleNamespace(id=nature_record["id"], name=nature_record["name"], decreased_stat=decreased_stat,
+                               increased_stat=increased_stat)
+
+    def get_statistics(self):
+        """
+        Get the statistics of the backend as dictionary with the number of requests, server errors and rate limited
+        requests.
+        """
+
+        return {"requests": self.request_count,
+                "errors": self.error_count,
+                "rate_limited": self.rate_limited_count}
@@ -3,52 +3,154 @@ An option for the calculator is the usage of a local pokemon database. This data
 a file for all the API calls.
 """
 
-from .api_database import DatabaseAPIHandler
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from .api_database import DatabaseAPIHandler, DEFAULT_BATCH_SIZE, POKEMON_TABLES, NATURE_TABLES
 
-def get_all_pokemon_stats():
+# Define the number of worker threads, which fetch data in parallel as default.
+DEFAULT_MAX_WORKERS = 8
+
+
+def collect_data(fetch_function, bulk_save_function, id_range, max_workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Fetch the data for every id in the range with the fetch function and save the results in batches with the bulk save
+    function. If the number of workers is None or 1, every id is fetched one after another. Otherwise, a bounded pool of
+    worker threads fetches the data, while the results are saved in the calling thread as soon as a batch is complete,
+    because the database connection belongs to this thread.
+    """
+
+    # Check the batch size before the first request, so a wrong batch size does not lose the fetched data.
+    if batch_size < 1:
+        raise ValueError("The batch size needs to be at least 1, not {}.".format(batch_size))
+
+    # Collect the results until a batch is complete.
+    result_batch = []
+
+    # Use the sequential way without a worker pool.
+    if max_workers is None or max_workers <= 1:
+        for resource_id in id_range:
+            result_batch.append(fetch_function(resource_id))
+
+            if len(result_batch) >= batch_size:
+                bulk_save_function(result_batch, batch_size)
+                result_batch = []
+
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Start the fetching for all ids, the pool limits the number of parallel requests.
+            futures = [executor.submit(fetch_function, resource_id) for resource_id in id_range]
+
+            # Save the results while the other requests are still running. API errors are logged and returned as None
+            # by the fetch functions, so they do not stop the collection.
+            for future in as_completed(futures):
+                result_batch.append(future.result())
+
+                if len(result_batch) >= batch_size:
+                    bulk_save_function(result_batch, batch_size)
+                    result_batch = []
+
+    # Save the rest of the results.
+    if result_batch:
+        bulk_save_function(result_batch, batch_size)
+
+
+def get_all_pokemon_data(max_workers=None, batch_size=DEFAULT_BATCH_SIZE, database_handler=None):
+    """
+    Get all the pokemon with their names and stats. Every pokemon is fetched only once and both tables are filled with
+    the data of this one API call. Pokemon, which are already complete in the database file, are not fetched again, so
+    an interrupted collection is resumed. Another database handler, for example with another API client, can be given.
+    """
+
+    if database_handler is None:
+        database_handler = DatabaseAPIHandler()
+
+    # There are 807 pokemon callable in the API, but only the missing or failed ones are necessary.
+    missing_pokemon_ids = database_handler.get_missing_ids(range(1, 808), POKEMON_TABLES)
+
+    collect_data(database_handler.get_pokemon_data, database_handler.save_pokemon_data_bulk, missing_pokemon_ids,
+                 max_workers, batch_size)
+
+    log_failed_ids(database_handler, "pokemon")
+
+
+def get_all_nature_data(max_workers=None, batch_size=DEFAULT_BATCH_SIZE, database_handler=None):
+    """
+    Get all the natures with their names and status effects. Every nature is fetched only once and only if it is not
+    complete in the database file.
+    """
+
+    if database_handler is None:
+        database_handler = DatabaseAPIHandler()
+
+    missing_nature_ids = database_handler.get_missing_ids(range(1, 26), NATURE_TABLES)
+
+    collect_data(database_handler.get_nature_data, database_handler.save_nature_data_bulk, missing_nature_ids,
+                 max_workers, batch_size)
+
+    log_failed_ids(database_handler, "nature")
+
+
+def log_failed_ids(database_handler, resource_type):
+    """
+    Log the ids of a resource type, which failed in the collection according to the checkpoint table. They are fetched
+    again in the next collection run.
+    """
+
+    failed_ids = database_handler.get_checkpoint_ids(resource_type, "failed")
+
+    if failed_ids:
+        logging.warning("The collection of {} data failed for the ids {}. They are fetched again in the next "
+                        "run.".format(resource_type, failed_ids))
+
+
+def get_all_pokemon_stats(max_workers=None, batch_size=DEFAULT_BATCH_SIZE):
     """
     Get all the pokemon and their stats by an API call.
     """
 
     database_handler = DatabaseAPIHandler()
 
-    # There are 807 pokemon callable in the API.
-    for pokemon_number in range(1, 808):
-        pokemon_status_data = database_handler.get_pokemon_status_data(pokemon_number)
-        database_handler.save_pokemon_status_data(pokemon_status_data)
+    # There are 807 pokemon callable in the API, the pokemon with saved stats are skipped.
+    missing_pokemon_ids = database_handler.get_missing_ids(range(1, 808), POKEMON_TABLES[:1])
+
+    collect_data(database_handler.get_pokemon_status_data, database_handler.save_pokemon_status_data_bulk,
+                 missing_pokemon_ids, max_workers, batch_size)
 
 
-def get_all_pokemon_names():
+def get_all_pokemon_names(max_workers=None, batch_size=DEFAULT_BATCH_SIZE):
     """
     Similar function like get_all_pokemon_stats, but uses names.
     """
 
     database_handler = DatabaseAPIHandler()
 
-    for pokemon_number in range(1, 808):
-        pokemon_number_id_data = database_handler.get_pokemon_id_name_data(pokemon_number)
-        database_handler.save_pokemon_id_name_data(pokemon_number_id_data)
+    missing_pokemon_ids = database_handler.get_missing_ids(range(1, 808), POKEMON_TABLES[1:])
+
+    collect_data(database_handler.get_pokemon_id_name_data, database_handler.save_pokemon_id_name_data_bulk,
+                 missing_pokemon_ids, max_workers, batch_size)
 
 
-def get_all_nature_stats():
+def get_all_nature_stats(max_workers=None, batch_size=DEFAULT_BATCH_SIZE):
     """
     Similar to functions above.
     """
     database_handler = DatabaseAPIHandler()
 
-    for nature_number in range(1, 26):
-        nature_status_data = database_handler.get_nature_status_data(nature_number)
-        database_handler.save_nature_status_data(nature_status_data)
+    missing_nature_ids = database_handler.get_missing_ids(range(1, 26), NATURE_TABLES[:1])
 
+    collect_data(database_handler.get_nature_status_data, database_handler.save_nature_status_data_bulk,
+                 missing_nature_ids, max_workers, batch_size)
 
-def get_all_nature_names():
+
+def get_all_nature_names(max_workers=None, batch_size=DEFAULT_BATCH_SIZE):
     """
     Similar to functions above.
     """
 
     database_handler = DatabaseAPIHandler()
 
-    for nature_number in range(1, 26):
-        nature_id_data = database_handler.get_nature_id_name_data(nature_number)
-        database_handler.save_nature_id_name_data(nature_id_data)
+    missing_nature_ids = database_handler.get_missing_ids(range(1, 26), NATURE_TABLES[1:])
+
+    collect_data(database_handler.get_nature_id_name_data, database_handler.save_nature_id_name_data_bulk,
+                 missing_nature_ids, max_workers, batch_size)
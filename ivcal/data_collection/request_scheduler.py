@@ -0,0 +1,342 @@
+"""
+In this file, the scheduler for the requests of the data collection is defined. Every request of the API client passes
+a token bucket for the rate of the requests and an adaptive limit for the number of parallel requests. Temporary errors
+like a rate limit, a server error or a lost connection are retried with an exponential backoff and a random jitter,
+so a throttled or unstable run still collects every pokemon and every nature. The limit of parallel requests follows
+the server: It is halved, if the server pushes back, and grows slowly again with every successful request.
+"""
+
+import logging
+import random
+import threading
+import time
+
+from ivcal.metrics import get_metrics_registry
+
+# Define the status codes of temporary errors, which are retried.
+TRANSIENT_STATUS_CODES = [408, 425, 429, 500, 502, 503, 504]
+
+# Define the status codes, with which the server asks for fewer requests.
+PUSHBACK_STATUS_CODES = [429, 503]
+
+# Define the default number of retries of a request and the delays of the backoff in seconds.
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 0.1
+DEFAULT_MAX_DELAY = 10.0
+
+
+def get_status_code(request_error):
+    """
+    Get the HTTP status code of an error of a request. The errors of the local backend and the asynchronous client
+    have the status code as attribute, other errors may have a response with a status code. The result is None for
+    errors without a response, for example a lost connection.
+    """
+
+    status_code = getattr(request_error, "status_code", None)
+
+    if status_code is None:
+        status_code = getattr(getattr(request_error, "response", None), "status_code", None)
+
+    return status_code
+
+
+def is_transient_error(request_error):
+    """
+    Check, if an error of a request is temporary, so the request can be retried. Errors with a status code are
+    temporary for the status codes of a timeout, a rate limit or a server error. Errors without a status code are
+    temporary, if they are errors of the connection like a timeout or a reset, which are OSErrors in Python.
+    """
+
+    status_code = get_status_code(request_error)
+
+    if status_code is not None:
+        return status_code in TRANSIENT_STATUS_CODES
+
+    return isinstance(request_error, OSError)
+
+
+class TokenBucket:
+    """
+    Create a class for a token bucket, which limits the requests to a rate per second. The bucket holds up to its
+    capacity of tokens for short bursts and every request takes one token. If the bucket is empty, the request waits
+    for its token. Without a rate, the bucket does not limit the requests, but it can still be paused, for example for
+    the time of the header Retry-After of a response.
+    """
+
+    def __init__(self, rate=None, capacity=None):
+        if rate is not None and rate <= 0:
+            raise ValueError("The rate of the token bucket needs to be larger than 0, not {}.".format(rate))
+
+        if capacity is not None and capacity < 1:
+            raise ValueError("The capacity of the token bucket needs to be at least 1, not {}.".format(capacity))
+
+        if capacity is None:
+            capacity = max(1.0, rate) if rate is not None else 1.0
+
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.update_time = time.monotonic()
+
+        # Save the time, until which no request is allowed after a pause.
+        self.paused_until = 0.0
+
+        self.bucket_lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token and get the time in seconds, which the request has to wait for it. The token is reserved at once,
+        so waiting requests are served in the order of their reservation.
+        """
+
+        with self.bucket_lock:
+            current_time = time.monotonic()
+            waiting_time = max(0.0, self.paused_until - current_time)
+
+            if self.rate is not None:
+                # Refill the tokens of the time since the last reservation.
+                self.tokens = min(self.capacity, self.tokens + (current_time - self.update_time) * self.rate)
+                self.update_time = current_time
+                self.tokens -= 1
+
+                # A negative number of tokens is the debt of the waiting requests.
+                if self.tokens < 0:
+                    waiting_time = max(waiting_time, -self.tokens / self.rate)
+
+        return waiting_time
+
+    def acquire(self):
+        """
+        Wait for a token.
+        """
+
+        waiting_time = self.reserve()
+
+        if waiting_time > 0:
+            time.sleep(waiting_time)
+
+    def pause(self, pause_time):
+        """
+        Stop all requests for a time in seconds.
+        """
+
+        with self.bucket_lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + pause_time)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Create a class, which limits the number of parallel requests with additive increase and multiplicative decrease.
+    Every successful request increases the limit by the step divided by the limit, so the limit grows by about one step
+    for every full round of requests. A pushback of the server multiplies the limit with the decrease factor. The
+    pushbacks of the requests, which were already running, are the same signal, so the limit is only decreased once in
+    the decrease interval.
+    """
+
+    def __init__(self, max_limit, min_limit=1, initial_limit=None, increase_step=1.0, decrease_factor=0.5,
+                 decrease_interval=0.5):
+        if initial_limit is None:
+            initial_limit = max_limit
+
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(initial_limit)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.decrease_interval = decrease_interval
+
+        self.active_count = 0
+        self.last_decrease_time = None
+
+        self.limit_condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Wait until the number of running requests is below the limit and count the new request.
+        """
+
+        with self.limit_condition:
+            while self.active_count >= int(self.limit):
+                self.limit_condition.wait()
+
+            self.active_count += 1
+
+    def release(self):
+        """
+        Count a finished request and wake up a waiting request.
+        """
+
+        with self.limit_condition:
+            self.active_count -= 1
+            self.limit_condition.notify()
+
+    def __enter__(self):
+        self.acquire()
+
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.release()
+
+    def record_success(self):
+        """
+        Increase the limit after a successful request.
+        """
+
+        with self.limit_condition:
+            previous_limit = int(self.limit)
+            self.limit = min(float(self.max_limit), self.limit + self.increase_step / self.limit)
+
+            # Wake up the waiting requests, which are allowed with the new limit.
+            if int(self.limit) > previous_limit:
+                self.limit_condition.notify_all()
+
+    def record_pushback(self):
+        """
+        Decrease the limit after a pushback of the server. The result is True, if the limit has been decreased.
+        """
+
+        with self.limit_condition:
+            current_time = time.monotonic()
+
+            if self.last_decrease_time is not None and current_time - self.last_decrease_time < self.decrease_interval:
+                return False
+
+            self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+            self.last_decrease_time = current_time
+
+        return True
+
+    def get_limit(self):
+        """
+        Get the current limit of parallel requests.
+        """
+
+        return int(self.limit)
+
+
+class RequestScheduler:
+    """
+    Create a class, which executes the requests of the API client with a rate limit, an adaptive limit of parallel
+    requests and retries. A temporary error is retried up to the maximum number of retries after an exponential backoff
+    with full jitter: The delay is a random time between 0 and the base delay doubled for every retry, but not more
+    than the maximum delay. If the server sends the time of Retry-After, every request waits at least for this time.
+    Other errors and the error of the last retry are raised.
+    """
+
+    def __init__(self, rate=None, burst=None, max_concurrency=8, min_concurrency=1, max_retries=DEFAULT_MAX_RETRIES,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, seed=None):
+        self.token_bucket = TokenBucket(rate, burst)
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(max_concurrency, min_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        # Use an own random generator for the jitter, so a seed makes the delays repeatable.
+        self.random_generator = random.Random(seed)
+
+        # Count the requests, the retries, the pushbacks and the failed requests for statistics.
+        self.request_count = 0
+        self.retry_count = 0
+        self.pushback_count = 0
+        self.failure_count = 0
+        self.statistics_lock = threading.Lock()
+
+    def get_backoff_delay(self, retry_number, retry_after=None):
+        """
+        Get the delay in seconds before a retry with full jitter. The first retry has the number 0.
+        """
+
+        backoff_delay = self.random_generator.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry_number))
+
+        if retry_after is not None:
+            backoff_delay = max(backoff_delay, retry_after)
+
+        return backoff_delay
+
+    def count(self, statistics_name):
+        """
+        Increase a counter of the statistics by one.
+        """
+
+        with self.statistics_lock:
+            setattr(self, statistics_name, getattr(self, statistics_name) + 1)
+
+    def prepare_retry(self, request_error, retry_number):
+        """
+        Handle a temporary error before a retry and get the delay in seconds. A pushback of the server decreases the
+        limit of parallel requests and a time of Retry-After pauses all requests.
+        """
+
+        status_code = get_status_code(request_error)
+        retry_after = getattr(request_error, "retry_after", None)
+
+        if status_code in PUSHBACK_STATUS_CODES:
+            self.count("pushback_count")
+            self.concurrency_limiter.record_pushback()
+
+        if retry_after is not None:
+            self.token_bucket.pause(retry_after)
+
+        self.count("retry_count")
+        get_metrics_registry().increment("ivcal_api_retries_total",
+                                         reason=str(status_code) if status_code is not None
+                                         else type(request_error).__name__)
+
+        return self.get_backoff_delay(retry_number, retry_after)
+
+    def execute(self, request_function, *arguments):
+        """
+        Execute a request function with its arguments and retry it after temporary errors. The result is the result of
+        the request function.
+        """
+
+        retry_number = 0
+
+        while True:
+            with self.concurrency_limiter:
+                # An error of the rate limit is not a temporary error of the request, but the request fails as well.
+                try:
+                    self.token_bucket.acquire()
+
+                except Exception:
+                    self.count("failure_count")
+
+                    raise
+
+                self.count("request_count")
+
+                try:
+                    request_result = request_function(*arguments)
+
+                except Exception as request_error:
+                    if retry_number >= self.max_retries or not is_transient_error(request_error):
+                        self.count("failure_count")
+
+                        raise
+
+                    backoff_delay = self.prepare_retry(request_error, retry_number)
+                    logging.warning("Retry {} of {} after {:.3f} seconds: {}".format(retry_number + 1,
+                                                                                     self.max_retries, backoff_delay,
+                                                                                     request_error))
+
+                else:
+                    self.concurrency_limiter.record_success()
+
+                    return request_result
+
+            # Wait outside of the limit, so other requests can use the free place.
+            time.sleep(backoff_delay)
+            retry_number += 1
+
+    def get_statistics(self):
+        """
+        Get the statistics of the scheduler as dictionary with the number of requests, retries, pushbacks, failed
+        requests and the current limit of parallel requests.
+        """
+
+        return {"requests": self.request_count,
+                "retries": self.retry_count,
+                "pushbacks": self.pushback_count,
+                "failures": self.failure_count,
+                "concurrency_limit": self.concurrency_limiter.get_limit()}
@@ -0,0 +1,157 @@
+"""
+In this file, a persistent cache for the responses of the API is defined. The data of every fetched pokemon or nature is
+saved in a separate SQLite database file, so repeated lookups do not need the network, even after a restart.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from ivcal.metrics import get_metrics_registry
+
+# Define the default time in seconds, after which a cache entry expires. The data of the API rarely changes.
+DEFAULT_TIME_TO_LIVE = 30 * 24 * 60 * 60
+
+# Define the default maximum number of entries in the cache.
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class ResponseCache:
+    """
+    Create a class for a persistent cache of API responses. Every entry has a resource type like "pokemon" or "nature"
+    and a key like an id or a name. Expired entries are not used and the least recently used entries are removed, if
+    the cache is full.
+    """
+
+    def __init__(self, cache_path="api_cache.db", time_to_live=DEFAULT_TIME_TO_LIVE, max_entries=DEFAULT_MAX_ENTRIES):
+        self.time_to_live = time_to_live
+        self.max_entries = max_entries
+
+        # Count the hits and the misses of the cache for statistics.
+        self.hits = 0
+        self.misses = 0
+
+        # The cache can be used by the worker threads of the data collection, so the access needs a lock.
+        self.cache_lock = threading.Lock()
+
+        self.cache_connection = sqlite3.connect(cache_path, isolation_level=None, check_same_thread=False)
+
+        # The cache can be rebuilt at any time, so it does not need to wait for the disk after every write.
+        self.cache_connection.execute("PRAGMA journal_mode=WAL;")
+        self.cache_connection.execute("PRAGMA synchronous=NORMAL;")
+
+        self.init_cache()
+
+    def init_cache(self):
+        """
+        Initialize the table for the cache entries, if it is not there already.
+        """
+
+        self.cache_connection.execute('''CREATE TABLE IF NOT EXISTS response_cache (resource_type TEXT NOT NULL,
+        resource_key TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL,
+        PRIMARY KEY (resource_type, resource_key));''')
+
+        # The eviction searches for the least recently used entries.
+        self.cache_connection.execute('''CREATE INDEX IF NOT EXISTS response_cache_last_access
+        ON response_cache (last_access);''')
+
+    @staticmethod
+    def normalize_key(resource_key):
+        """
+        Normalize an id or a name to a key, so the id 25 and the name "Pikachu" find the same entries as "25" and
+        "pikachu".
+        """
+
+        return str(resource_key).lower()
+
+    def get(self, resource_type, resource_key):
+        """
+        Get the saved data for a resource type and a key. The result is None, if there is no entry or if the entry has
+        expired.
+        """
+
+        resource_key = self.normalize_key(resource_key)
+        current_time = time.time()
+
+        with self.cache_lock:
+            cache_result = self.cache_connection.execute('''SELECT payload, created_at FROM response_cache
+            WHERE resource_type=? AND resource_key=?;''', (resource_type, resource_key)).fetchone()
+
+            # Remove an expired entry, so it is fetched again.
+            if cache_result is not None and current_time - cache_result[1] > self.time_to_live:
+                self.cache_connection.execute('''DELETE FROM response_cache WHERE resource_type=?
+                AND resource_key=?;''', (resource_type, resource_key))
+                cache_result = None
+
+            get_metrics_registry().count_cache_lookup("response_cache", cache_result is not None)
+
+            if cache_result is None:
+                self.misses += 1
+
+                return None
+
+            self.hits += 1
+
+            # Save the access for the least recently used eviction.
+            self.cache_connection.execute('''UPDATE response_cache SET last_access=? WHERE resource_type=?
+            AND resource_key=?;''', (current_time, resource_type, resource_key))
+
+        return json.loads(cache_result[0])
+
+    def set(self, resource_type, resource_keys, payload):
+        """
+        Save the data for a resource type with every key in the list of keys, for example the id and the name of a
+        pokemon. The data needs to be serializable as JSON.
+        """
+
+        current_time = time.time()
+        serialized_payload = json.dumps(payload)
+
+        row_list = [(resource_type, self.normalize_key(resource_key), serialized_payload, current_time, current_time)
+                    for resource_key in resource_keys]
+
+        with self.cache_lock:
+            try:
+                self.cache_connection.execute("BEGIN;")
+                self.cache_connection.executemany('''INSERT OR REPLACE INTO response_cache (resource_type,
+                resource_key, payload, created_at, last_access) VALUES (?, ?, ?, ?, ?);''', row_list)
+                self.evict_entries()
+                self.cache_connection.execute("COMMIT;")
+
+            except Exception as cache_error:
+                if self.cache_connection.in_transaction:
+                    self.cache_connection.execute("ROLLBACK;")
+
+                logging.error("An error occurred while saving a cache entry: {}".format(cache_error), exc_info=True)
+
+    def evict_entries(self):
+        """
+        Remove the least recently used entries, if there are more entries than the maximum.
+        """
+
+        entry_count = self.cache_connection.execute("SELECT COUNT(*) FROM response_cache;").fetchone()[0]
+
+        if entry_count > self.max_entries:
+            self.cache_connection.execute('''DELETE FROM response_cache WHERE rowid IN (SELECT rowid FROM
+            response_cache ORDER BY last_access LIMIT ?);''', (entry_count - self.max_entries,))
+
+    def clear(self):
+        """
+        Remove all entries of the cache.
+        """
+
+        with self.cache_lock:
+            self.cache_connection.execute("DELETE FROM response_cache;")
+
+    def get_statistics(self):
+        """
+        Get the statistics of the cache as dictionary with the hits, the misses and the hit rate.
+        """
+
+        lookup_count = self.hits + self.misses
+
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookup_count if lookup_count > 0 else 0.0}
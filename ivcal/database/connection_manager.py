@@ -0,0 +1,158 @@
+"""
+In this file, a manager for the connections to the database file is defined. Every thread gets its own connection, which
+is reused by all the database classes in this thread, and every connection is configured with the same pragmas.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+# Define the default path of the database file.
+DEFAULT_DATABASE_PATH = "pokemon.db"
+
+# Define the default size of the memory map in bytes. The database file is small, so it fits completely.
+DEFAULT_MMAP_SIZE = 64 * 1024 * 1024
+
+# Define the default size of the page cache. A negative number is the size in KiB instead of the number of pages.
+DEFAULT_CACHE_SIZE = -8000
+
+
+class ConnectionManager:
+    """
+    Create a class for managing the connections to one database file. Writing connections use the WAL mode, so many
+    reading connections can query the database file, while another connection writes. Read only connections can not
+    change the database file at all.
+    """
+
+    def __init__(self, database_path=DEFAULT_DATABASE_PATH, mmap_size=DEFAULT_MMAP_SIZE, cache_size=DEFAULT_CACHE_SIZE,
+                 synchronous="NORMAL", journal_mode="WAL"):
+        self.database_path = database_path
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.synchronous = synchronous
+        self.journal_mode = journal_mode
+
+        # Save the connections of every thread separately, because a connection should only be used in one thread.
+        self.thread_connections = threading.local()
+
+        # Save all connections, so they can be closed together.
+        self.open_connections = []
+        self.connection_lock = threading.Lock()
+
+    def get_connection(self, read_only=False):
+        """
+        Get the connection of the current thread. A new connection is only opened for the first usage in a thread.
+        """
+
+        connection_dictionary = getattr(self.thread_connections, "connections", None)
+
+        if connection_dictionary is None:
+            connection_dictionary = {}
+            self.thread_connections.connections = connection_dictionary
+
+        database_connection = connection_dictionary.get(read_only)
+
+        if database_connection is None:
+            database_connection = self.open_connection(read_only)
+            connection_dictionary[read_only] = database_connection
+
+        return database_connection
+
+    def open_connection(self, read_only=False):
+        """
+        Open a new connection and configure it. The isolation level is set to None, so autocommit is possible.
+        """
+
+        if read_only is True:
+            # A read only connection needs an URI and the database file needs to exist.
+            database_uri = "{}?mode=ro".format(Path(self.database_path).absolute().as_uri())
+            database_connection = sqlite3.connect(database_uri, uri=True, isolation_level=None,
+                                                  check_same_thread=False)
+
+        else:
+            # If this file does not exist, it is created in this step.
+            database_connection = sqlite3.connect(self.database_path, isolation_level=None, check_same_thread=False)
+
+            # The journal mode is saved in the database file, so only a writing connection can change it.
+            database_connection.execute("PRAGMA journal_mode={};".format(self.journal_mode))
+
+        database_connection.execute("PRAGMA synchronous={};".format(self.synchronous))
+        database_connection.execute("PRAGMA cache_size={};".format(int(self.cache_size)))
+        database_connection.execute("PRAGMA mmap_size={};".format(int(self.mmap_size)))
+
+        with self.connection_lock:
+            self.open_connections.append(database_connection)
+
+        return database_connection
+
+    def close_all(self):
+        """
+        Close all connections of every thread.
+        """
+
+        with self.connection_lock:
+            for database_connection in self.open_connections:
+                database_connection.close()
+
+            self.open_connections = []
+
+        # The connections of other threads are closed as well, so they can not be reused.
+        self.thread_connections = threading.local()
+
+
+class MemoryConnectionManager(ConnectionManager):
+    """
+    Create a class for a copy of a database file in memory. The copy is made once with the backup API of SQLite, so
+    all queries are answered from memory afterwards. A database in memory belongs to its connection, so every thread
+    uses the same connection and changes are not written back to the database file.
+    """
+
+    def __init__(self, database_path=DEFAULT_DATABASE_PATH, mmap_size=DEFAULT_MMAP_SIZE, cache_size=DEFAULT_CACHE_SIZE):
+        super().__init__(database_path, mmap_size, cache_size)
+
+        # The database file is only read for the copy.
+        source_connection = sqlite3.connect("{}?mode=ro".format(Path(database_path).absolute().as_uri()), uri=True)
+        self.memory_connection = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+
+        try:
+            source_connection.backup(self.memory_connection)
+
+        finally:
+            source_connection.close()
+
+        self.memory_connection.execute("PRAGMA cache_size={};".format(int(self.cache_size)))
+        self.open_connections.append(self.memory_connection)
+
+    def get_connection(self, read_only=False):
+        """
+        Get the connection to the copy in memory, which is shared by all threads.
+        """
+
+        return self.memory_connection
+
+
+# Use one manager for the whole application as default.
+default_connection_manager = ConnectionManager()
+
+
+def get_connection_manager():
+    """
+    Get the connection manager, which is used by all database classes as default.
+    """
+
+    return default_connection_manager
+
+
+def configure_database(database_path=DEFAULT_DATABASE_PATH, mmap_size=DEFAULT_MMAP_SIZE,
+                       cache_size=DEFAULT_CACHE_SIZE, synchronous="NORMAL", journal_mode="WAL"):
+    """
+    Configure the default connection manager with a new path and new pragmas. The connections of the old manager are
+    closed.
+    """
+
+    global default_connection_manager
+
+    default_connection_manager.close_all()
+    default_connection_manager = ConnectionManager(database_path, mmap_size, cache_size, synchronous, journal_mode)
+
+    return default_connection_manager
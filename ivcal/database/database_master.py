@@ -3,17 +3,27 @@ In this file, an abstract database class is defined, so other classes can inheri
 the database file. There can be different purposes for a database connection.
 """
 
-import sqlite3
+from ivcal.database.connection_manager import get_connection_manager
 
 
 class MasterDatabaseClass:
     """
     Create an abstract/master database class with access to the database file.
     """
-    def __init__(self):
-        # Initialize a connection and if this file does not exist, it is created in this step. The isolation level is
-        # set to None, so autocommit is possible.
-        database_connection = sqlite3.connect("pokemon.db", isolation_level=None)
+    def __init__(self, read_only=False, connection_manager=None):
+        # Use the default connection manager, if there is not a specific one.
+        if connection_manager is None:
+            connection_manager = get_connection_manager()
+
+        # Get the shared connection of the current thread. If the database file does not exist, it is created in this
+        # step, except for a read only connection. The isolation level is set to None, so autocommit is possible.
+        database_connection = connection_manager.get_connection(read_only)
+
+        # Keep the path of the database file as key for data, which is loaded once per database file.
+        self.database_path = connection_manager.database_path
+
+        # Keep the connection accessible for explicit transactions.
+        self.database_connection = database_connection
 
         # Use a cursor as class object, so every function has access to the database.
         self.database_cursor = database_connection.cursor()
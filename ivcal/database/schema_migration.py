@@ -0,0 +1,131 @@
+"""
+In this file, the schema of the database file is defined as a list of versioned migrations. The version of a database
+file is saved in its user_version, so an existing database file is migrated in place and every migration runs only once.
+"""
+
+
+def create_initial_tables(database_cursor):
+    """
+    Create the tables of the first version without types, like the database files of older versions of this program.
+    """
+
+    # Create a table for the pokemon status data.
+    database_cursor.execute('''CREATE TABLE IF NOT EXISTS pokemon_status_data (pokemon_id primary key, pokemon_hp,
+    pokemon_attack, pokemon_defense, pokemon_sp_attack, pokemon_sp_defense, pokemon_speed);''')
+
+    # Create a table for a mapping between the id and the name of a pokemon.
+    database_cursor.execute('''CREATE TABLE IF NOT EXISTS pokemon_id_name_mapping (pokemon_id primary key,
+    pokemon_name);''')
+
+    # Create a table for the nature data and the effect of a nature on the status data.
+    database_cursor.execute('''CREATE TABLE IF NOT EXISTS nature_status_data (nature_id primary key, decrease,
+    increase);''')
+
+    # Create a table for a mapping between the id and the name of a nature.
+    database_cursor.execute('''CREATE TABLE IF NOT EXISTS nature_id_name_mapping (nature_id primary key,
+    nature_name);''')
+
+    # Create a table for the progress of the data collection, so an interrupted collection can be resumed.
+    database_cursor.execute('''CREATE TABLE IF NOT EXISTS collection_checkpoint (resource_type, resource_id, status,
+    PRIMARY KEY (resource_type, resource_id));''')
+
+
+def rebuild_table(database_cursor, table_name, create_query, column_expressions, index_queries=()):
+    """
+    Rebuild a table with a new definition and copy its rows. The column expressions select the old columns in the order
+    of the new table, so they can cast the values to their types. The indexes are created before the rows are copied,
+    so rows, which break a new constraint or a unique index, are skipped.
+    """
+
+    database_cursor.execute("ALTER TABLE {0} RENAME TO {0}_old;".format(table_name))
+    database_cursor.execute(create_query)
+
+    for index_query in index_queries:
+        database_cursor.execute(index_query)
+
+    database_cursor.execute("INSERT OR IGNORE INTO {0} SELECT {1} FROM {0}_old;".format(table_name,
+                                                                                        ", ".join(column_expressions)))
+    database_cursor.execute("DROP TABLE {}_old;".format(table_name))
+
+
+def create_typed_tables(database_cursor):
+    """
+    Rebuild the tables with INTEGER and TEXT columns. An INTEGER PRIMARY KEY is the rowid of a table, so the lookups
+    by id do not need a separate index. The name columns get unique indexes, so the lookups by name are index seeks.
+    The checkpoint table has a primary key with two columns, so it is saved WITHOUT ROWID.
+    """
+
+    rebuild_table(database_cursor, "pokemon_status_data", '''CREATE TABLE pokemon_status_data (
+    pokemon_id INTEGER PRIMARY KEY, pokemon_hp INTEGER NOT NULL, pokemon_attack INTEGER NOT NULL,
+    pokemon_defense INTEGER NOT NULL, pokemon_sp_attack INTEGER NOT NULL, pokemon_sp_defense INTEGER NOT NULL,
+    pokemon_speed INTEGER NOT NULL);''', ["CAST(pokemon_id AS INTEGER)", "CAST(pokemon_hp AS INTEGER)",
+                                          "CAST(pokemon_attack AS INTEGER)", "CAST(pokemon_defense AS INTEGER)",
+                                          "CAST(pokemon_sp_attack AS INTEGER)", "CAST(pokemon_sp_defense AS INTEGER)",
+                                          "CAST(pokemon_speed AS INTEGER)"])
+
+    rebuild_table(database_cursor, "pokemon_id_name_mapping", '''CREATE TABLE pokemon_id_name_mapping (
+    pokemon_id INTEGER PRIMARY KEY, pokemon_name TEXT NOT NULL);''', ["CAST(pokemon_id AS INTEGER)",
+                                                                      "CAST(pokemon_name AS TEXT)"],
+                  ['''CREATE UNIQUE INDEX pokemon_name_index ON pokemon_id_name_mapping (pokemon_name);'''])
+
+    # Natures without an effect have NULL as decreased and increased value.
+    rebuild_table(database_cursor, "nature_status_data", '''CREATE TABLE nature_status_data (
+    nature_id INTEGER PRIMARY KEY, decrease TEXT, increase TEXT);''', ["CAST(nature_id AS INTEGER)", "decrease",
+                                                                       "increase"])
+
+    rebuild_table(database_cursor, "nature_id_name_mapping", '''CREATE TABLE nature_id_name_mapping (
+    nature_id INTEGER PRIMARY KEY, nature_name TEXT NOT NULL);''', ["CAST(nature_id AS INTEGER)",
+                                                                    "CAST(nature_name AS TEXT)"],
+                  ['''CREATE UNIQUE INDEX nature_name_index ON nature_id_name_mapping (nature_name);'''])
+
+    rebuild_table(database_cursor, "collection_checkpoint", '''CREATE TABLE collection_checkpoint (
+    resource_type TEXT NOT NULL, resource_id INTEGER NOT NULL, status TEXT NOT NULL,
+    PRIMARY KEY (resource_type, resource_id)) WITHOUT ROWID;''', ["CAST(resource_type AS TEXT)",
+                                                                  "CAST(resource_id AS INTEGER)",
+                                                                  "CAST(status AS TEXT)"])
+
+
+# Define all migrations with their version in the order of their execution. A new migration needs a new version at the
+# end of the list.
+SCHEMA_MIGRATIONS = [
+    (1, create_initial_tables),
+    (2, create_typed_tables),
+]
+
+
+def get_schema_version(database_connection):
+    """
+    Get the version of the schema of a database file. A new database file has the version 0.
+    """
+
+    return database_connection.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def migrate_database(database_connection):
+    """
+    Run all migrations, which are newer than the version of the database file. Every migration runs in its own
+    transaction with its new version, so a failed migration does not leave a half migrated database file.
+    """
+
+    # Most of the time, the database file is up to date and nothing needs to be locked.
+    if get_schema_version(database_connection) >= SCHEMA_MIGRATIONS[-1][0]:
+        return
+
+    database_cursor = database_connection.cursor()
+
+    for schema_version, migration_function in SCHEMA_MIGRATIONS:
+        # Lock the database file for writing, so two connections can not run the same migration.
+        database_cursor.execute("BEGIN IMMEDIATE;")
+
+        try:
+            # Check the version again, another connection could have migrated the database file in the meantime.
+            if get_schema_version(database_connection) < schema_version:
+                migration_function(database_cursor)
+                database_cursor.execute("PRAGMA user_version={};".format(schema_version))
+
+            database_cursor.execute("COMMIT;")
+
+        except Exception:
+            database_cursor.execute("ROLLBACK;")
+
+            raise
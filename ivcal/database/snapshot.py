@@ -0,0 +1,320 @@
+"""
+In this file, a compact binary snapshot of the database file is defined. The snapshot contains the base stats of all
+pokemon as array with a fixed width, the natures and sorted name indexes. It is memory-mapped by the loader, so lookups
+work without SQLite and read the records in place. Only the names, which are compared by the binary search, are copied.
+
+The snapshot has the following sections, all numbers are little-endian:
+    header: magic, format version, number of pokemon, number of natures, size of the string section
+    pokemon records: id and six base status values, sorted by id
+    pokemon name index: offset and length of the name in the string section and id, sorted by name
+    nature records: id, code of the decreased value and code of the increased value, sorted by id
+    nature name index: like the pokemon name index
+    string section: all names encoded as UTF-8
+"""
+
+import mmap
+import os
+import struct
+import threading
+
+from ivcal.calculation.name_index import NameIndex
+from ivcal.calculation.nature_table import NatureMultiplierTable, NATURE_STATUS_VALUES, get_nature_table
+
+SNAPSHOT_MAGIC = b"IVCS"
+SNAPSHOT_VERSION = 1
+
+HEADER_STRUCT = struct.Struct("<4sHHHI")
+POKEMON_RECORD_STRUCT = struct.Struct("<H6H")
+NATURE_RECORD_STRUCT = struct.Struct("<HBB")
+NAME_INDEX_STRUCT = struct.Struct("<IHH")
+
+# Define the codes of the status values, which can be influenced by a nature. 0 is a nature without an effect.
+NATURE_VALUE_CODES = {value: code for code, value in enumerate(NATURE_STATUS_VALUES, start=1)}
+
+
+def build_name_index(id_name_pairs, string_section):
+    """
+    Add the names to the string section and build the records of a name index, sorted by the encoded name.
+    """
+
+    name_index = []
+
+    encoded_pairs = [(resource_id, name.encode("utf-8")) for resource_id, name in id_name_pairs]
+
+    for resource_id, encoded_name in sorted(encoded_pairs, key=lambda id_name_pair: id_name_pair[1]):
+        name_index.append(NAME_INDEX_STRUCT.pack(len(string_section), len(encoded_name), resource_id))
+        string_section.extend(encoded_name)
+
+    return name_index
+
+
+def export_snapshot(database_handler, snapshot_path):
+    """
+    Export the pokemon and the natures of a database handler for the calculator to a snapshot file. The file is written
+    to a temporary file first and replaced at the end, so a reading process never sees a half written snapshot.
+    """
+
+    pokemon_rows = sorted(database_handler.get_all_pokemon_rows())
+    nature_rows = sorted(database_handler.get_all_nature_rows())
+
+    string_section = bytearray()
+
+    pokemon_records = [POKEMON_RECORD_STRUCT.pack(pokemon_row[0], *pokemon_row[2:8]) for pokemon_row in pokemon_rows]
+    pokemon_name_index = build_name_index([(pokemon_row[0], pokemon_row[1]) for pokemon_row in pokemon_rows],
+                                          string_section)
+
+    nature_records = [NATURE_RECORD_STRUCT.pack(nature_id, NATURE_VALUE_CODES.get(decreased_value, 0),
+                                                NATURE_VALUE_CODES.get(increased_value, 0))
+                      for nature_id, _, decreased_value, increased_value in nature_rows]
+    nature_name_index = build_name_index([(nature_row[0], nature_row[1]) for nature_row in nature_rows],
+                                         string_section)
+
+    temporary_path = "{}.tmp".format(snapshot_path)
+
+    with open(temporary_path, "wb") as snapshot_file:
+        snapshot_file.write(HEADER_STRUCT.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(pokemon_rows), len(nature_rows),
+                                               len(string_section)))
+
+        for section in [pokemon_records, pokemon_name_index, nature_records, nature_name_index]:
+            snapshot_file.write(b"".join(section))
+
+        snapshot_file.write(string_section)
+
+    os.replace(temporary_path, snapshot_path)
+
+    return {"pokemon": len(pokemon_rows), "natures": len(nature_rows)}
+
+
+class BaseStatSnapshot:
+    """
+    Create a class for the lookups in a memory-mapped snapshot file. It has the same lookup methods as the species
+    index and the database handler for the calculator, so it can replace them.
+    """
+
+    def __init__(self, snapshot_path):
+        self.snapshot_path = snapshot_path
+
+        with open(snapshot_path, "rb") as snapshot_file:
+            # The memory map stays valid after closing the file.
+            self.snapshot_buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Use a view of the memory map for reading whole sections without copying them.
+        self.snapshot_view = memoryview(self.snapshot_buffer)
+
+        # A file, which is shorter than the header, can not be a snapshot.
+        if len(self.snapshot_buffer) < HEADER_STRUCT.size:
+            raise ValueError("The file {} is not a snapshot of version {}.".format(snapshot_path, SNAPSHOT_VERSION))
+
+        snapshot_magic, snapshot_version, self.pokemon_count, self.nature_count, string_section_size = \
+            HEADER_STRUCT.unpack_from(self.snapshot_buffer, 0)
+
+        if snapshot_magic != SNAPSHOT_MAGIC or snapshot_version != SNAPSHOT_VERSION:
+            raise ValueError("The file {} is not a snapshot of version {}.".format(snapshot_path, SNAPSHOT_VERSION))
+
+        # Calculate the offsets of all sections with the numbers of the header.
+        self.pokemon_records_offset = HEADER_STRUCT.size
+        self.pokemon_name_index_offset = self.pokemon_records_offset + self.pokemon_count * POKEMON_RECORD_STRUCT.size
+        self.nature_records_offset = self.pokemon_name_index_offset + self.pokemon_count * NAME_INDEX_STRUCT.size
+        self.nature_name_index_offset = self.nature_records_offset + self.nature_count * NATURE_RECORD_STRUCT.size
+        self.string_section_offset = self.nature_name_index_offset + self.nature_count * NAME_INDEX_STRUCT.size
+
+        if self.string_section_offset + string_section_size != len(self.snapshot_buffer):
+            raise ValueError("The snapshot {} is incomplete.".format(snapshot_path))
+
+        # The index of the names is only created for the first search of a misspelled name.
+        self.name_index = None
+
+    def __len__(self):
+        return self.pokemon_count
+
+    def close(self):
+        """
+        Close the memory map of the snapshot.
+        """
+
+        self.snapshot_view.release()
+        self.snapshot_buffer.close()
+
+    def find_name(self, name_index_offset, entry_count, resource_name):
+        """
+        Find the id of a name with a binary search in a name index. The result is None, if the name does not exist. A
+        memory view can not be compared by its order, so every compared name is copied from the memory map.
+        """
+
+        encoded_name = resource_name.encode("utf-8")
+        lower_position = 0
+        upper_position = entry_count
+
+        while lower_position < upper_position:
+            middle_position = (lower_position + upper_position) // 2
+            string_offset, string_length, resource_id = NAME_INDEX_STRUCT.unpack_from(
+                self.snapshot_buffer, name_index_offset + middle_position * NAME_INDEX_STRUCT.size)
+
+            name_start = self.string_section_offset + string_offset
+            candidate_name = self.snapshot_buffer[name_start:name_start + string_length]
+
+            if candidate_name < encoded_name:
+                lower_position = middle_position + 1
+
+            elif candidate_name > encoded_name:
+                upper_position = middle_position
+
+            else:
+                return resource_id
+
+        return None
+
+    def find_record(self, records_offset, record_struct, entry_count, resource_id):
+        """
+        Find the record of an id with a binary search in records, which are sorted by their id. The result is the
+        unpacked record or None, if the id does not exist.
+        """
+
+        lower_position = 0
+        upper_position = entry_count
+
+        while lower_position < upper_position:
+            middle_position = (lower_position + upper_position) // 2
+            record = record_struct.unpack_from(self.snapshot_buffer,
+                                               records_offset + middle_position * record_struct.size)
+
+            if record[0] < resource_id:
+                lower_position = middle_position + 1
+
+            elif record[0] > resource_id:
+                upper_position = middle_position
+
+            else:
+                return record
+
+        return None
+
+    def read_names(self, name_index_offset, entry_count):
+        """
+        Read all ids and names of a name index as a dictionary.
+        """
+
+        names_by_id = {}
+
+        for string_offset, string_length, resource_id in NAME_INDEX_STRUCT.iter_unpack(
+                self.snapshot_view[name_index_offset:name_index_offset + entry_count * NAME_INDEX_STRUCT.size]):
+            name_start = self.string_section_offset + string_offset
+            names_by_id[resource_id] = str(self.snapshot_view[name_start:name_start + string_length], "utf-8")
+
+        return names_by_id
+
+    def get_pokemon_id_by_name(self, pokemon_name):
+        """
+        Get the id of a pokemon by its name.
+        """
+
+        return self.find_name(self.pokemon_name_index_offset, self.pokemon_count, pokemon_name)
+
+    def get_base_stats_row(self, pokemon_id):
+        """
+        Get the tuple with the base status values of a pokemon by its id. The result is None, if the pokemon does not
+        exist.
+        """
+
+        pokemon_record = self.find_record(self.pokemon_records_offset, POKEMON_RECORD_STRUCT, self.pokemon_count,
+                                          pokemon_id)
+
+        if pokemon_record is None:
+            return None
+
+        return pokemon_record[1:]
+
+    def get_pokemon_base_stats_by_id(self, pokemon_id):
+        """
+        Get the base stats of a pokemon by its id as dictionary, like it is used by the IV calculator.
+        """
+
+        base_stats_row = self.get_base_stats_row(pokemon_id)
+
+        if base_stats_row is None:
+            return None
+
+        return dict(zip(["hp", "attack", "defense", "special-attack", "special-defense", "speed"], base_stats_row))
+
+    def get_all_pokemon_rows(self):
+        """
+        Get a list with the id, the name and the six base status values of every pokemon, like the database handler.
+        """
+
+        pokemon_names = self.read_names(self.pokemon_name_index_offset, self.pokemon_count)
+        pokemon_records = self.snapshot_view[self.pokemon_records_offset:self.pokemon_name_index_offset]
+
+        return [(pokemon_record[0], pokemon_names[pokemon_record[0]]) + pokemon_record[1:]
+                for pokemon_record in POKEMON_RECORD_STRUCT.iter_unpack(pokemon_records)]
+
+    def get_all_nature_rows(self):
+        """
+        Get a list with the id, the name, the decreased and the increased value of every nature, like the database
+        handler.
+        """
+
+        nature_names = self.read_names(self.nature_name_index_offset, self.nature_count)
+        nature_records = self.snapshot_view[self.nature_records_offset:self.nature_name_index_offset]
+        nature_values = [None] + NATURE_STATUS_VALUES
+
+        return [(nature_id, nature_names[nature_id], nature_values[decreased_code], nature_values[increased_code])
+                for nature_id, decreased_code, increased_code in NATURE_RECORD_STRUCT.iter_unpack(nature_records)]
+
+    def get_species_index(self):
+        """
+        Get the species index of the snapshot. The snapshot answers the lookups itself, so it is its own index.
+        """
+
+        return self
+
+    def get_name_index(self):
+        """
+        Get the index of the pokemon names in the snapshot for the search with a normalized spelling, a prefix or an
+        edit distance.
+        """
+
+        if self.name_index is None:
+            self.name_index = NameIndex(pokemon_row[:2] for pokemon_row in self.get_all_pokemon_rows())
+
+        return self.name_index
+
+    def get_nature_table(self):
+        """
+        Get the table with the multipliers of all natures in the snapshot. It is loaded only once per snapshot file.
+        """
+
+        return get_nature_table(("snapshot", self.snapshot_path), lambda: NatureMultiplierTable.from_database(self))
+
+    def get_nature_id_by_name(self, nature_name):
+        """
+        Get the id of a nature by its name.
+        """
+
+        return self.find_name(self.nature_name_index_offset, self.nature_count, nature_name)
+
+    def get_nature_status_effects(self, nature_id):
+        """
+        Get the read only dictionary with the effect of a nature on every status value.
+        """
+
+        return self.get_nature_table().get_nature_status_effects(nature_id)
+
+
+# Save the loaded snapshots, so every snapshot file is only mapped once per process.
+loaded_snapshots = {}
+snapshot_lock = threading.Lock()
+
+
+def load_snapshot(snapshot_path):
+    """
+    Get the memory-mapped snapshot of a file. The file is only mapped for the first usage in a process.
+    """
+
+    with snapshot_lock:
+        snapshot = loaded_snapshots.get(snapshot_path)
+
+        if snapshot is None:
+            snapshot = BaseStatSnapshot(snapshot_path)
+            loaded_snapshots[snapshot_path] = snapshot
+
+    return snapshot
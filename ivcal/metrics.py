@@ -0,0 +1,327 @@
+"""
+In this file, the metrics of the application are defined. Counters count events like API calls or cache hits,
+histograms count the latencies of functions like database queries or IV calculations in buckets. The metrics are
+disabled as default, so a disabled metric only costs one check of a flag. They can be exported as JSON snapshot or in
+the text format of Prometheus.
+"""
+
+import functools
+import inspect
+import json
+import threading
+import time
+from bisect import bisect_left
+
+# Define the upper bounds of the buckets of a latency histogram in seconds.
+DEFAULT_LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class MetricsRegistry:
+    """
+    Create a class for collecting counters and histograms. Every metric has a name and labels, for example the name of
+    a method, and every combination of labels is counted separately.
+    """
+
+    def __init__(self, enabled=False, latency_buckets=DEFAULT_LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.latency_buckets = tuple(latency_buckets)
+
+        # Save the counters with their name and their labels as key and the value as number.
+        self.counters = {}
+
+        # Save the histograms with their name and their labels as key and a list with the counts of every bucket, the
+        # sum and the count of all values.
+        self.histograms = {}
+
+        # Save the functions, which return the statistics of caches with their own counters like functools.lru_cache.
+        self.cache_info_functions = {}
+
+        # The metrics are collected by the worker threads of the data collection as well.
+        self.metrics_lock = threading.Lock()
+
+    @staticmethod
+    def create_key(metric_name, labels):
+        """
+        Create the key of a metric with its name and its labels, which are sorted, so their order does not matter.
+        """
+
+        return metric_name, tuple(sorted(labels.items()))
+
+    def increment(self, metric_name, value=1, **labels):
+        """
+        Increment a counter by a value, if the metrics are enabled.
+        """
+
+        if not self.enabled:
+            return
+
+        metric_key = self.create_key(metric_name, labels)
+
+        with self.metrics_lock:
+            self.counters[metric_key] = self.counters.get(metric_key, 0) + value
+
+    def observe(self, metric_name, value, **labels):
+        """
+        Count a value, for example a latency in seconds, in the bucket of a histogram, if the metrics are enabled.
+        """
+
+        if not self.enabled:
+            return
+
+        metric_key = self.create_key(metric_name, labels)
+
+        # The last bucket counts the values, which are larger than all bounds.
+        bucket_position = bisect_left(self.latency_buckets, value)
+
+        with self.metrics_lock:
+            histogram = self.histograms.get(metric_key)
+
+            if histogram is None:
+                histogram = [[0] * (len(self.latency_buckets) + 1), 0.0, 0]
+                self.histograms[metric_key] = histogram
+
+            histogram[0][bucket_position] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def count_cache_lookup(self, cache_name, is_hit):
+        """
+        Count a hit or a miss of a cache, so the hit rate of every cache is a part of the snapshot.
+        """
+
+        if not self.enabled:
+            return
+
+        self.increment("ivcal_cache_lookups_total", cache=cache_name, result="hit" if is_hit else "miss")
+
+    def register_cache_info(self, cache_name, cache_info_function):
+        """
+        Register a function, which returns the hits and the misses of a cache with its own counters, for example the
+        function cache_info of functools.lru_cache. Its hit rate is a part of the snapshot, even if the metrics are
+        disabled.
+        """
+
+        self.cache_info_functions[cache_name] = cache_info_function
+
+    def reset(self):
+        """
+        Remove all collected metrics.
+        """
+
+        with self.metrics_lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def get_cache_hit_rates(self):
+        """
+        Get a dictionary with the hit rate of every cache with lookups.
+        """
+
+        cache_lookups = {}
+
+        with self.metrics_lock:
+            for (metric_name, labels), value in self.counters.items():
+                if metric_name != "ivcal_cache_lookups_total":
+                    continue
+
+                label_dictionary = dict(labels)
+                cache_counts = cache_lookups.setdefault(label_dictionary["cache"], {"hit": 0, "miss": 0})
+                cache_counts[label_dictionary["result"]] += value
+
+        for cache_name, cache_info_function in self.cache_info_functions.items():
+            cache_info = cache_info_function()
+            cache_lookups[cache_name] = {"hit": cache_info.hits, "miss": cache_info.misses}
+
+        return {cache_name: cache_counts["hit"] / (cache_counts["hit"] + cache_counts["miss"])
+                for cache_name, cache_counts in cache_lookups.items() if cache_counts["hit"] + cache_counts["miss"] > 0}
+
+    def get_snapshot(self):
+        """
+        Get all metrics as dictionary, which can be serialized as JSON. Every histogram contains its count, its sum, its
+        mean value and the counts of its buckets.
+        """
+
+        with self.metrics_lock:
+            counter_list = [{"name": metric_name, "labels": dict(labels), "value": value}
+                            for (metric_name, labels), value in sorted(self.counters.items())]
+
+            histogram_list = []
+
+            for (metric_name, labels), (bucket_counts, value_sum, value_count) in sorted(self.histograms.items()):
+                histogram_list.append({"name": metric_name,
+                                       "labels": dict(labels),
+                                       "count": value_count,
+                                       "sum": value_sum,
+                                       "mean": value_sum / value_count,
+                                       "buckets": dict(zip([str(bucket_bound) for bucket_bound in self.latency_buckets]
+                                                           + ["+Inf"], bucket_counts))})
+
+        return {"counters": counter_list,
+                "histograms": histogram_list,
+                "cache_hit_rates": self.get_cache_hit_rates()}
+
+    @staticmethod
+    def format_labels(labels, extra_labels=()):
+        """
+        Format labels in the text format of Prometheus like {method="fetch_pokemon_data"}.
+        """
+
+        all_labels = list(labels) + list(extra_labels)
+
+        if not all_labels:
+            return ""
+
+        return "{{{}}}".format(",".join('{}="{}"'.format(label_name, str(label_value).replace('"', '\\"'))
+                                        for label_name, label_value in all_labels))
+
+    def to_prometheus(self):
+        """
+        Get all metrics in the text format of Prometheus. The buckets of a histogram are cumulative in this format.
+        """
+
+        text_lines = []
+        written_types = set()
+
+        with self.metrics_lock:
+            for (metric_name, labels), value in sorted(self.counters.items()):
+                if metric_name not in written_types:
+                    text_lines.append("# TYPE {} counter".format(metric_name))
+                    written_types.add(metric_name)
+
+                text_lines.append("{}{} {}".format(metric_name, self.format_labels(labels), value))
+
+            for (metric_name, labels), (bucket_counts, value_sum, value_count) in sorted(self.histograms.items()):
+                if metric_name not in written_types:
+                    text_lines.append("# TYPE {} histogram".format(metric_name))
+                    written_types.add(metric_name)
+
+                cumulative_count = 0
+
+                for bucket_bound, bucket_count in zip([str(bucket_bound) for bucket_bound in self.latency_buckets]
+                                                      + ["+Inf"], bucket_counts):
+                    cumulative_count += bucket_count
+                    text_lines.append("{}_bucket{} {}".format(metric_name,
+                                                              self.format_labels(labels, [("le", bucket_bound)]),
+                                                              cumulative_count))
+
+                text_lines.append("{}_sum{} {}".format(metric_name, self.format_labels(labels), value_sum))
+                text_lines.append("{}_count{} {}".format(metric_name, self.format_labels(labels), value_count))
+
+        # The cache hit rates are calculated from the counters.
+        for cache_name, hit_rate in sorted(self.get_cache_hit_rates().items()):
+            if "ivcal_cache_hit_rate" not in written_types:
+                text_lines.append("# TYPE ivcal_cache_hit_rate gauge")
+                written_types.add("ivcal_cache_hit_rate")
+
+            text_lines.append("ivcal_cache_hit_rate{} {}".format(self.format_labels([("cache", cache_name)]),
+                                                                 hit_rate))
+
+        return "\n".join(text_lines) + "\n"
+
+    def to_json(self):
+        """
+        Get the snapshot of all metrics as JSON string.
+        """
+
+        return json.dumps(self.get_snapshot(), indent=4)
+
+    def save(self, metrics_path):
+        """
+        Save the metrics to a file. A file with the extension .prom or .txt is written in the text format of
+        Prometheus, every other file as JSON snapshot.
+        """
+
+        if metrics_path.endswith((".prom", ".txt")):
+            metrics_text = self.to_prometheus()
+
+        else:
+            metrics_text = self.to_json()
+
+        with open(metrics_path, "w") as metrics_file:
+            metrics_file.write(metrics_text)
+
+
+# Use one registry for the whole application, which is disabled as default.
+metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry():
+    """
+    Get the registry, which is used by the whole application.
+    """
+
+    return metrics_registry
+
+
+def enable_metrics():
+    """
+    Enable the collection of metrics.
+    """
+
+    metrics_registry.enabled = True
+
+
+def disable_metrics():
+    """
+    Disable the collection of metrics. The collected metrics are kept.
+    """
+
+    metrics_registry.enabled = False
+
+
+def timed(metric_name, **labels):
+    """
+    Create a decorator, which counts the latency of every call of a function in a histogram. The name of the function
+    is used as label "operation", if there is not such a label. Errors are counted in a counter with the same name, but
+    the ending "_errors_total" instead of "_seconds". If the metrics are disabled, the function is called directly.
+    """
+
+    def decorator(function):
+        function_labels = dict(labels)
+        function_labels.setdefault("operation", function.__name__)
+        error_metric_name = "{}_errors_total".format(metric_name[:-len("_seconds")] if
+                                                     metric_name.endswith("_seconds") else metric_name)
+
+        # A coroutine function is measured until its coroutine is finished.
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def timed_coroutine_function(*arguments, **keyword_arguments):
+                if not metrics_registry.enabled:
+                    return await function(*arguments, **keyword_arguments)
+
+                start_time = time.perf_counter()
+
+                try:
+                    return await function(*arguments, **keyword_arguments)
+
+                except Exception:
+                    metrics_registry.increment(error_metric_name, **function_labels)
+
+                    raise
+
+                finally:
+                    metrics_registry.observe(metric_name, time.perf_counter() - start_time, **function_labels)
+
+            return timed_coroutine_function
+
+        @functools.wraps(function)
+        def timed_function(*arguments, **keyword_arguments):
+            if not metrics_registry.enabled:
+                return function(*arguments, **keyword_arguments)
+
+            start_time = time.perf_counter()
+
+            try:
+                return function(*arguments, **keyword_arguments)
+
+            except Exception:
+                metrics_registry.increment(error_metric_name, **function_labels)
+
+                raise
+
+            finally:
+                metrics_registry.observe(metric_name, time.perf_counter() - start_time, **function_labels)
+
+        return timed_function
+
+    return decorator
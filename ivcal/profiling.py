@@ -0,0 +1,284 @@
+"""
+In this file, the profiling of a run is defined. The deterministic mode uses cProfile in every thread and saves the
+merged profile in the format of pstats. The sampling mode reads the stacks of all threads in a fixed interval from a
+background thread, so long runs like a data collection can be profiled with a small overhead. It saves the stacks in
+the folded format of flame graphs. Both modes print a ranked summary of the hottest functions of the ivcal package.
+"""
+
+import collections
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+
+# Define the directory of the package, which is used to find the functions of ivcal in a profile.
+PACKAGE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# Define the modes of the profiling.
+PROFILE_MODES = ["cprofile", "sampling"]
+
+# Define the default interval between two samples in seconds and the default number of functions in a summary.
+DEFAULT_SAMPLE_INTERVAL = 0.005
+DEFAULT_SUMMARY_LIMIT = 20
+
+
+def print_profile_summary(profile_path, summary_limit=DEFAULT_SUMMARY_LIMIT, sort_key="tottime"):
+    """
+    Print the functions of the ivcal package in a cProfile file, ranked by their own time as default.
+    """
+
+    profile_statistics = pstats.Stats(profile_path, stream=sys.stdout)
+    profile_statistics.sort_stats(sort_key)
+
+    # The restriction is a regular expression for the file names, the limit is used after it.
+    profile_statistics.print_stats(re.escape(PACKAGE_DIRECTORY), summary_limit)
+
+
+class ThreadProfiler:
+    """
+    Create a class for a deterministic profile of all threads. cProfile only profiles the thread, in which it is
+    enabled, so every thread, which is started during the profile, enables its own profiler with its first function
+    call, for example the worker threads of the data collection. The profiles of all threads are merged into one file.
+    """
+
+    def __init__(self):
+        # The first profiler belongs to the thread, which starts the profile.
+        self.profilers = [cProfile.Profile()]
+        self.profiler_lock = threading.Lock()
+
+    def enable_thread_profiler(self, frame, event, argument):
+        """
+        Enable a profiler for a new thread. This function is the profile function of every new thread until its first
+        call, after that the profiler replaces it.
+        """
+
+        sys.setprofile(None)
+        thread_profiler = cProfile.Profile()
+
+        try:
+            thread_profiler.enable()
+
+        except ValueError:
+            # Since Python 3.12, cProfile uses sys.monitoring, so there is only one profiler, which sees all threads.
+            return
+
+        with self.profiler_lock:
+            self.profilers.append(thread_profiler)
+
+    def start(self):
+        """
+        Start the profile of the current thread and of all threads, which are started later.
+        """
+
+        threading.setprofile(self.enable_thread_profiler)
+        self.profilers[0].enable()
+
+    def stop(self):
+        """
+        Stop the profile of the current thread. The profilers of the other threads stop with their threads.
+        """
+
+        self.profilers[0].disable()
+        threading.setprofile(None)
+
+    def save(self, profile_path):
+        """
+        Merge the profiles of all threads and save them in the format of pstats.
+        """
+
+        with self.profiler_lock:
+            profilers = list(self.profilers)
+
+        profile_statistics = None
+
+        for profiler in profilers:
+            try:
+                thread_statistics = pstats.Stats(profiler)
+
+            except TypeError:
+                # The profile of a thread without a function call is empty and can not be loaded.
+                continue
+
+            if profile_statistics is None:
+                profile_statistics = thread_statistics
+
+            else:
+                profile_statistics.add(thread_statistics)
+
+        profile_statistics.dump_stats(profile_path)
+
+
+class SamplingProfiler:
+    """
+    Create a class for a sampling profiler. A background thread saves the stack of every other thread in every
+    interval. The samples are wall-clock samples, so waiting threads are counted as well, for example a worker thread,
+    which waits for a response.
+    """
+
+    def __init__(self, sample_interval=DEFAULT_SAMPLE_INTERVAL):
+        self.sample_interval = sample_interval
+
+        # Count the samples of every stack, a stack is a tuple of frames from the outermost to the innermost frame.
+        self.stack_counts = collections.Counter()
+        self.sample_count = 0
+
+        self.stop_event = threading.Event()
+        self.sampling_thread = None
+
+    @staticmethod
+    def describe_frame(frame):
+        """
+        Describe the function of a frame with its file, its first line and its name.
+        """
+
+        frame_code = frame.f_code
+
+        return frame_code.co_filename, frame_code.co_firstlineno, frame_code.co_name
+
+    def take_sample(self):
+        """
+        Save the current stack of every thread except the sampling thread.
+        """
+
+        sampling_thread_id = threading.get_ident()
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == sampling_thread_id:
+                continue
+
+            stack = []
+
+            while frame is not None:
+                stack.append(self.describe_frame(frame))
+                frame = frame.f_back
+
+            stack.reverse()
+            self.stack_counts[tuple(stack)] += 1
+
+        self.sample_count += 1
+
+    def run_sampling(self):
+        """
+        Take samples until the profiler is stopped.
+        """
+
+        while not self.stop_event.wait(self.sample_interval):
+            self.take_sample()
+
+    def start(self):
+        """
+        Start the sampling in a background thread.
+        """
+
+        self.stop_event.clear()
+        self.sampling_thread = threading.Thread(target=self.run_sampling, name="ivcal-sampling-profiler", daemon=True)
+        self.sampling_thread.start()
+
+    def stop(self):
+        """
+        Stop the sampling and wait for the background thread.
+        """
+
+        self.stop_event.set()
+
+        if self.sampling_thread is not None:
+            self.sampling_thread.join()
+            self.sampling_thread = None
+
+    def get_function_counts(self):
+        """
+        Get two counters for the functions of all samples. The first one counts the samples, in which a function is the
+        innermost frame (own time), the second one counts the samples, in which a function is in the stack (total time).
+        """
+
+        own_counts = collections.Counter()
+        total_counts = collections.Counter()
+
+        for stack, stack_count in self.stack_counts.items():
+            own_counts[stack[-1]] += stack_count
+
+            # A recursive function is only counted once per stack.
+            for function_description in set(stack):
+                total_counts[function_description] += stack_count
+
+        return own_counts, total_counts
+
+    def save(self, profile_path):
+        """
+        Save the stacks in the folded format, every line contains the functions of a stack separated by semicolons and
+        the number of its samples. This file can be used for flame graphs.
+        """
+
+        with open(profile_path, "w") as profile_file:
+            for stack, stack_count in self.stack_counts.most_common():
+                profile_file.write("{} {}\n".format(";".join("{}:{}:{}".format(os.path.basename(file_name), line_number,
+                                                                               function_name)
+                                                             for file_name, line_number, function_name in stack),
+                                                    stack_count))
+
+    def print_summary(self, summary_limit=DEFAULT_SUMMARY_LIMIT):
+        """
+        Print the functions of the ivcal package with the most samples, ranked by their own samples. The share of the
+        total samples is the share of the samples, in which the function is in the stack.
+        """
+
+        own_counts, total_counts = self.get_function_counts()
+
+        package_functions = [function_description for function_description in total_counts
+                             if function_description[0].startswith(PACKAGE_DIRECTORY)]
+        package_functions.sort(key=lambda function_description: (own_counts[function_description],
+                                                                 total_counts[function_description]), reverse=True)
+
+        stack_sample_count = max(sum(self.stack_counts.values()), 1)
+
+        print("{} samples with an interval of {} seconds, {} stacks of all threads".format(
+            self.sample_count, self.sample_interval, stack_sample_count))
+        print("{:>8} {:>8} {:>8} {:>8}  function".format("own", "own %", "total", "total %"))
+
+        for file_name, line_number, function_name in package_functions[:summary_limit]:
+            function_description = (file_name, line_number, function_name)
+
+            print("{:>8} {:>8.1f} {:>8} {:>8.1f}  {}:{}({})".format(
+                own_counts[function_description], 100 * own_counts[function_description] / stack_sample_count,
+                total_counts[function_description], 100 * total_counts[function_description] / stack_sample_count,
+                os.path.relpath(file_name, os.path.dirname(PACKAGE_DIRECTORY)), line_number, function_name))
+
+
+def profile_function(function, profile_path, profile_mode="cprofile", sample_interval=DEFAULT_SAMPLE_INTERVAL,
+                     summary_limit=DEFAULT_SUMMARY_LIMIT):
+    """
+    Call a function with a profiler, save the profile to the file and print a summary of the hottest functions of the
+    ivcal package. The profile is saved even after an error of the function. The result is the result of the function.
+    """
+
+    if profile_mode == "cprofile":
+        profiler = ThreadProfiler()
+        profiler.start()
+
+        try:
+            return function()
+
+        finally:
+            profiler.stop()
+            profiler.save(profile_path)
+            print_profile_summary(profile_path, summary_limit)
+
+    if profile_mode == "sampling":
+        profiler = SamplingProfiler(sample_interval)
+        profiler.start()
+        start_time = time.perf_counter()
+
+        try:
+            return function()
+
+        finally:
+            profiler.stop()
+            profiler.save(profile_path)
+
+            print("Profile of {:.3f} seconds saved to {}.".format(time.perf_counter() - start_time, profile_path))
+            profiler.print_summary(summary_limit)
+
+    raise ValueError("The profile mode {} is not one of {}.".format(profile_mode, PROFILE_MODES))
@@ -0,0 +1,425 @@
+"""
+In this file, a long-running HTTP service for the IV calculation is defined. It uses asyncio and keeps the connections
+of its clients alive, so a client can send many requests without a new process or a new connection for every request.
+The pokemon and the natures are resolved with the species index and the nature table of a copy of the database file in
+memory, which is loaded once at the start of every worker process.
+
+The service has the following endpoints:
+    POST /iv: calculate the IV values of one pokemon, the body is a JSON object like a row of the batch mode
+    POST /iv/batch: calculate the IV values of many pokemon, the body is a JSON list of these objects or an object
+        with this list as "pokemon"
+    GET /health: the state of the service with the number of pokemon and natures
+    GET /metrics: the metrics of the worker process in the text format of Prometheus
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from http import HTTPStatus
+
+from ivcal.calculation.batch_processing import get_range_values, parse_pokemon_row, resolve_pokemon_row
+from ivcal.calculation.calculator import IVCalculator
+from ivcal.calculation.iv_range_solver import IVRangeSolver
+from ivcal.calculation.calculator_database import DatabaseCalculatorHandler
+from ivcal.database.connection_manager import MemoryConnectionManager, DEFAULT_DATABASE_PATH
+from ivcal.metrics import enable_metrics, get_metrics_registry
+
+# Define the default address of the service.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# Define the time in seconds, after which an idle connection is closed.
+DEFAULT_KEEP_ALIVE_TIMEOUT = 30
+
+# Define the maximum size of the header and of the body of a request in bytes.
+MAX_HEADER_SIZE = 16 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+
+# Define the paths of the endpoints.
+SERVICE_PATHS = ["/iv", "/iv/batch", "/health", "/metrics"]
+
+# Define the maximum number of pokemon in one batch request, so one request does not block the worker for long.
+MAX_BATCH_SIZE = 1000
+
+
+class HTTPError(Exception):
+    """
+    Create an error, which is answered with a status code and a message instead of a result.
+    """
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class IVService:
+    """
+    Create a class for the calculations of the service. The species index and the nature table are loaded once from a
+    copy of the database file in memory and shared by all requests of the worker process.
+    """
+
+    def __init__(self, database_path=DEFAULT_DATABASE_PATH):
+        self.database_path = database_path
+
+        # Copy the database file to memory, the copy is only read.
+        self.connection_manager = MemoryConnectionManager(database_path)
+        self.database_handler = DatabaseCalculatorHandler(read_only=True, connection_manager=self.connection_manager)
+
+        self.species_index = self.database_handler.get_species_index()
+        self.nature_table = self.database_handler.get_nature_table()
+
+    def calculate_pokemon(self, raw_row):
+        """
+        Calculate the IV values of one pokemon with the IV calculator and the exact IV ranges with the IV range solver.
+        The input is a dictionary like a row of the batch mode and the result is a dictionary with the columns of a row
+        of the batch mode: the name, the level, the nature, the IV values and their minimum and maximum. A ValueError
+        is raised for an invalid pokemon.
+        """
+
+        try:
+            pokemon_row = parse_pokemon_row(raw_row)
+
+        except KeyError as key_error:
+            raise ValueError("The value {} is missing.".format(key_error))
+
+        # A value of a wrong type or a number, which is too large for an integer, is an invalid pokemon as well.
+        except (TypeError, OverflowError) as conversion_error:
+            raise ValueError(str(conversion_error))
+
+        # The resolution raises a ValueError for an unknown pokemon or nature.
+        resolve_pokemon_row(pokemon_row, self.species_index, self.nature_table)
+
+        pokemon_input_data = dict(pokemon_row)
+        pokemon_input_data.update(self.nature_table.get_nature_status_effects(
+            self.nature_table.get_nature_id_by_name(pokemon_row["nature"])))
+
+        pokemon_base_data = self.species_index.get_pokemon_base_stats_by_id(
+            self.species_index.get_pokemon_id_by_name(pokemon_row["name"]))
+
+        iv_result = {"name": pokemon_row["name"], "level": pokemon_row["level"], "nature": pokemon_row["nature"]}
+        iv_result.update(IVCalculator(pokemon_input_data, pokemon_base_data).calculate_all_iv_values())
+        iv_ranges = IVRangeSolver(pokemon_input_data, pokemon_base_data).calculate_all_iv_ranges()
+        iv_result.update(get_range_values(iv_ranges))
+
+        return iv_result
+
+    def calculate_batch(self, raw_rows):
+        """
+        Calculate the IV values of a list of pokemon. The result contains a dictionary for every pokemon with its index
+        and its result or its error, so an invalid pokemon does not stop the other ones.
+        """
+
+        batch_results = []
+
+        for row_index, raw_row in enumerate(raw_rows):
+            try:
+                batch_results.append({"index": row_index, "result": self.calculate_pokemon(raw_row)})
+
+            except ValueError as row_error:
+                batch_results.append({"index": row_index, "error": str(row_error)})
+
+        return batch_results
+
+    def get_health(self):
+        """
+        Get the state of the service.
+        """
+
+        return {"status": "ok",
+                "pid": os.getpid(),
+                "pokemon": len(self.species_index),
+                "natures": len(self.nature_table)}
+
+    def handle_request(self, method, path, request_body):
+        """
+        Answer a request with a tuple of the status code, the content type and the body of the response. An invalid
+        request raises an HTTPError.
+        """
+
+        if path == "/health":
+            check_method(method, "GET")
+
+            return HTTPStatus.OK, "application/json", json.dumps(self.get_health())
+
+        if path == "/metrics":
+            check_method(method, "GET")
+
+            return HTTPStatus.OK, "text/plain; version=0.0.4", get_metrics_registry().to_prometheus()
+
+        if path == "/iv":
+            check_method(method, "POST")
+
+            try:
+                iv_result = self.calculate_pokemon(parse_json_body(request_body))
+
+            except ValueError as row_error:
+                raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, str(row_error))
+
+            return HTTPStatus.OK, "application/json", json.dumps(iv_result)
+
+        if path == "/iv/batch":
+            check_method(method, "POST")
+
+            raw_rows = parse_json_body(request_body)
+
+            if isinstance(raw_rows, dict):
+                raw_rows = raw_rows.get("pokemon")
+
+            if not isinstance(raw_rows, list):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "The body needs to be a list of pokemon.")
+
+            if len(raw_rows) > MAX_BATCH_SIZE:
+                raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "A batch can contain {} pokemon as a "
+                                                                     "maximum.".format(MAX_BATCH_SIZE))
+
+            return HTTPStatus.OK, "application/json", json.dumps({"results": self.calculate_batch(raw_rows)})
+
+        raise HTTPError(HTTPStatus.NOT_FOUND, "The path {} does not exist.".format(path))
+
+    def close(self):
+        """
+        Close the copy of the database file in memory.
+        """
+
+        self.connection_manager.close_all()
+
+
+def check_method(method, allowed_method):
+    """
+    Check the method of a request for an endpoint.
+    """
+
+    if method != allowed_method:
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "The method {} is not allowed, use {}.".format(method,
+                                                                                                      allowed_method))
+
+
+def parse_json_body(request_body):
+    """
+    Parse the body of a request as JSON.
+    """
+
+    try:
+        return json.loads(request_body)
+
+    except ValueError as json_error:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "The body is not valid JSON: {}".format(json_error))
+
+
+def build_response(status_code, content_type, response_body, keep_alive=True):
+    """
+    Build the bytes of an HTTP response with its header.
+    """
+
+    encoded_body = response_body.encode("utf-8")
+
+    response_header = ("HTTP/1.1 {} {}\r\n"
+                       "Content-Type: {}\r\n"
+                       "Content-Length: {}\r\n"
+                       "Connection: {}\r\n\r\n").format(int(status_code), HTTPStatus(status_code).phrase, content_type,
+                                                         len(encoded_body), "keep-alive" if keep_alive else "close")
+
+    return response_header.encode("latin-1") + encoded_body
+
+
+async def read_request(stream_reader, keep_alive_timeout):
+    """
+    Read one request of a connection. The result is a tuple with the method, the path, the version, the headers and the
+    body or None, if the client closed the connection or was idle for longer than the timeout.
+    """
+
+    try:
+        raw_header = await asyncio.wait_for(stream_reader.readuntil(b"\r\n\r\n"), keep_alive_timeout)
+
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+
+    except asyncio.LimitOverrunError:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "The header of the request is too large.")
+
+    header_lines = raw_header.decode("latin-1").split("\r\n")
+
+    try:
+        method, target, version = header_lines[0].split(" ")
+
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "The request line is invalid.")
+
+    headers = {}
+
+    for header_line in header_lines[1:]:
+        if header_line:
+            header_name, _, header_value = header_line.partition(":")
+            headers[header_name.strip().lower()] = header_value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(HTTPStatus.NOT_IMPLEMENTED, "Chunked requests are not supported.")
+
+    try:
+        content_length = int(headers.get("content-length", 0))
+
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "The content length is invalid.")
+
+    if content_length > MAX_BODY_SIZE:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "The body of the request is too large.")
+
+    request_body = await stream_reader.readexactly(content_length) if content_length > 0 else b""
+
+    # The query of the target is not used by any endpoint.
+    path = target.split("?", 1)[0]
+
+    return method, path, version, headers, request_body
+
+
+def is_keep_alive(version, headers):
+    """
+    Check, if a connection should be kept alive after a request. HTTP/1.1 keeps connections alive as default, HTTP/1.0
+    only with the header "Connection: keep-alive".
+    """
+
+    connection_header = headers.get("connection", "").lower()
+
+    if version == "HTTP/1.0":
+        return connection_header == "keep-alive"
+
+    return connection_header != "close"
+
+
+async def handle_connection(iv_service, stream_reader, stream_writer, keep_alive_timeout=DEFAULT_KEEP_ALIVE_TIMEOUT):
+    """
+    Answer all requests of a connection, until the client closes it, does not want to keep it alive or is idle for
+    longer than the timeout. The calculations are fast, so they are answered in the event loop.
+    """
+
+    metrics_registry = get_metrics_registry()
+
+    try:
+        while True:
+            keep_alive = False
+
+            try:
+                request = await read_request(stream_reader, keep_alive_timeout)
+
+                if request is None:
+                    break
+
+                method, path, version, headers, request_body = request
+                keep_alive = is_keep_alive(version, headers)
+
+                start_time = time.perf_counter()
+
+                try:
+                    status_code, content_type, response_body = iv_service.handle_request(method, path, request_body)
+
+                finally:
+                    # Unknown paths share one label, so the number of histograms is limited.
+                    metrics_registry.observe("ivcal_http_request_seconds", time.perf_counter() - start_time,
+                                             path=path if path in SERVICE_PATHS else "other")
+
+            except HTTPError as http_error:
+                status_code = http_error.status_code
+                content_type = "application/json"
+                response_body = json.dumps({"error": str(http_error)})
+
+            except Exception as service_error:
+                logging.error("An error occurred in the HTTP service: {}".format(service_error), exc_info=True)
+
+                status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+                content_type = "application/json"
+                response_body = json.dumps({"error": "Internal server error."})
+
+            metrics_registry.increment("ivcal_http_requests_total", status=int(status_code))
+
+            stream_writer.write(build_response(status_code, content_type, response_body, keep_alive))
+            await stream_writer.drain()
+
+            if keep_alive is False:
+                break
+
+    except ConnectionError:
+        pass
+
+    finally:
+        stream_writer.close()
+
+
+async def serve(iv_service, host=DEFAULT_HOST, port=DEFAULT_PORT, reuse_port=False,
+                keep_alive_timeout=DEFAULT_KEEP_ALIVE_TIMEOUT):
+    """
+    Run the HTTP server of a worker process, until it is cancelled. With reuse_port, many worker processes can listen
+    on the same port and the operating system distributes the connections between them.
+    """
+
+    http_server = await asyncio.start_server(
+        lambda stream_reader, stream_writer: handle_connection(iv_service, stream_reader, stream_writer,
+                                                               keep_alive_timeout),
+        host, port, reuse_port=reuse_port or None, limit=MAX_HEADER_SIZE)
+
+    async with http_server:
+        await http_server.serve_forever()
+
+
+def run_service_worker(database_path=DEFAULT_DATABASE_PATH, host=DEFAULT_HOST, port=DEFAULT_PORT, reuse_port=False,
+                       keep_alive_timeout=DEFAULT_KEEP_ALIVE_TIMEOUT):
+    """
+    Load the service and run its HTTP server in the current process. The metrics are enabled for the endpoint /metrics.
+    """
+
+    enable_metrics()
+
+    iv_service = IVService(database_path)
+
+    try:
+        asyncio.run(serve(iv_service, host, port, reuse_port, keep_alive_timeout))
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        iv_service.close()
+
+
+def run_service(database_path=DEFAULT_DATABASE_PATH, host=DEFAULT_HOST, port=DEFAULT_PORT, worker_count=1,
+                keep_alive_timeout=DEFAULT_KEEP_ALIVE_TIMEOUT):
+    """
+    Run the HTTP service with a number of worker processes. A single worker runs in the current process, more workers
+    run in own processes, which listen on the same port with SO_REUSEPORT. Every worker has its own copy of the
+    database file in memory.
+    """
+
+    if worker_count <= 1:
+        run_service_worker(database_path, host, port, False, keep_alive_timeout)
+
+        return
+
+    worker_processes = [multiprocessing.Process(target=run_service_worker, args=(database_path, host, port, True,
+                                                                                 keep_alive_timeout),
+                                                name="ivcal-service-worker-{}".format(worker_number))
+                        for worker_number in range(worker_count)]
+
+    for worker_process in worker_processes:
+        worker_process.start()
+
+    # Stop the workers as well, if the main process is terminated.
+    signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+
+    try:
+        for worker_process in worker_processes:
+            worker_process.join()
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        for worker_process in worker_processes:
+            if worker_process.is_alive():
+                worker_process.terminate()
+
+        for worker_process in worker_processes:
+            worker_process.join()
@@ -0,0 +1,81 @@
+"""
+In this file, the startup time of the local calculation and the batch calculation is measured against a time budget.
+Every measurement runs in a new Python process, so the imports are not cached. The measurement also checks, that the
+API client, pokepy and the data collection are not loaded for a startup without the API.
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Define the modes of the startup with the imports, which are necessary for them, the budget for these imports in
+# seconds and the modules, which must not be loaded.
+STARTUP_MODES = {
+    "local": {"imports": "import ivcal\nfrom ivcal.calculation.calculator_database import DatabaseCalculatorHandler",
+              "budget": 0.1,
+              "forbidden_modules": ["pokepy", "numpy", "ivcal.data_collection.call_api",
+                                    "ivcal.data_collection.api_database", "ivcal.data_collection.massive_api_call"]},
+    "batch": {"imports": "import ivcal\nimport ivcal.calculation.batch_processing",
+              "budget": 0.3,
+              "forbidden_modules": ["pokepy", "ivcal.data_collection.call_api", "ivcal.data_collection.api_database",
+                                    "ivcal.data_collection.massive_api_call"]},
+}
+
+# Define the script, which measures the imports in a new process and prints the result as JSON.
+MEASUREMENT_SCRIPT = """
+import json
+import sys
+import time
+
+start_time = time.perf_counter()
+{imports}
+import_time = time.perf_counter() - start_time
+
+print(json.dumps({{"import_time": import_time, "loaded_modules": sorted(sys.modules)}}))
+"""
+
+
+def measure_startup(startup_mode, repeat_count=5):
+    """
+    Measure the startup of a mode in new processes and return a dictionary with the median of the import time, the
+    median of the time of the whole process, the budget, the forbidden modules, which were loaded, and the result of
+    the check.
+    """
+
+    mode_settings = STARTUP_MODES[startup_mode]
+    measurement_script = MEASUREMENT_SCRIPT.format(imports=mode_settings["imports"])
+
+    import_times = []
+    process_times = []
+    loaded_modules = set()
+
+    for _ in range(repeat_count):
+        start_time = time.perf_counter()
+        measurement_output = subprocess.run([sys.executable, "-c", measurement_script], check=True,
+                                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+        process_times.append(time.perf_counter() - start_time)
+
+        measurement_result = json.loads(measurement_output)
+        import_times.append(measurement_result["import_time"])
+        loaded_modules.update(measurement_result["loaded_modules"])
+
+    import_time = statistics.median(import_times)
+    loaded_forbidden_modules = [module_name for module_name in mode_settings["forbidden_modules"]
+                                if module_name in loaded_modules]
+
+    return {"mode": startup_mode,
+            "import_time": import_time,
+            "process_time": statistics.median(process_times),
+            "budget": mode_settings["budget"],
+            "loaded_forbidden_modules": loaded_forbidden_modules,
+            "within_budget": import_time <= mode_settings["budget"] and not loaded_forbidden_modules}
+
+
+def check_startup_budgets(repeat_count=5):
+    """
+    Measure the startup of every mode and return a list with the results.
+    """
+
+    return [measure_startup(startup_mode, repeat_count) for startup_mode in STARTUP_MODES]
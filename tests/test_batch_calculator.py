@@ -0,0 +1,100 @@
+"""
+In this file, the batch calculator is tested against the IV calculator, which is the reference for the results of one
+single pokemon.
+"""
+
+import random
+import unittest
+
+from ivcal.calculation.batch_calculator import BatchIVCalculator, NATURE_STATUS_VALUES, STATUS_VALUES
+from ivcal.calculation.calculator import IVCalculator
+from ivcal.calculation.iv_range_solver import calculate_stat_value, get_nature_percentage
+
+# Define the number of random pokemon, which are compared.
+POKEMON_COUNT = 5000
+
+
+def create_random_pokemon(random_generator):
+    """
+    Create a tuple with a random input data dictionary and a random base data dictionary. Most status values are
+    calculated with the stat formula, the others are random, so the results outside of the IV values are tested as well.
+    """
+
+    pokemon_base_data = {value: random_generator.randint(1, 255) for value in STATUS_VALUES}
+    pokemon_input_data = {"level": random_generator.randint(1, 100)}
+
+    for value in STATUS_VALUES:
+        ev_value = random_generator.randint(0, 255)
+        pokemon_input_data["{}_ev".format(value)] = ev_value
+
+        if value != "hp":
+            pokemon_input_data["{}_nature".format(value)] = random_generator.choice([0.9, 1, 1.1])
+            nature_percentage = get_nature_percentage(pokemon_input_data["{}_nature".format(value)])
+
+        else:
+            nature_percentage = 100
+
+        if random_generator.random() < 0.8:
+            pokemon_input_data[value] = calculate_stat_value(pokemon_base_data[value], pokemon_input_data["level"],
+                                                             ev_value, random_generator.randint(0, 31),
+                                                             nature_percentage, value == "hp")
+
+        else:
+            pokemon_input_data[value] = random_generator.randint(1, 1000)
+
+    return pokemon_input_data, pokemon_base_data
+
+
+class BatchIVCalculatorTest(unittest.TestCase):
+    """
+    Test the batch calculator with random pokemon.
+    """
+
+    def test_results_equal_iv_calculator(self):
+        """
+        Every result of the batch calculator needs to be the result of the IV calculator for the same pokemon.
+        """
+
+        random_generator = random.Random(1)
+        pokemon_data_list = [create_random_pokemon(random_generator) for _ in range(POKEMON_COUNT)]
+
+        batch_calculator = BatchIVCalculator.from_dictionaries(pokemon_data_list)
+        batch_results = batch_calculator.results_to_dictionaries(batch_calculator.calculate_all_iv_values())
+
+        for (pokemon_input_data, pokemon_base_data), batch_result in zip(pokemon_data_list, batch_results):
+            self.assertEqual(IVCalculator(pokemon_input_data, pokemon_base_data).calculate_all_iv_values(),
+                             batch_result)
+
+    def test_from_dictionaries_uses_column_order(self):
+        """
+        The columns of the arrays need to be in the order of the status values.
+        """
+
+        pokemon_input_data, pokemon_base_data = create_random_pokemon(random.Random(2))
+        batch_calculator = BatchIVCalculator.from_dictionaries([(pokemon_input_data, pokemon_base_data)])
+
+        self.assertEqual(batch_calculator.stats_array[0].tolist(), [pokemon_input_data[value]
+                                                                    for value in STATUS_VALUES])
+        self.assertEqual(batch_calculator.nature_array[0].tolist(), [pokemon_input_data["{}_nature".format(value)]
+                                                                     for value in NATURE_STATUS_VALUES])
+
+    def test_different_row_counts_are_rejected(self):
+        """
+        Arrays with a different number of rows are not allowed.
+        """
+
+        with self.assertRaises(ValueError):
+            BatchIVCalculator([50, 50], [[100] * 6], [[0] * 6], [[1] * 5], [[100] * 6])
+
+    def test_level_below_1_is_rejected(self):
+        """
+        A level of 0 or less is not allowed, because the IV values would be infinite or NaN.
+        """
+
+        for level in [0, -5]:
+            with self.assertRaises(ValueError):
+                BatchIVCalculator([50, level], [[100] * 6] * 2, [[0] * 6] * 2, [[1] * 5] * 2, [[100] * 6] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+In this file, the check of the rows of an input file of the batch mode is tested with rows like in a JSONL file.
+"""
+
+import unittest
+
+from ivcal.calculation.batch_processing import parse_integer, parse_pokemon_row
+
+
+def create_raw_row(**changed_values):
+    """
+    Create a valid row of a JSONL file with the changed values.
+    """
+
+    raw_row = {"name": "Pikachu", "nature": "Lonely", "level": 50, "hp": 95, "attack": 60, "defense": 45,
+               "special-attack": 55, "special-defense": 55, "speed": 95, "attack_ev": 252}
+    raw_row.update(changed_values)
+
+    return raw_row
+
+
+class ParseRowTest(unittest.TestCase):
+    """
+    Test the check and the transformation of input rows.
+    """
+
+    def test_valid_row_is_transformed(self):
+        """
+        A valid row has lowercase names, integer values and an effort value of 0 for every missing effort value.
+        """
+
+        pokemon_row = parse_pokemon_row(create_raw_row(level=50.0, hp="95"))
+
+        self.assertEqual(pokemon_row["name"], "pikachu")
+        self.assertEqual(pokemon_row["nature"], "lonely")
+        self.assertEqual(pokemon_row["level"], 50)
+        self.assertEqual(pokemon_row["hp"], 95)
+        self.assertEqual(pokemon_row["attack_ev"], 252)
+        self.assertEqual(pokemon_row["speed_ev"], 0)
+
+    def test_booleans_are_rejected(self):
+        """
+        A boolean is not a number, although true and false are 1 and 0 in Python.
+        """
+
+        for raw_value in [True, False]:
+            with self.assertRaises(ValueError):
+                parse_integer(raw_value)
+
+            for column_name in ["level", "hp", "attack_ev"]:
+                with self.assertRaises(ValueError):
+                    parse_pokemon_row(create_raw_row(**{column_name: raw_value}))
+
+    def test_non_integral_numbers_are_rejected(self):
+        """
+        A float with a fractional part, Infinity, NaN and text are not valid values.
+        """
+
+        for raw_value in [50.5, float("inf"), float("nan"), "fifty"]:
+            with self.assertRaises(ValueError):
+                parse_pokemon_row(create_raw_row(level=raw_value))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+In this file, the sharing of parallel fetches in the API client is tested with the local backend.
+"""
+
+import threading
+import unittest
+
+from ivcal.data_collection.call_api import APIClient
+from ivcal.data_collection.local_api_backend import LocalBackendError
+
+# Define the number of threads, which fetch the same key at the same time.
+THREAD_COUNT = 16
+
+# Define the latency of the local backend in seconds, so all threads start while the first fetch is running.
+BACKEND_LATENCY = 0.2
+
+
+def fetch_in_parallel(fetch_function, fetch_key):
+    """
+    Call the fetch function with the same key in many threads at the same time. The result is a tuple with the list of
+    the results and the list of the errors.
+    """
+
+    start_barrier = threading.Barrier(THREAD_COUNT)
+    results = []
+    errors = []
+    result_lock = threading.Lock()
+
+    def fetch():
+        start_barrier.wait()
+
+        try:
+            result = fetch_function(fetch_key)
+
+        except Exception as fetch_error:
+            with result_lock:
+                errors.append(fetch_error)
+
+        else:
+            with result_lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=fetch) for _ in range(THREAD_COUNT)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return results, errors
+
+
+class APIClientTest(unittest.TestCase):
+    """
+    Test the memory of the API client and the sharing of fetches, which are running at the same time.
+    """
+
+    def setUp(self):
+        self.api_client = APIClient(backend="local", backend_options={"latency": BACKEND_LATENCY})
+
+    def test_parallel_fetches_share_one_request(self):
+        """
+        Threads, which fetch the same pokemon at the same time, need to get the same record of one request.
+        """
+
+        results, errors = fetch_in_parallel(self.api_client.get_pokemon_record, 25)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), THREAD_COUNT)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(results[0]["id"], 25)
+        self.assertEqual(self.api_client.client.get_statistics()["requests"], 1)
+        self.assertEqual(self.api_client.in_flight_fetches, {})
+
+    def test_record_is_found_by_id_and_by_name(self):
+        """
+        A fetched record is saved in memory with its id and its name, so the other key does not need a request.
+        """
+
+        pokemon_record = self.api_client.get_pokemon_record(25)
+
+        self.assertIs(self.api_client.get_pokemon_record("Pokemon-25"), pokemon_record)
+        self.assertIs(self.api_client.get_pokemon_record("25"), pokemon_record)
+        self.assertEqual(self.api_client.client.get_statistics()["requests"], 1)
+
+    def test_error_reaches_every_waiting_thread(self):
+        """
+        An error of the fetch needs to be raised in every waiting thread and the fetch is removed, so a later call sends
+        a new request.
+        """
+
+        results, errors = fetch_in_parallel(self.api_client.get_pokemon_record, 100000)
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), THREAD_COUNT)
+        self.assertTrue(all(isinstance(error, LocalBackendError) and error.status_code == 404 for error in errors))
+        self.assertEqual(self.api_client.client.get_statistics()["requests"], 1)
+        self.assertEqual(self.api_client.in_flight_fetches, {})
+
+        with self.assertRaises(LocalBackendError):
+            self.api_client.get_pokemon_record(100000)
+
+        self.assertEqual(self.api_client.client.get_statistics()["requests"], 2)
+
+    def test_failed_fetch_can_be_repeated(self):
+        """
+        A temporary error is not saved, so the next fetch of the same key gets the record.
+        """
+
+        self.api_client.client.error_rate = 1.0
+
+        with self.assertRaises(LocalBackendError):
+            self.api_client.get_nature_record(3)
+
+        self.assertEqual(self.api_client.in_flight_fetches, {})
+
+        self.api_client.client.error_rate = 0.0
+
+        self.assertEqual(self.api_client.get_nature_record(3)["name"], "nature-3")
+
+
+if __name__ == "__main__":
+    unittest.main()
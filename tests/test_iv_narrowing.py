@@ -0,0 +1,142 @@
+"""
+In this file, the batch IV narrowing is tested against the IV narrowing of one single pokemon.
+"""
+
+import random
+import unittest
+
+from ivcal.calculation.batch_iv_narrowing import BatchIVNarrower
+from ivcal.calculation.batch_calculator import NATURE_STATUS_VALUES, STATUS_VALUES
+from ivcal.calculation.iv_narrowing import IVNarrower
+from ivcal.calculation.iv_range_solver import calculate_stat_value, get_nature_percentage
+
+# Define the number of random histories, which are compared.
+HISTORY_COUNT = 3000
+
+
+def create_random_history(random_generator, error_rate=0.05):
+    """
+    Create a random pokemon with its IV values and a list of observations with an increasing level. Some status values
+    are changed with the error rate, so there are contradictions as well.
+    """
+
+    pokemon_base_data = {value: random_generator.randint(1, 255) for value in STATUS_VALUES}
+    iv_values = {value: random_generator.randint(0, 31) for value in STATUS_VALUES}
+    natures = {value: random_generator.choice([0.9, 1, 1.1]) for value in NATURE_STATUS_VALUES}
+
+    level = random_generator.randint(1, 60)
+    observations = []
+
+    for _ in range(random_generator.randint(1, 5)):
+        level = min(100, level + random_generator.randint(0, 10))
+        pokemon_input_data = {"level": level}
+
+        for value in STATUS_VALUES:
+            ev_value = random_generator.randint(0, 255)
+            pokemon_input_data["{}_ev".format(value)] = ev_value
+
+            nature_percentage = 100 if value == "hp" else get_nature_percentage(natures[value])
+            pokemon_input_data[value] = calculate_stat_value(pokemon_base_data[value], level, ev_value,
+                                                             iv_values[value], nature_percentage, value == "hp")
+
+            if random_generator.random() < error_rate:
+                pokemon_input_data[value] += random_generator.choice([-500, -3, -1, 1, 3, 500])
+
+        pokemon_input_data.update({"{}_nature".format(value): natures[value] for value in NATURE_STATUS_VALUES})
+        observations.append(pokemon_input_data)
+
+    return pokemon_base_data, iv_values, observations
+
+
+def create_batch_narrower(histories):
+    """
+    Create a batch narrower with the observations of a list of histories.
+    """
+
+    history_starts = []
+    level_list = []
+    stats_list = []
+    ev_list = []
+    nature_list = []
+    base_stats_list = []
+
+    for pokemon_base_data, _, observations in histories:
+        history_starts.append(len(level_list))
+
+        for pokemon_input_data in observations:
+            level_list.append(pokemon_input_data["level"])
+            stats_list.append([pokemon_input_data[value] for value in STATUS_VALUES])
+            ev_list.append([pokemon_input_data["{}_ev".format(value)] for value in STATUS_VALUES])
+            nature_list.append([pokemon_input_data["{}_nature".format(value)] for value in NATURE_STATUS_VALUES])
+            base_stats_list.append([pokemon_base_data[value] for value in STATUS_VALUES])
+
+    return BatchIVNarrower(history_starts, level_list, stats_list, ev_list, nature_list, base_stats_list)
+
+
+class BatchIVNarrowerTest(unittest.TestCase):
+    """
+    Test the batch narrowing with random histories.
+    """
+
+    def test_results_equal_iv_narrower(self):
+        """
+        Every result of the batch narrowing needs to be the result of the IV narrowing for the same history, as
+        candidate sets, as ranges and as contradictions.
+        """
+
+        random_generator = random.Random(5)
+        histories = [create_random_history(random_generator) for _ in range(HISTORY_COUNT)]
+
+        candidate_mask_array = create_batch_narrower(histories).narrow_all_histories()
+        batch_candidate_sets = BatchIVNarrower.results_to_candidate_sets(candidate_mask_array)
+        minimum_iv_array, maximum_iv_array = BatchIVNarrower.masks_to_iv_ranges(candidate_mask_array)
+        contradiction_array = BatchIVNarrower.find_contradictions(candidate_mask_array)
+
+        for history_number, (pokemon_base_data, _, observations) in enumerate(histories):
+            iv_narrower = IVNarrower(pokemon_base_data)
+            iv_narrower.add_observations(observations)
+            candidate_sets = iv_narrower.get_candidate_sets()
+
+            self.assertEqual(candidate_sets, batch_candidate_sets[history_number])
+
+            for value_number, value in enumerate(STATUS_VALUES):
+                iv_values = candidate_sets[value]
+                expected_range = (iv_values[0], iv_values[-1]) if iv_values else (-1, -1)
+
+                self.assertEqual((minimum_iv_array[history_number, value_number],
+                                  maximum_iv_array[history_number, value_number]), expected_range)
+                self.assertEqual(contradiction_array[history_number, value_number], not iv_values)
+
+    def test_consistent_histories_keep_their_iv_values(self):
+        """
+        Without changed status values, the IV values of the pokemon are always possible.
+        """
+
+        random_generator = random.Random(6)
+        histories = [create_random_history(random_generator, error_rate=0) for _ in range(HISTORY_COUNT)]
+
+        batch_candidate_sets = BatchIVNarrower.results_to_candidate_sets(
+            create_batch_narrower(histories).narrow_all_histories())
+
+        for (_, iv_values, _), candidate_sets in zip(histories, batch_candidate_sets):
+            for value in STATUS_VALUES:
+                self.assertIn(iv_values[value], candidate_sets[value])
+
+    def test_invalid_history_starts_are_rejected(self):
+        """
+        The history starts need to begin with 0 and increase up to the number of observations.
+        """
+
+        histories = [create_random_history(random.Random(7)) for _ in range(2)]
+        batch_narrower = create_batch_narrower(histories)
+        observation_count = len(batch_narrower.level_array)
+
+        for history_starts in [[], [1], [0, 0], [0, observation_count]]:
+            with self.assertRaises(ValueError):
+                BatchIVNarrower(history_starts, batch_narrower.level_array, batch_narrower.stats_array,
+                                batch_narrower.ev_array, batch_narrower.nature_percentage_array[:, 1:] / 100,
+                                batch_narrower.base_stats_array)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+In this file, the binary search of the IV range solver is tested against the stat formula, which is calculated forward
+for every IV value.
+"""
+
+import random
+import unittest
+
+from ivcal.calculation.batch_calculator import NATURE_STATUS_VALUES, STATUS_VALUES
+from ivcal.calculation.batch_processing import calculate_pokemon_rows, get_range_values
+from ivcal.calculation.iv_range_solver import calculate_stat_value, find_iv_range, get_nature_percentage, \
+    get_stat_table, IVRangeSolver, POSSIBLE_IV_VALUES
+
+# Define the number of random keys of base value, level, ev value and nature, which are compared.
+KEY_COUNT = 2000
+
+
+def create_random_key(random_generator):
+    """
+    Create a random tuple with the base value, the level, the ev value, the nature percentage and the HP flag.
+    """
+
+    is_hp = random_generator.random() < 0.2
+    nature_percentage = 100 if is_hp else random_generator.choice([90, 100, 110])
+
+    return (random_generator.randint(1, 255), random_generator.randint(1, 100), random_generator.randint(0, 255),
+            nature_percentage, is_hp)
+
+
+class FindIVRangeTest(unittest.TestCase):
+    """
+    Test the search of IV ranges with random keys.
+    """
+
+    def test_range_contains_all_iv_values_of_a_stat_value(self):
+        """
+        The range of a status value needs to contain exactly the IV values, which result in this status value.
+        """
+
+        random_generator = random.Random(3)
+
+        for _ in range(KEY_COUNT):
+            stat_key = create_random_key(random_generator)
+            stat_table = get_stat_table(*stat_key)
+
+            for stat_value in set(stat_table):
+                expected_iv_values = [iv_value for iv_value in POSSIBLE_IV_VALUES
+                                      if calculate_stat_value(stat_key[0], stat_key[1], stat_key[2], iv_value,
+                                                              stat_key[3], stat_key[4]) == stat_value]
+
+                self.assertEqual(find_iv_range(stat_table, stat_value),
+                                 (expected_iv_values[0], expected_iv_values[-1]))
+                self.assertEqual(list(range(expected_iv_values[0], expected_iv_values[-1] + 1)), expected_iv_values)
+
+    def test_missing_stat_value_has_no_range(self):
+        """
+        A status value, which no IV value results in, has None as result.
+        """
+
+        random_generator = random.Random(4)
+
+        for _ in range(KEY_COUNT):
+            stat_table = get_stat_table(*create_random_key(random_generator))
+
+            for stat_value in range(stat_table[0] - 2, stat_table[-1] + 3):
+                if stat_value not in stat_table:
+                    self.assertIsNone(find_iv_range(stat_table, stat_value))
+
+    def test_solver_uses_the_input_dictionaries(self):
+        """
+        The solver needs to find the range of the IV value, which the status values were calculated with.
+        """
+
+        pokemon_base_data = {"hp": 35, "attack": 55, "defense": 40, "special-attack": 50, "special-defense": 50,
+                             "speed": 90}
+        iv_values = {"hp": 3, "attack": 31, "defense": 0, "special-attack": 17, "special-defense": 8, "speed": 25}
+        natures = {"attack": 1.1, "defense": 0.9, "special-attack": 1, "special-defense": 1, "speed": 1}
+
+        pokemon_input_data = {"level": 50}
+
+        for value in iv_values:
+            pokemon_input_data["{}_ev".format(value)] = 0
+
+            if value != "hp":
+                pokemon_input_data["{}_nature".format(value)] = natures[value]
+
+            pokemon_input_data[value] = calculate_stat_value(pokemon_base_data[value], 50, 0, iv_values[value],
+                                                             int(round(natures.get(value, 1) * 100)), value == "hp")
+
+        iv_ranges = IVRangeSolver(pokemon_input_data, pokemon_base_data).calculate_all_iv_ranges()
+
+        for value, iv_value in iv_values.items():
+            self.assertLessEqual(iv_ranges[value][0], iv_value)
+            self.assertGreaterEqual(iv_ranges[value][1], iv_value)
+
+
+class BatchRangeTest(unittest.TestCase):
+    """
+    Test the IV ranges of the batch mode against the IV range solver.
+    """
+
+    def test_batch_ranges_equal_iv_range_solver(self):
+        """
+        The minimum and the maximum IV values of every result row of the batch mode need to be the ranges of the IV
+        range solver for the same pokemon, also for status values without a consistent IV value.
+        """
+
+        random_generator = random.Random(8)
+        pokemon_rows = []
+        resolved_rows = []
+
+        for row_number in range(KEY_COUNT):
+            pokemon_row = {"name": "pokemon-{}".format(row_number), "nature": "nature", "level":
+                           random_generator.randint(1, 100)}
+            base_stats_row = [random_generator.randint(1, 255) for _ in STATUS_VALUES]
+            nature_row = [random_generator.choice([0.9, 1.0, 1.1]) for _ in NATURE_STATUS_VALUES]
+
+            for value, base_value, nature_multiplier in zip(STATUS_VALUES, base_stats_row, [1.0] + nature_row):
+                pokemon_row["{}_ev".format(value)] = random_generator.randint(0, 255)
+                pokemon_row[value] = calculate_stat_value(base_value, pokemon_row["level"],
+                                                          pokemon_row["{}_ev".format(value)],
+                                                          random_generator.randint(0, 31),
+                                                          get_nature_percentage(nature_multiplier), value == "hp")
+
+                # Some status values are changed, so they do not have a consistent IV value.
+                if random_generator.random() < 0.1:
+                    pokemon_row[value] += random_generator.choice([-1, 1, 10 ** 6])
+
+            pokemon_rows.append(pokemon_row)
+            resolved_rows.append((base_stats_row, nature_row))
+
+        result_rows = calculate_pokemon_rows(pokemon_rows, resolved_rows)
+
+        for pokemon_row, (base_stats_row, nature_row), result_row in zip(pokemon_rows, resolved_rows, result_rows):
+            pokemon_input_data = dict(pokemon_row)
+            pokemon_input_data.update({"{}_nature".format(value): nature_multiplier
+                                       for value, nature_multiplier in zip(NATURE_STATUS_VALUES, nature_row)})
+
+            iv_ranges = IVRangeSolver(pokemon_input_data, dict(zip(STATUS_VALUES, base_stats_row))) \
+                .calculate_all_iv_ranges()
+
+            for column_name, range_value in get_range_values(iv_ranges).items():
+                self.assertEqual(result_row[column_name], range_value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+In this file, the name index is tested with names in the spelling of the PokéAPI.
+"""
+
+import unittest
+
+from ivcal.calculation.name_index import get_deletions, get_edit_distance, NameIndex, normalize_name
+
+# Define the names of some pokemon with their ids, which have punctuation or similar names.
+POKEMON_NAMES = [(25, "pikachu"), (26, "raichu"), (172, "pichu"), (122, "mr-mime"), (439, "mime-jr"),
+                 (83, "farfetchd"), (29, "nidoran-f"), (32, "nidoran-m"), (137, "porygon"), (233, "porygon2"),
+                 (474, "porygon-z")]
+
+
+class NormalizeNameTest(unittest.TestCase):
+    """
+    Test the normalized spelling of names.
+    """
+
+    def test_case_spaces_and_punctuation_are_removed(self):
+        """
+        Every spelling of a name needs to have the same normalized name.
+        """
+
+        for name in ["Mr. Mime", "mr mime", "mr-mime", "MR.MIME"]:
+            self.assertEqual(normalize_name(name), "mrmime")
+
+        self.assertEqual(normalize_name("Farfetch'd"), "farfetchd")
+
+    def test_accents_and_gender_symbols_are_replaced(self):
+        """
+        Accents are removed and the gender symbols are written like in the PokéAPI.
+        """
+
+        self.assertEqual(normalize_name("Flabébé"), "flabebe")
+        self.assertEqual(normalize_name("Nidoran♀"), normalize_name("nidoran-f"))
+        self.assertEqual(normalize_name("Nidoran♂"), normalize_name("nidoran-m"))
+
+
+class EditDistanceTest(unittest.TestCase):
+    """
+    Test the edit distance with its maximum distance.
+    """
+
+    def test_single_edits(self):
+        """
+        An inserted, a deleted, a replaced character and two swapped neighbours are one edit each.
+        """
+
+        self.assertEqual(get_edit_distance("pikachu", "pikachu", 2), 0)
+        self.assertEqual(get_edit_distance("pikachu", "pikachuu", 2), 1)
+        self.assertEqual(get_edit_distance("pikachu", "pikchu", 2), 1)
+        self.assertEqual(get_edit_distance("pikachu", "pikaxhu", 2), 1)
+        self.assertEqual(get_edit_distance("pikachu", "pikahcu", 2), 1)
+        self.assertEqual(get_edit_distance("pikachu", "ipkahcu", 2), 2)
+
+    def test_distance_is_limited(self):
+        """
+        A distance larger than the maximum distance is the maximum distance plus 1.
+        """
+
+        self.assertEqual(get_edit_distance("abc", "xyz", 2), 3)
+        self.assertEqual(get_edit_distance("pikachu", "pi", 2), 3)
+        self.assertEqual(get_edit_distance("pikachu", "raichu", 1), 2)
+
+    def test_deletions_contain_all_shorter_names(self):
+        """
+        The deletions of a name are the name and all names with up to the maximum distance of deleted characters.
+        """
+
+        self.assertEqual(get_deletions("abc", 1), {"abc", "bc", "ac", "ab"})
+        self.assertEqual(get_deletions("abc", 2), {"abc", "bc", "ac", "ab", "a", "b", "c"})
+
+
+class NameIndexTest(unittest.TestCase):
+    """
+    Test the lookups of the name index.
+    """
+
+    def setUp(self):
+        self.name_index = NameIndex(POKEMON_NAMES)
+
+    def test_exact_and_normalized_names_are_found(self):
+        """
+        A name is found by its exact spelling and by every spelling with the same normalized name.
+        """
+
+        self.assertEqual(len(self.name_index), len(POKEMON_NAMES))
+        self.assertEqual(self.name_index.get_id("mr-mime"), 122)
+        self.assertEqual(self.name_index.get_id("mr mime"), 122)
+        self.assertEqual(self.name_index.get_name("Mr. Mime"), "mr-mime")
+        self.assertEqual(self.name_index.get_id("Farfetch'd"), 83)
+        self.assertEqual(self.name_index.get_id("Nidoran♀"), 29)
+        self.assertIsNone(self.name_index.get_id("pikachuu"))
+
+    def test_ambiguous_normalized_name_is_not_resolved(self):
+        """
+        A normalized name, which belongs to more than one name, is not resolved to one of them, but both names are
+        suggested. The exact spellings are still found.
+        """
+
+        name_index = NameIndex(POKEMON_NAMES + [(250, "ho-oh"), (9999, "hooh")])
+
+        self.assertIsNone(name_index.get_name("Ho Oh"))
+        self.assertIsNone(name_index.get_id("Ho Oh"))
+        self.assertEqual(name_index.get_id("ho-oh"), 250)
+        self.assertEqual(name_index.get_id("hooh"), 9999)
+        self.assertEqual(sorted(name_index.suggest("Ho Oh")[:2]), ["ho-oh", "hooh"])
+
+    def test_names_are_found_by_prefix(self):
+        """
+        The names with a prefix are sorted by their normalized spelling and limited.
+        """
+
+        self.assertEqual(self.name_index.find_by_prefix("pi"), ["pichu", "pikachu"])
+        self.assertEqual(self.name_index.find_by_prefix("Porygon"), ["porygon", "porygon2", "porygon-z"])
+        self.assertEqual(self.name_index.find_by_prefix("porygon", limit=2), ["porygon", "porygon2"])
+        self.assertEqual(self.name_index.find_by_prefix("Mr."), ["mr-mime"])
+        self.assertEqual(self.name_index.find_by_prefix("x"), [])
+
+    def test_misspelled_names_are_found(self):
+        """
+        A misspelled name finds the names with a small edit distance, sorted by their distance.
+        """
+
+        self.assertEqual(self.name_index.find_similar("pikahcu"), ["pikachu"])
+        self.assertEqual(self.name_index.find_similar("farfetched"), ["farfetchd"])
+        self.assertEqual(sorted(self.name_index.find_similar("porygon3")), ["porygon", "porygon-z", "porygon2"])
+        self.assertEqual(self.name_index.find_similar("zzzzzzzz"), [])
+
+    def test_short_names_allow_a_smaller_distance(self):
+        """
+        A name with less than six characters only allows one edit, so it does not get too many suggestions.
+        """
+
+        self.assertEqual(self.name_index.find_similar("pich"), ["pichu"])
+        self.assertEqual(self.name_index.find_similar("pxcxu"), [])
+
+    def test_suggestions_start_with_the_normalized_name(self):
+        """
+        The suggestions are the names with the same normalized spelling, the similar names and the names with the
+        prefix in this order.
+        """
+
+        self.assertEqual(self.name_index.suggest("mr mime"), ["mr-mime"])
+        self.assertEqual(self.name_index.suggest("pikachu")[0], "pikachu")
+        self.assertEqual(self.name_index.suggest("nidoran"), ["nidoran-f", "nidoran-m"])
+        self.assertLessEqual(len(self.name_index.suggest("p", limit=2)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,270 @@
+"""
+In this file, the token bucket, the adaptive limit of parallel requests and the retries of the request scheduler are
+tested with a fake clock, so the delays are exact and the tests do not wait.
+"""
+
+import unittest
+from unittest import mock
+
+from ivcal.data_collection import request_scheduler
+from ivcal.data_collection.local_api_backend import LocalBackendError, RateLimitError
+from ivcal.data_collection.request_scheduler import AdaptiveConcurrencyLimiter, RequestScheduler, TokenBucket
+
+
+class FakeClock:
+    """
+    Create a class with the functions monotonic and sleep of the module time. Sleeping moves the clock forward at once
+    and every sleeping time is saved.
+    """
+
+    def __init__(self):
+        self.current_time = 1000.0
+        self.sleeping_times = []
+
+    def monotonic(self):
+        return self.current_time
+
+    def sleep(self, sleeping_time):
+        self.sleeping_times.append(sleeping_time)
+        self.current_time += sleeping_time
+
+
+class FailingRequest:
+    """
+    Create a class for a request function, which raises the given errors one after another and returns "record"
+    afterwards.
+    """
+
+    def __init__(self, request_errors):
+        self.request_errors = list(request_errors)
+        self.call_count = 0
+
+    def __call__(self, resource_id):
+        self.call_count += 1
+
+        if self.request_errors:
+            raise self.request_errors.pop(0)
+
+        return "record"
+
+
+class FakeClockTestCase(unittest.TestCase):
+    """
+    Replace the module time of the request scheduler with a fake clock for every test.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        time_patch = mock.patch.object(request_scheduler, "time", self.clock)
+        time_patch.start()
+        self.addCleanup(time_patch.stop)
+
+
+class TokenBucketTest(FakeClockTestCase):
+    """
+    Test the rate limit of the token bucket.
+    """
+
+    def test_waiting_requests_build_a_debt(self):
+        """
+        Every request without a token waits for one more interval of the rate than the request before.
+        """
+
+        token_bucket = TokenBucket(rate=10, capacity=1)
+
+        waiting_times = [token_bucket.reserve() for _ in range(4)]
+
+        for waiting_time, expected_time in zip(waiting_times, [0.0, 0.1, 0.2, 0.3]):
+            self.assertAlmostEqual(waiting_time, expected_time)
+
+        # After the debt is paid and the bucket is full again, a request does not wait.
+        self.clock.sleep(1.0)
+
+        self.assertEqual(token_bucket.reserve(), 0.0)
+
+    def test_capacity_allows_a_burst(self):
+        """
+        The requests of a full bucket do not wait up to its capacity.
+        """
+
+        token_bucket = TokenBucket(rate=10, capacity=3)
+
+        self.assertEqual([token_bucket.reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(token_bucket.reserve(), 0.1)
+
+    def test_pause_without_rate(self):
+        """
+        A bucket without a rate does not limit the requests, but waits for a pause.
+        """
+
+        token_bucket = TokenBucket()
+
+        self.assertEqual(token_bucket.reserve(), 0.0)
+
+        token_bucket.pause(2.5)
+
+        self.assertEqual(token_bucket.reserve(), 2.5)
+
+        token_bucket.acquire()
+
+        self.assertEqual(self.clock.sleeping_times, [2.5])
+
+    def test_invalid_rate_and_capacity_are_rejected(self):
+        """
+        A rate of 0 or less and a capacity below 1 are not allowed.
+        """
+
+        for rate, capacity in [(0, None), (-1, None), (10, 0.5)]:
+            with self.assertRaises(ValueError):
+                TokenBucket(rate, capacity)
+
+
+class AdaptiveConcurrencyLimiterTest(FakeClockTestCase):
+    """
+    Test the additive increase and the multiplicative decrease of the limit of parallel requests.
+    """
+
+    def test_pushback_halves_the_limit_once_per_interval(self):
+        """
+        A pushback halves the limit, but the pushbacks in the decrease interval after it do not change the limit.
+        """
+
+        concurrency_limiter = AdaptiveConcurrencyLimiter(8, decrease_interval=0.5)
+
+        self.assertTrue(concurrency_limiter.record_pushback())
+        self.assertEqual(concurrency_limiter.get_limit(), 4)
+
+        self.clock.sleep(0.4)
+
+        self.assertFalse(concurrency_limiter.record_pushback())
+        self.assertEqual(concurrency_limiter.get_limit(), 4)
+
+        self.clock.sleep(0.1)
+
+        self.assertTrue(concurrency_limiter.record_pushback())
+        self.assertEqual(concurrency_limiter.get_limit(), 2)
+
+    def test_limit_stays_between_minimum_and_maximum(self):
+        """
+        The limit is not decreased below the minimum and not increased above the maximum.
+        """
+
+        concurrency_limiter = AdaptiveConcurrencyLimiter(4, min_limit=1, decrease_interval=0)
+
+        for _ in range(5):
+            concurrency_limiter.record_pushback()
+
+        self.assertEqual(concurrency_limiter.get_limit(), 1)
+
+        # The limit grows by about one for every full round of successful requests.
+        concurrency_limiter.record_success()
+
+        self.assertEqual(concurrency_limiter.get_limit(), 2)
+
+        for _ in range(100):
+            concurrency_limiter.record_success()
+
+        self.assertEqual(concurrency_limiter.get_limit(), 4)
+
+
+class RequestSchedulerTest(FakeClockTestCase):
+    """
+    Test the retries of the request scheduler.
+    """
+
+    def test_temporary_errors_are_retried(self):
+        """
+        Server errors, rate limits and connection errors are retried with a delay of the backoff with full jitter.
+        """
+
+        scheduler = RequestScheduler(max_concurrency=8, base_delay=0.1, seed=1)
+        request_function = FailingRequest([LocalBackendError(503, "Service Unavailable"),
+                                           LocalBackendError(500, "Server Error"), ConnectionResetError()])
+
+        self.assertEqual(scheduler.execute(request_function, 25), "record")
+        self.assertEqual(request_function.call_count, 4)
+
+        for retry_number, sleeping_time in enumerate(self.clock.sleeping_times):
+            self.assertLessEqual(sleeping_time, 0.1 * 2 ** retry_number)
+
+        # The pushback of the status 503 halves the limit and the successful request increases it by a quarter.
+        self.assertEqual(scheduler.get_statistics(), {"requests": 4,
+                                                      "retries": 3,
+                                                      "pushbacks": 1,
+                                                      "failures": 0,
+                                                      "concurrency_limit": 4})
+
+    def test_retries_are_limited(self):
+        """
+        After the maximum number of retries, the error of the last try is raised and counted as failure.
+        """
+
+        scheduler = RequestScheduler(max_retries=3, seed=1)
+        request_function = FailingRequest([LocalBackendError(502, "Bad Gateway") for _ in range(10)])
+
+        with self.assertRaises(LocalBackendError):
+            scheduler.execute(request_function, 25)
+
+        self.assertEqual(request_function.call_count, 4)
+        self.assertEqual(scheduler.get_statistics()["retries"], 3)
+        self.assertEqual(scheduler.get_statistics()["failures"], 1)
+
+    def test_other_errors_are_raised_at_once(self):
+        """
+        Errors, which are not temporary, are not retried.
+        """
+
+        for request_error in [LocalBackendError(404, "Not Found"), ValueError("wrong record")]:
+            scheduler = RequestScheduler(seed=1)
+            request_function = FailingRequest([request_error])
+
+            with self.assertRaises(type(request_error)):
+                scheduler.execute(request_function, 25)
+
+            self.assertEqual(request_function.call_count, 1)
+            self.assertEqual(scheduler.get_statistics()["retries"], 0)
+            self.assertEqual(scheduler.get_statistics()["failures"], 1)
+            self.assertEqual(self.clock.sleeping_times, [])
+
+    def test_retry_waits_for_retry_after(self):
+        """
+        A retry waits at least for the time of Retry-After and the following requests are paused as well.
+        """
+
+        scheduler = RequestScheduler(base_delay=0.1, seed=1)
+        request_function = FailingRequest([RateLimitError(5.0)])
+
+        self.assertEqual(scheduler.execute(request_function, 25), "record")
+        self.assertGreaterEqual(self.clock.sleeping_times[0], 5.0)
+        self.assertEqual(scheduler.get_statistics()["pushbacks"], 1)
+        self.assertGreaterEqual(scheduler.token_bucket.paused_until, 1005.0)
+
+    def test_seed_repeats_the_delays(self):
+        """
+        Two schedulers with the same seed have the same delays.
+        """
+
+        first_scheduler = RequestScheduler(seed=7)
+        second_scheduler = RequestScheduler(seed=7)
+
+        self.assertEqual([first_scheduler.get_backoff_delay(retry_number) for retry_number in range(5)],
+                         [second_scheduler.get_backoff_delay(retry_number) for retry_number in range(5)])
+
+    def test_error_of_the_rate_limit_is_a_failure(self):
+        """
+        An error while waiting for a token fails the request without sending it.
+        """
+
+        scheduler = RequestScheduler(seed=1)
+        request_function = FailingRequest([])
+
+        with mock.patch.object(scheduler.token_bucket, "acquire", side_effect=OverflowError("token error")):
+            with self.assertRaises(OverflowError):
+                scheduler.execute(request_function, 25)
+
+        self.assertEqual(request_function.call_count, 0)
+        self.assertEqual(scheduler.get_statistics()["failures"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+In this file, the persistent response cache is tested with a file in a temporary directory and a fake clock.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ivcal.data_collection import response_cache
+from ivcal.data_collection.response_cache import ResponseCache
+
+
+class FakeClock:
+    """
+    Create a class with the function time of the module time, which returns a time, that is set by the test.
+    """
+
+    def __init__(self):
+        self.current_time = 1000.0
+
+    def time(self):
+        return self.current_time
+
+
+class ResponseCacheTest(unittest.TestCase):
+    """
+    Test the keys, the expiry and the eviction of the response cache.
+    """
+
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.cache_path = os.path.join(temporary_directory.name, "api_cache.db")
+
+        self.clock = FakeClock()
+        time_patch = mock.patch.object(response_cache, "time", self.clock)
+        time_patch.start()
+        self.addCleanup(time_patch.stop)
+
+    def create_cache(self, **cache_options):
+        """
+        Create a cache with the file in the temporary directory, which is closed after the test.
+        """
+
+        cache = ResponseCache(self.cache_path, **cache_options)
+        self.addCleanup(cache.cache_connection.close)
+
+        return cache
+
+    def get_entry_count(self, cache):
+        """
+        Get the number of saved entries of a cache.
+        """
+
+        return cache.cache_connection.execute("SELECT COUNT(*) FROM response_cache;").fetchone()[0]
+
+    def test_record_is_found_by_id_and_by_name(self):
+        """
+        A record, which is saved with its id and its name, is found by both keys in every spelling.
+        """
+
+        cache = self.create_cache()
+        pokemon_record = {"id": 25, "name": "pikachu", "stats": {"hp": 35}}
+
+        cache.set("pokemon", [25, "pikachu"], pokemon_record)
+
+        for resource_key in [25, "25", "pikachu", "Pikachu", "PIKACHU"]:
+            self.assertEqual(cache.get("pokemon", resource_key), pokemon_record)
+
+        # The resource type is part of the key.
+        self.assertIsNone(cache.get("nature", 25))
+        self.assertEqual(cache.get_statistics()["hits"], 5)
+        self.assertEqual(cache.get_statistics()["misses"], 1)
+
+    def test_entries_are_saved_in_the_file(self):
+        """
+        The entries of a cache are found by another cache with the same file.
+        """
+
+        self.create_cache().set("nature", [2, "lonely"], {"id": 2, "name": "lonely"})
+
+        self.assertEqual(self.create_cache().get("nature", "Lonely"), {"id": 2, "name": "lonely"})
+
+    def test_expired_entry_is_removed(self):
+        """
+        An entry is used up to its time to live and removed afterwards.
+        """
+
+        cache = self.create_cache(time_to_live=10)
+        cache.set("pokemon", [25, "pikachu"], {"id": 25})
+
+        self.clock.current_time += 10
+
+        self.assertEqual(cache.get("pokemon", 25), {"id": 25})
+
+        self.clock.current_time += 0.5
+
+        self.assertIsNone(cache.get("pokemon", 25))
+        self.assertEqual(self.get_entry_count(cache), 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """
+        If the cache is full, the entry with the oldest access is removed, so an entry, which was read, stays longer
+        than an entry, which was saved later.
+        """
+
+        cache = self.create_cache(max_entries=3)
+
+        for resource_id in [1, 2, 3]:
+            self.clock.current_time += 1
+            cache.set("pokemon", [resource_id], {"id": resource_id})
+
+        self.clock.current_time += 1
+        cache.get("pokemon", 1)
+
+        self.clock.current_time += 1
+        cache.set("pokemon", [4], {"id": 4})
+
+        self.assertEqual(self.get_entry_count(cache), 3)
+        self.assertIsNone(cache.get("pokemon", 2))
+
+        for resource_id in [1, 3, 4]:
+            self.assertEqual(cache.get("pokemon", resource_id), {"id": resource_id})
+
+    def test_clear_removes_all_entries(self):
+        """
+        A cleared cache does not have any entries.
+        """
+
+        cache = self.create_cache()
+        cache.set("pokemon", [25, "pikachu"], {"id": 25})
+        cache.clear()
+
+        self.assertEqual(self.get_entry_count(cache), 0)
+        self.assertIsNone(cache.get("pokemon", "pikachu"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+In this file, the migration of a database file in the format of the first versions of this program to the current schema
+is tested.
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from ivcal.database.schema_migration import get_schema_version, migrate_database, SCHEMA_MIGRATIONS
+
+# Define the tables of the first versions of this program, which had columns without types and no user_version.
+BASELINE_TABLE_QUERIES = [
+    '''CREATE TABLE pokemon_status_data (pokemon_id primary key, pokemon_hp, pokemon_attack, pokemon_defense,
+    pokemon_sp_attack, pokemon_sp_defense, pokemon_speed);''',
+    '''CREATE TABLE pokemon_id_name_mapping (pokemon_id primary key, pokemon_name);''',
+    '''CREATE TABLE nature_status_data (nature_id primary key, decrease, increase);''',
+    '''CREATE TABLE nature_id_name_mapping (nature_id primary key, nature_name);''',
+]
+
+# Define the expected types of the columns after the migration.
+EXPECTED_COLUMN_TYPES = {
+    "pokemon_status_data": {"pokemon_id": "INTEGER", "pokemon_hp": "INTEGER", "pokemon_attack": "INTEGER",
+                            "pokemon_defense": "INTEGER", "pokemon_sp_attack": "INTEGER",
+                            "pokemon_sp_defense": "INTEGER", "pokemon_speed": "INTEGER"},
+    "pokemon_id_name_mapping": {"pokemon_id": "INTEGER", "pokemon_name": "TEXT"},
+    "nature_status_data": {"nature_id": "INTEGER", "decrease": "TEXT", "increase": "TEXT"},
+    "nature_id_name_mapping": {"nature_id": "INTEGER", "nature_name": "TEXT"},
+    "collection_checkpoint": {"resource_type": "TEXT", "resource_id": "INTEGER", "status": "TEXT"},
+}
+
+
+class SchemaMigrationTest(unittest.TestCase):
+    """
+    Test the migration of a database file with the baseline schema in a temporary directory.
+    """
+
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+
+        self.database_connection = sqlite3.connect(os.path.join(temporary_directory.name, "pokemon.db"),
+                                                   isolation_level=None)
+        self.addCleanup(self.database_connection.close)
+
+    def create_baseline_database(self):
+        """
+        Create the tables of the baseline schema with some rows. An id is saved as text, like it could be saved in
+        columns without types.
+        """
+
+        for table_query in BASELINE_TABLE_QUERIES:
+            self.database_connection.execute(table_query)
+
+        self.database_connection.executemany("INSERT INTO pokemon_status_data VALUES (?, ?, ?, ?, ?, ?, ?);",
+                                             [(25, 35, 55, 40, 50, 50, 90), ("150", 106, 110, 90, 154, 90, 130)])
+        self.database_connection.executemany("INSERT INTO pokemon_id_name_mapping VALUES (?, ?);",
+                                             [(25, "pikachu"), ("150", "mewtwo")])
+        self.database_connection.executemany("INSERT INTO nature_status_data VALUES (?, ?, ?);",
+                                             [(1, None, None), (2, "defense", "attack")])
+        self.database_connection.executemany("INSERT INTO nature_id_name_mapping VALUES (?, ?);",
+                                             [(1, "hardy"), (2, "lonely")])
+
+    def get_rows(self, table_name):
+        """
+        Get all rows of a table with the type of every value, sorted by the first column.
+        """
+
+        return self.database_connection.execute("SELECT * FROM {} ORDER BY 1;".format(table_name)).fetchall()
+
+    def test_baseline_database_is_migrated(self):
+        """
+        The migration needs to keep all rows, cast them to the types of the columns and save the newest version.
+        """
+
+        self.create_baseline_database()
+        migrate_database(self.database_connection)
+
+        self.assertEqual(get_schema_version(self.database_connection), SCHEMA_MIGRATIONS[-1][0])
+        self.assertEqual(get_schema_version(self.database_connection), 2)
+
+        self.assertEqual(self.get_rows("pokemon_status_data"), [(25, 35, 55, 40, 50, 50, 90),
+                                                                (150, 106, 110, 90, 154, 90, 130)])
+        self.assertEqual(self.get_rows("pokemon_id_name_mapping"), [(25, "pikachu"), (150, "mewtwo")])
+        self.assertEqual(self.get_rows("nature_status_data"), [(1, None, None), (2, "defense", "attack")])
+        self.assertEqual(self.get_rows("nature_id_name_mapping"), [(1, "hardy"), (2, "lonely")])
+        self.assertEqual(self.get_rows("collection_checkpoint"), [])
+
+        # The id, which was saved as text, is an integer after the migration.
+        self.assertEqual(self.database_connection.execute("SELECT typeof(pokemon_id) FROM pokemon_id_name_mapping "
+                                                          "WHERE pokemon_name='mewtwo';").fetchone()[0], "integer")
+
+        for table_name, expected_column_types in EXPECTED_COLUMN_TYPES.items():
+            column_types = {column_row[1]: column_row[2] for column_row in
+                            self.database_connection.execute("PRAGMA table_info({});".format(table_name))}
+
+            self.assertEqual(column_types, expected_column_types)
+
+        index_names = {index_row[0] for index_row in
+                       self.database_connection.execute("SELECT name FROM sqlite_master WHERE type='index';")}
+
+        self.assertLessEqual({"pokemon_name_index", "nature_name_index"}, index_names)
+
+    def test_second_migration_does_nothing(self):
+        """
+        A database file with the newest version is not changed by another migration.
+        """
+
+        self.create_baseline_database()
+        migrate_database(self.database_connection)
+
+        schema_rows = self.get_rows("sqlite_master")
+        change_count = self.database_connection.total_changes
+
+        migrate_database(self.database_connection)
+
+        self.assertEqual(self.get_rows("sqlite_master"), schema_rows)
+        self.assertEqual(self.database_connection.total_changes, change_count)
+        self.assertEqual(get_schema_version(self.database_connection), 2)
+
+    def test_new_database_gets_the_newest_schema(self):
+        """
+        A new database file gets all tables of the newest version.
+        """
+
+        migrate_database(self.database_connection)
+
+        self.assertEqual(get_schema_version(self.database_connection), 2)
+
+        for table_name in EXPECTED_COLUMN_TYPES:
+            self.assertEqual(self.get_rows(table_name), [])
+
+    def test_duplicate_names_are_skipped(self):
+        """
+        A name, which is saved twice in the baseline schema, breaks the new unique index, so only its first row is kept.
+        """
+
+        self.create_baseline_database()
+        self.database_connection.execute("INSERT INTO pokemon_id_name_mapping VALUES (26, 'pikachu');")
+
+        migrate_database(self.database_connection)
+
+        self.assertEqual(self.get_rows("pokemon_id_name_mapping"), [(25, "pikachu"), (150, "mewtwo")])
+
+
+if __name__ == "__main__":
+    unittest.main()